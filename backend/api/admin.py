@@ -1,7 +1,8 @@
 from django.contrib import admin
 from .models import (
     SymptomLog, PhenotypeResult,
-    UserProfile, CycleRecord, HealthMetric, KnowledgeArticle
+    UserProfile, CycleRecord, HealthMetric, KnowledgeArticle,
+    BackgroundTask
 )
 
 
@@ -56,3 +57,12 @@ class KnowledgeArticleAdmin(admin.ModelAdmin):
     search_fields = ['title', 'content', 'author']
     prepopulated_fields = {'slug': ('title',)}
     date_hierarchy = 'publish_date'
+
+
+# ================= BACKGROUND TASKS =================
+
+@admin.register(BackgroundTask)
+class BackgroundTaskAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'status', 'priority', 'attempts', 'run_at', 'locked_by']
+    list_filter = ['status', 'name']
+    search_fields = ['name', 'dedupe_key']
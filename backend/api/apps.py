@@ -1,10 +1,25 @@
 from django.apps import AppConfig
+from django.core.signals import request_finished
+from django.db.models.signals import post_migrate
+
+
+def repair_search_index(sender, using, **kwargs):
+    from django.db import connections
+    from .search import repair_sqlite_index
+    if repair_sqlite_index(connections[using]):
+        print("🔎 Rebuilt article search index triggers")
+
 
 class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api"
 
     def ready(self):
+        post_migrate.connect(repair_search_index, sender=self)
+
+        from .view_counts import flush_if_due
+        request_finished.connect(flush_if_due, dispatch_uid="api.view_counts.flush")
+
         from .models import KnowledgeArticle
         articles = [
             # ... your articles dicts
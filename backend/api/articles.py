@@ -0,0 +1,142 @@
+"""
+Knowledge Article Rendering + Response Caching
+----------------------------------------------
+• render_markdown() turns article Markdown into HTML once, at save time
+  (KnowledgeArticle.content_html). It supports the subset the articles
+  use — headings, lists, bold / italic / code, links, paragraphs — and
+  is safe by construction: every piece of text is HTML-escaped and only
+  the tags emitted here can appear; link targets must be http(s).
+
+• List / FAQ responses are cached under a content version derived from
+  the database (latest updated_at + row count), so an edit in any worker
+  invalidates every worker's cache. The same version is the ETag, and
+  conditional requests are answered with 304 without serializing.
+  View counters don't change the version, so `views` in a cached listing
+  is a snapshot from when the entry was built.
+"""
+
+import hashlib
+import html
+import re
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+
+LIST_CACHE_TIMEOUT = 3600       # entries are versioned; this only bounds memory
+
+
+# ============================================================
+# MARKDOWN → HTML
+# ============================================================
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+_BULLET = re.compile(r"^\s*[-*+]\s+(.*)$")
+_NUMBERED = re.compile(r"^\s*\d+[.)]\s+(.*)$")
+_RULE = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+
+_CODE = re.compile(r"`([^`]+)`")
+_BOLD = re.compile(r"\*\*(.+?)\*\*|__(.+?)__")
+_ITALIC = re.compile(r"(?<![\w*])\*(?!\s)(.+?)(?<!\s)\*(?![\w*])|(?<!\w)_(?!\s)(.+?)(?<!\s)_(?!\w)")
+_LINK = re.compile(r"\[([^\]]+)\]\((https?://[^\s)]+)\)")
+
+
+def _inline(text):
+    """Escape, then apply inline markup to the escaped text."""
+    codes = []
+
+    def stash(match):
+        codes.append(match.group(1))
+        return f"\x00{len(codes) - 1}\x00"
+
+    # quote=True: no raw quote survives, so URLs can't break out of href="..."
+    text = html.escape(_CODE.sub(stash, text))
+    text = _LINK.sub(
+        lambda m: f'<a href="{m.group(2)}" rel="noopener noreferrer" target="_blank">{m.group(1)}</a>',
+        text,
+    )
+    text = _BOLD.sub(lambda m: f"<strong>{m.group(1) or m.group(2)}</strong>", text)
+    text = _ITALIC.sub(lambda m: f"<em>{m.group(1) or m.group(2)}</em>", text)
+    return re.sub(r"\x00(\d+)\x00", lambda m: f"<code>{html.escape(codes[int(m.group(1))])}</code>", text)
+
+
+def render_markdown(text):
+    out, paragraph, list_tag = [], [], None
+
+    def close_paragraph():
+        if paragraph:
+            out.append(f"<p>{_inline(' '.join(paragraph))}</p>")
+            paragraph.clear()
+
+    def close_list():
+        nonlocal list_tag
+        if list_tag:
+            out.append(f"</{list_tag}>")
+            list_tag = None
+
+    for line in (text or "").replace("\r\n", "\n").split("\n"):
+        heading = _HEADING.match(line)
+        item = _BULLET.match(line) or _NUMBERED.match(line)
+
+        if not line.strip():
+            close_paragraph()
+            close_list()
+        elif _RULE.match(line):
+            close_paragraph()
+            close_list()
+            out.append("<hr>")
+        elif heading:
+            close_paragraph()
+            close_list()
+            level = len(heading.group(1))
+            out.append(f"<h{level}>{_inline(heading.group(2).strip())}</h{level}>")
+        elif item:
+            close_paragraph()
+            tag = "ul" if _BULLET.match(line) else "ol"
+            if list_tag != tag:
+                close_list()
+                out.append(f"<{tag}>")
+                list_tag = tag
+            out.append(f"<li>{_inline(item.group(1).strip())}</li>")
+        else:
+            close_list()
+            paragraph.append(line.strip())
+
+    close_paragraph()
+    close_list()
+    return "\n".join(out)
+
+
+# ============================================================
+# VERSIONED RESPONSE CACHE
+# ============================================================
+
+def content_version(request=None):
+    """Changes whenever any article is created, edited or deleted."""
+    if request is not None and hasattr(request, "_article_version"):
+        return request._article_version
+
+    from .models import KnowledgeArticle
+    agg = KnowledgeArticle.objects.aggregate(latest=Max("updated_at"), total=Count("id"))
+    latest = agg["latest"].timestamp() if agg["latest"] else 0
+    version = f"{agg['total']}-{latest:.6f}"
+
+    if request is not None:
+        request._article_version = version
+    return version
+
+
+def etag(request, *args, **kwargs):
+    """ETag for a cached article listing: content version + query string."""
+    raw = f"{content_version(request)}|{request.path}|{request.META.get('QUERY_STRING', '')}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:20]
+
+
+def cached(request, name, compute):
+    """compute() (serialized data) cached until the article content changes."""
+    key = f"articles:{content_version(request)}:{name}"
+    data = cache.get(key)
+    if data is None:
+        data = compute()
+        cache.set(key, data, LIST_CACHE_TIMEOUT)
+    return data
@@ -0,0 +1,106 @@
+"""
+Chat Auto-Logging
+-----------------
+Turns data extracted from a Baymax conversation into cycle records:
+
+1. period_start_date → create / correct a CycleRecord (±5 days)
+2. period_end_date   → close the most recent cycle
+3. symptoms          → merge into the latest active cycle
+
+Runs inline from /api/chat/ or in the chat.extract background task.
+"""
+
+from datetime import date, datetime, timedelta
+
+from .models import CycleRecord
+
+
+def apply_extracted_data(profile, extracted_data):
+    """Returns True if any cycle record was written."""
+    changed = False
+
+    # 1. Start Date
+    start_date_str = extracted_data.get('period_start_date')
+    if start_date_str:
+        try:
+            s_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
+
+            # Check for existing record near this date (within 5 days) to avoid duplicates
+            existing = CycleRecord.objects.filter(
+                user=profile,
+                predicted=False,
+                start_date__gte=s_date - timedelta(days=5),
+                start_date__lte=s_date + timedelta(days=5)
+            ).first()
+
+            if existing:
+                # Update start date if needed, or just append symptoms
+                existing.start_date = s_date # Update to precise date if user corrected it
+                existing.save()
+                print(f"✅ Updated existing cycle record for {s_date}")
+            else:
+                CycleRecord.objects.create(user=profile, start_date=s_date)
+                print(f"✅ Created new cycle record for {s_date}")
+            changed = True
+
+        except ValueError:
+            print(f"⚠️ Invalid start date format: {start_date_str}")
+
+    # 2. End Date
+    end_date_str = extracted_data.get('period_end_date')
+    if end_date_str:
+        try:
+            e_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
+
+            # Find the most recent open cycle (no end date) or recent cycle
+            latest_cycle = CycleRecord.objects.filter(
+                user=profile,
+                predicted=False,
+                start_date__lte=e_date
+            ).order_by('-start_date').first()
+
+            if latest_cycle:
+                latest_cycle.end_date = e_date
+                latest_cycle.save()
+                print(f"✅ Logged end date {e_date} for cycle starting {latest_cycle.start_date}")
+                changed = True
+            else:
+                # Only log the end date when a matching start exists.
+                print(f"⚠️ Could not find start date for end date {e_date}")
+
+        except ValueError:
+            print(f"⚠️ Invalid end date format: {end_date_str}")
+
+    # 3. Log Symptoms to latest active cycle
+    new_symptoms = extracted_data.get('symptoms', {})
+    if new_symptoms:
+        # Find cycle active today or most recent
+        today = date.today()
+        active_cycle = CycleRecord.objects.filter(
+            user=profile,
+            predicted=False,
+            start_date__lte=today
+        ).order_by('-start_date').first()
+
+        if active_cycle:
+            # Merge symptoms
+            current_symptoms = active_cycle.symptoms or []
+
+            # The pipeline returns dict {acne: true, pain: "high"};
+            # store it as a list of strings
+            formatted_new = []
+            if isinstance(new_symptoms, dict):
+                for k, v in new_symptoms.items():
+                    if v is True: formatted_new.append(k)
+                    elif v: formatted_new.append(f"{k}: {v}")
+            elif isinstance(new_symptoms, list):
+                formatted_new = new_symptoms
+
+            # Add unique
+            updated_list = list(set(current_symptoms + formatted_new))
+            active_cycle.symptoms = updated_list
+            active_cycle.save()
+            print(f"✅ Added symptoms to cycle {active_cycle.id}: {formatted_new}")
+            changed = True
+
+    return changed
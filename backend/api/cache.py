@@ -0,0 +1,45 @@
+"""
+Per-User Read Cache
+-------------------
+Read-through cache for cycle / metric reads on Django's cache framework.
+
+Keys embed UserProfile.data_version, which every CycleRecord /
+HealthMetric write bumps (signals in models.py). A write therefore makes
+all older entries unreachable at once — in every worker, because the
+version comes from the database row get_profile() already loads, not
+from the cache. Stale entries simply expire (USER_CACHE_TTL).
+
+    data = cache.user_cached(profile, "predict", compute, today)
+
+Bulk writes that skip signals (bulk_create / update) must call
+profile.bump_data_version() themselves.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import metrics
+
+
+_MISS = object()
+
+
+def user_key(profile, name, *parts):
+    suffix = ":".join(str(p) for p in parts)
+    return f"user:{profile.pk}:v{profile.data_version}:{name}:{suffix}"
+
+
+def user_cached(profile, name, compute, *parts, timeout=None):
+    """
+    Return compute() for this user + parts, cached until the next write.
+    compute() must return something picklable (plain dicts / lists).
+    """
+    key = user_key(profile, name, *parts)
+    value = cache.get(key, _MISS)
+    metrics.record_cache(name, value is not _MISS)
+
+    if value is _MISS:
+        value = compute()
+        cache.set(key, value, settings.USER_CACHE_TTL if timeout is None else timeout)
+
+    return value
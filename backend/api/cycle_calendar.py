@@ -0,0 +1,93 @@
+"""
+Cycle Calendar
+--------------
+Everything a calendar view needs for a date window in one payload:
+
+• logged and forecast cycles overlapping the window
+  (forecast rows are materialized CycleRecord(predicted=True))
+• one entry per day: cycle day, phase, fertile flag, predicted flag
+
+Data comes from a single (user, start_date) range query; the forecast
+itself is cached per data version (api/forecasting.py).
+"""
+
+from datetime import timedelta
+
+from .forecasting import FERTILE_AFTER, FERTILE_BEFORE, LUTEAL_DAYS, MAX_GAP, forecast, materialize
+from .models import CycleRecord
+from .serializers import CycleRecordSerializer
+
+
+DEFAULT_CYCLE_LENGTH = 28
+DEFAULT_PERIOD_LENGTH = 5
+MAX_RANGE_DAYS = 731
+
+
+def _phase(day, period_len, ovulation_day):
+    if day <= period_len:
+        return "Menstrual"
+    if day < ovulation_day - 1:
+        return "Follicular"
+    if day <= ovulation_day + 1:
+        return "Ovulation"
+    return "Luteal"
+
+
+def build(profile, start, end):
+    materialize(profile)
+
+    fc = forecast(profile)
+    default_len = round(fc["average_cycle_length"]) if fc else DEFAULT_CYCLE_LENGTH
+
+    # One indexed range query; the margins pick up the cycle already running
+    # on `start` and the one after `end` (to know the last cycle's length).
+    rows = list(
+        CycleRecord.objects.filter(
+            user=profile,
+            start_date__gte=start - timedelta(days=MAX_GAP),
+            start_date__lte=end + timedelta(days=MAX_GAP),
+        ).order_by("start_date", "predicted", "pk")
+    )
+
+    spans = []
+    for i, row in enumerate(rows):
+        nxt = rows[i + 1].start_date if i + 1 < len(rows) else None
+        length = (nxt - row.start_date).days if nxt else default_len
+        period_len = row.cycle_length() or DEFAULT_PERIOD_LENGTH
+        spans.append((row, max(length, 1), period_len))
+
+    days = []
+    idx = -1
+    current = start
+    while current <= end:
+        while idx + 1 < len(spans) and spans[idx + 1][0].start_date <= current:
+            idx += 1
+
+        entry = {"date": current, "cycle_day": None, "phase": None, "fertile": False, "predicted": False}
+        if idx >= 0:
+            row, length, period_len = spans[idx]
+            day = (current - row.start_date).days + 1
+            if day <= length or idx == len(spans) - 1:
+                ovulation_day = max(length - LUTEAL_DAYS, period_len + 1)
+                entry.update({
+                    "cycle_day": day,
+                    "phase": _phase(day, period_len, ovulation_day),
+                    "fertile": ovulation_day - FERTILE_BEFORE <= day <= ovulation_day + FERTILE_AFTER,
+                    "predicted": row.predicted,
+                })
+        days.append(entry)
+        current += timedelta(days=1)
+
+    visible = [
+        row for row, _, period_len in spans
+        if row.start_date <= end
+        and row.start_date + timedelta(days=period_len - 1) >= start
+    ]
+
+    return {
+        "from": start,
+        "to": end,
+        "cycles": CycleRecordSerializer(visible, many=True).data,
+        "days": days,
+        "average_cycle_length": fc["average_cycle_length"] if fc else None,
+    }
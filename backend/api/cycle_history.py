@@ -0,0 +1,137 @@
+"""
+Cycle History Service
+---------------------
+One view of a user's logged (non-predicted) cycles shared by every engine:
+
+    history = cycle_history.for_profile(profile_id)
+    history.records          → all logged cycles, oldest first (one query)
+    history.start_dates
+    history.latest           → most recent CycleRecord or None
+    history.stats            → CycleStats row (one query)
+    history.phase(today)     → ("Follicular", 9)
+    history.recent_gaps(n)   → newest first
+    history.irregularity()
+
+Within a request (RequestMemoMiddleware) or a background task, the same
+object is returned for the same user, so each query runs at most once no
+matter how many engines ask. Cycle writes drop the user's entry
+(signal in models.py). Outside a scope every call gets a fresh object.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+from .cycle_stats import get_stats
+from .models import CycleRecord
+
+
+_memo = ContextVar("cycle_history_memo", default=None)
+
+
+class CycleHistory:
+
+    def __init__(self, profile_id):
+        self.profile_id = profile_id
+        self._records = None
+        self._stats = None
+
+    # ── data (lazy, once each) ────────────────────────────────
+    @property
+    def records(self):
+        if self._records is None:
+            self._records = list(
+                CycleRecord.objects.filter(user_id=self.profile_id, predicted=False)
+                .order_by("start_date", "pk")
+            )
+        return self._records
+
+    @property
+    def stats(self):
+        if self._stats is None:
+            self._stats = get_stats(self.profile_id)
+        return self._stats
+
+    # ── views ─────────────────────────────────────────────────
+    @property
+    def start_dates(self):
+        return [r.start_date for r in self.records]
+
+    @property
+    def latest(self):
+        return self.records[-1] if self.records else None
+
+    @property
+    def cycle_count(self):
+        return self.stats.cycle_count
+
+    @property
+    def last_start(self):
+        return self.stats.last_start
+
+    def recent_gaps(self, n):
+        return self.stats.recent_gaps[:n]
+
+    def phase(self, today=None):
+        if not self.last_start:
+            return "Unknown", None
+
+        today = today or datetime.now().date()
+        day = (today - self.last_start).days + 1
+
+        if day <= 5:
+            phase = "Menstrual"
+        elif day <= 13:
+            phase = "Follicular"
+        elif day <= 16:
+            phase = "Ovulation"
+        else:
+            phase = "Luteal"
+
+        return phase, day
+
+    def irregularity(self):
+        if self.cycle_count < 2:
+            return {"irregular": False, "note": "Not enough data"}
+
+        # Last three cycles, oldest gap first
+        lengths = self.recent_gaps(2)[::-1]
+
+        return {
+            "irregular": self.stats.irregular,
+            "lengths": lengths,
+            "variance": max(lengths) - min(lengths),
+            "average_length": round(self.stats.gap_mean, 1),
+            "std_dev": round(self.stats.gap_std, 1)
+        }
+
+
+# ============================================================
+# MEMO SCOPE
+# ============================================================
+
+@contextmanager
+def scope():
+    """Share CycleHistory objects for the duration of a request / task."""
+    token = _memo.set({})
+    try:
+        yield
+    finally:
+        _memo.reset(token)
+
+
+def for_profile(profile_id):
+    memo = _memo.get()
+    if memo is None:
+        return CycleHistory(profile_id)
+
+    history = memo.get(profile_id)
+    if history is None:
+        history = memo[profile_id] = CycleHistory(profile_id)
+    return history
+
+
+def invalidate(profile_id):
+    memo = _memo.get()
+    if memo is not None:
+        memo.pop(profile_id, None)
@@ -0,0 +1,303 @@
+"""
+Cycle History Import
+--------------------
+Bulk import of period history exported from other trackers.
+
+Formats (auto-detected, or pass fmt="csv" / "json"):
+• CSV with a header row
+• JSON array of objects, JSON lines, or {"cycles": [...]}-style wrappers
+
+Column names are matched loosely (start_date, Start Date, startDate,
+period_start, ...). Rows are parsed as a stream, validated in batches,
+deduplicated against existing and already-imported start dates within
+`tolerance` days, and written with bulk_create. Signals don't fire for
+bulk_create, so stats, caches and insights are refreshed once at the end.
+"""
+
+import bisect
+import codecs
+import csv
+import json
+import re
+from datetime import datetime
+
+from django.db import transaction
+
+from . import cycle_history, jobs
+from .cycle_stats import rebuild
+from .models import CycleRecord
+
+
+BATCH_SIZE = 500
+MAX_ERRORS = 50
+DEFAULT_TOLERANCE = 3
+
+FIELD_ALIASES = {
+    "start_date": ("start_date", "start", "period_start", "period_start_date", "started", "date", "from"),
+    "end_date": ("end_date", "end", "period_end", "period_end_date", "ended", "to"),
+    "flow_intensity": ("flow_intensity", "flow", "intensity"),
+    "symptoms": ("symptoms", "symptom", "tags"),
+    "notes": ("notes", "note", "comment", "comments"),
+}
+FLOW_WORDS = {"very light": 1, "spotting": 1, "light": 2, "medium": 3, "normal": 3, "heavy": 4, "very heavy": 5}
+DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%d.%m.%Y")
+
+
+class ImportFormatError(ValueError):
+    """The file could not be read as CSV or JSON."""
+
+
+# ============================================================
+# READING
+# ============================================================
+
+def _normalize_key(key):
+    key = re.sub(r"(?<=[a-z0-9])([A-Z])", r"_\1", str(key).strip())
+    return re.sub(r"[\s\-]+", "_", key).lower()
+
+
+def _chunks(stream, size=64 * 1024):
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    while True:
+        data = stream.read(size)
+        if not data:
+            break
+        yield decoder.decode(data) if isinstance(data, bytes) else data
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def _lines(stream):
+    buffer = ""
+    for chunk in _chunks(stream):
+        buffer += chunk
+        *lines, buffer = buffer.split("\n")
+        yield from lines
+    if buffer:
+        yield buffer
+
+
+def _iter_csv(stream):
+    reader = csv.DictReader(_lines(stream))
+    if not reader.fieldnames:
+        return
+    for row in reader:
+        yield row
+
+
+def _iter_json(stream):
+    """
+    Streams a top-level array (or JSON lines) one object at a time with
+    raw_decode; a top-level object is read whole and its first list used.
+    """
+    decoder = json.JSONDecoder()
+    chunks = _chunks(stream)
+    buffer = ""
+    pos = 0
+    started = False
+
+    def fill():
+        nonlocal buffer, pos
+        chunk = next(chunks, None)
+        if chunk is None:
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(buffer):
+            if not fill():
+                return
+            continue
+
+        char = buffer[pos]
+        if char == "[" and not started:
+            started = True
+            pos += 1
+            continue
+        if char == "]":
+            return
+
+        try:
+            obj, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if not fill():
+                raise ImportFormatError("Invalid JSON")
+            continue
+
+        # Whole buffer parsed but the object may continue in the next chunk
+        if end == len(buffer) and fill():
+            continue
+        pos = end
+        started = True
+
+        if isinstance(obj, dict) and not _looks_like_cycle(obj):
+            for value in obj.values():
+                if isinstance(value, list):
+                    yield from value
+                    break
+            continue
+        yield obj
+
+
+def _looks_like_cycle(obj):
+    keys = {_normalize_key(k) for k in obj}
+    return bool(keys & set(FIELD_ALIASES["start_date"]))
+
+
+def _sniff(first_bytes):
+    text = first_bytes.decode("utf-8-sig", errors="ignore").lstrip() \
+        if isinstance(first_bytes, bytes) else first_bytes.lstrip()
+    return "json" if text[:1] in ("[", "{") else "csv"
+
+
+class _Rewind:
+    """Puts the sniffed prefix back in front of a non-seekable stream."""
+
+    def __init__(self, head, stream):
+        self.head = head
+        self.stream = stream
+
+    def read(self, size=-1):
+        if self.head:
+            data, self.head = self.head, self.head[:0]
+            return data
+        return self.stream.read(size)
+
+
+# ============================================================
+# VALIDATION
+# ============================================================
+
+def _parse_date(value, date_format=None):
+    if value in (None, ""):
+        return None
+    text = str(value).strip()
+    formats = (date_format,) if date_format else DATE_FORMATS
+    for fmt in formats:
+        try:
+            return datetime.strptime(text if date_format else text[:10], fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date: {text!r}")
+
+
+def _parse_flow(value):
+    if value in (None, ""):
+        return None
+    text = str(value).strip().lower()
+    if text in FLOW_WORDS:
+        return FLOW_WORDS[text]
+    flow = int(float(text))
+    if not 1 <= flow <= 5:
+        raise ValueError(f"Flow must be 1-5, got {flow}")
+    return flow
+
+
+def _parse_symptoms(value):
+    if value in (None, ""):
+        return []
+    if isinstance(value, list):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [s.strip() for s in re.split(r"[;,|]", str(value)) if s.strip()]
+
+
+def _clean(raw, date_format=None):
+    row = {_normalize_key(k): v for k, v in raw.items() if k is not None}
+
+    def pick(field):
+        for alias in FIELD_ALIASES[field]:
+            if row.get(alias) not in (None, ""):
+                return row[alias]
+        return None
+
+    start = _parse_date(pick("start_date"), date_format)
+    if start is None:
+        raise ValueError("Missing start date")
+    end = _parse_date(pick("end_date"), date_format)
+    if end and end < start:
+        raise ValueError("End date is before start date")
+
+    return {
+        "start_date": start,
+        "end_date": end,
+        "flow_intensity": _parse_flow(pick("flow_intensity")),
+        "symptoms": _parse_symptoms(pick("symptoms")),
+        "notes": str(pick("notes") or "")[:2000],
+    }
+
+
+# ============================================================
+# IMPORT
+# ============================================================
+
+def _is_duplicate(known, start, tolerance):
+    """known: sorted ordinals of start dates already present."""
+    ordinal = start.toordinal()
+    i = bisect.bisect_left(known, ordinal - tolerance)
+    return i < len(known) and known[i] <= ordinal + tolerance
+
+
+def import_cycles(profile, stream, fmt=None, tolerance=DEFAULT_TOLERANCE,
+                  date_format=None, dry_run=False):
+    """
+    Import cycles for `profile` from a binary/text stream.
+    Returns {"imported", "duplicates", "invalid", "errors"}.
+    """
+    if fmt is None:
+        head = stream.read(512)
+        fmt = _sniff(head or b"")
+        stream = _Rewind(head or b"", stream)
+
+    rows = _iter_json(stream) if fmt == "json" else _iter_csv(stream)
+
+    known = sorted(
+        d.toordinal() for d in
+        CycleRecord.objects.filter(user=profile, predicted=False)
+        .values_list("start_date", flat=True)
+    )
+
+    summary = {"imported": 0, "duplicates": 0, "invalid": 0, "errors": []}
+    batch = []
+
+    def flush():
+        if batch and not dry_run:
+            CycleRecord.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+        summary["imported"] += len(batch)
+        batch.clear()
+
+    with transaction.atomic():
+        for number, raw in enumerate(rows, start=1):
+            try:
+                if not isinstance(raw, dict):
+                    raise ValueError("Expected an object per cycle")
+                data = _clean(raw, date_format)
+            except (ValueError, TypeError) as e:
+                summary["invalid"] += 1
+                if len(summary["errors"]) < MAX_ERRORS:
+                    summary["errors"].append({"row": number, "error": str(e)})
+                continue
+
+            if _is_duplicate(known, data["start_date"], tolerance):
+                summary["duplicates"] += 1
+                continue
+
+            bisect.insort(known, data["start_date"].toordinal())
+            batch.append(CycleRecord(user=profile, **data))
+            if len(batch) >= BATCH_SIZE:
+                flush()
+        flush()
+
+        if summary["imported"] and not dry_run:
+            rebuild(profile.id)
+            profile.bump_data_version()
+
+    if summary["imported"] and not dry_run:
+        cycle_history.invalidate(profile.id)
+        jobs.refresh_insight(profile.id)
+
+    return summary
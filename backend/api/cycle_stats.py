@@ -0,0 +1,171 @@
+"""
+Incremental Cycle Statistics
+----------------------------
+Maintains one CycleStats row per user from CycleRecord writes:
+
+• insert a start date  → the gap it splits is removed, its new gaps added
+• delete a start date  → its gaps removed, the bridging gap added
+• move a start date    → delete old position + insert new one
+
+Mean / variance are updated with Welford's online algorithm, so each
+write touches only the neighbouring records, never the whole history.
+rebuild() recomputes from scratch (repair / backfill; see the
+rebuild_cycle_stats management command).
+"""
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import CycleRecord, CycleStats
+
+
+RECENT_GAPS = 6
+
+# Irregular when the last two gaps differ by more than a week. The spread
+# of the whole history is exposed separately (gap_std), not folded in here.
+IRREGULAR_RANGE_DAYS = 7
+
+
+# ============================================================
+# WELFORD
+# ============================================================
+
+def _add_gap(stats, gap):
+    stats.gap_count += 1
+    delta = gap - stats.gap_mean
+    stats.gap_mean += delta / stats.gap_count
+    stats.gap_m2 += delta * (gap - stats.gap_mean)
+
+
+def _remove_gap(stats, gap):
+    if stats.gap_count <= 1:
+        stats.gap_count, stats.gap_mean, stats.gap_m2 = 0, 0.0, 0.0
+        return
+    stats.gap_count -= 1
+    delta = gap - stats.gap_mean
+    stats.gap_mean -= delta / stats.gap_count
+    stats.gap_m2 = max(0.0, stats.gap_m2 - delta * (gap - stats.gap_mean))
+
+
+# ============================================================
+# NEIGHBOURS (ordered by start_date, then id)
+# ============================================================
+
+def _logged(user_id, exclude_pk):
+    return CycleRecord.objects.filter(user_id=user_id, predicted=False).exclude(pk=exclude_pk)
+
+
+def _neighbours(user_id, pk, start):
+    qs = _logged(user_id, pk)
+    prev = qs.filter(
+        Q(start_date__lt=start) | Q(start_date=start, pk__lt=pk)
+    ).order_by("-start_date", "-pk").values_list("start_date", flat=True).first()
+    nxt = qs.filter(
+        Q(start_date__gt=start) | Q(start_date=start, pk__gt=pk)
+    ).order_by("start_date", "pk").values_list("start_date", flat=True).first()
+    return prev, nxt
+
+
+def _splice(stats, user_id, pk, start, sign):
+    """sign=+1 inserts `start` between its neighbours, -1 removes it."""
+    prev, nxt = _neighbours(user_id, pk, start)
+    bridged = [(nxt - prev).days] if prev and nxt else []
+    own = []
+    if prev:
+        own.append((start - prev).days)
+    if nxt:
+        own.append((nxt - start).days)
+
+    added, removed = (own, bridged) if sign > 0 else (bridged, own)
+    for gap in removed:
+        _remove_gap(stats, gap)
+    for gap in added:
+        _add_gap(stats, gap)
+    stats.cycle_count = max(0, stats.cycle_count + sign)
+
+
+def _refresh_tail(stats):
+    starts = list(
+        CycleRecord.objects.filter(user_id=stats.user_id, predicted=False)
+        .order_by("-start_date", "-pk")
+        .values_list("start_date", flat=True)[:RECENT_GAPS + 1]
+    )
+    stats.last_start = starts[0] if starts else None
+    stats.recent_gaps = [(a - b).days for a, b in zip(starts, starts[1:])]
+
+    recent = stats.recent_gaps[:2]
+    stats.irregular = len(recent) == 2 and max(recent) - min(recent) > IRREGULAR_RANGE_DAYS
+
+
+def _locked_stats(user_id):
+    return CycleStats.objects.select_for_update().filter(user_id=user_id).first()
+
+
+# ============================================================
+# SIGNAL ENTRY POINTS
+# ============================================================
+
+def record_saved(record, old_start=None, created=False):
+    if record.predicted:
+        return
+    if not created and old_start == record.start_date:
+        return
+
+    with transaction.atomic():
+        stats = _locked_stats(record.user_id)
+        if stats is None:
+            # First write for this user (or legacy data): build from scratch
+            rebuild(record.user_id)
+            return
+        if not created and old_start is not None:
+            _splice(stats, record.user_id, record.pk, old_start, -1)
+        _splice(stats, record.user_id, record.pk, record.start_date, +1)
+        _refresh_tail(stats)
+        stats.save()
+
+
+def record_deleted(record):
+    if record.predicted:
+        return
+
+    with transaction.atomic():
+        stats = _locked_stats(record.user_id)
+        if stats is None:
+            # Nothing maintained yet (or the user is being deleted)
+            return
+        _splice(stats, record.user_id, record.pk, record.start_date, -1)
+        _refresh_tail(stats)
+        stats.save()
+
+
+# ============================================================
+# READ / REPAIR
+# ============================================================
+
+def rebuild(user_id):
+    """Recompute a user's stats from every logged cycle."""
+    starts = list(
+        CycleRecord.objects.filter(user_id=user_id, predicted=False)
+        .order_by("start_date", "pk")
+        .values_list("start_date", flat=True)
+    )
+
+    with transaction.atomic():
+        CycleStats.objects.get_or_create(user_id=user_id)
+        stats = _locked_stats(user_id)
+        stats.cycle_count = len(starts)
+        stats.gap_count, stats.gap_mean, stats.gap_m2 = 0, 0.0, 0.0
+        for a, b in zip(starts, starts[1:]):
+            _add_gap(stats, (b - a).days)
+        _refresh_tail(stats)
+        stats.save()
+
+    return stats
+
+
+def get_stats(user_id):
+    """The user's stats row, built on first access for pre-existing data."""
+    stats = CycleStats.objects.filter(user_id=user_id).first()
+    if stats is None:
+        stats = rebuild(user_id)
+    return stats
@@ -0,0 +1,165 @@
+"""
+Per-User Data Export
+--------------------
+Everything stored for one user, streamed:
+
+    ndjson  one JSON object per line, tagged {"type": "<dataset>", ...}
+    csv     one dataset as a CSV table (?dataset=cycles)
+    zip     one CSV per dataset, compressed on the fly
+
+Each dataset is read with values_list(...).iterator(chunk_size=CHUNK_SIZE)
+and rows are encoded as they arrive, so memory stays flat no matter how
+many years of data a user has. The zip is written to a non-seekable sink
+(entries use data descriptors) that is drained after every chunk.
+"""
+
+import csv
+import io
+import json
+import zipfile
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import (
+    ChatSession,
+    CycleInsight,
+    CycleRecord,
+    HealthMetric,
+    PhenotypeResult,
+    SymptomLog,
+    UserProfile,
+)
+
+
+CHUNK_SIZE = 2000
+FORMATS = ("ndjson", "csv", "zip")
+
+# name → (model, queryset for a profile); order is the export order
+DATASETS = {
+    "profile": (UserProfile, lambda p: UserProfile.objects.filter(pk=p.pk)),
+    "symptom_logs": (SymptomLog, lambda p: SymptomLog.objects.filter(user=p)),
+    "results": (PhenotypeResult, lambda p: PhenotypeResult.objects.filter(symptom_log__user=p)),
+    "cycles": (CycleRecord, lambda p: CycleRecord.objects.filter(user=p, predicted=False)),
+    "metrics": (HealthMetric, lambda p: HealthMetric.objects.filter(user=p)),
+    "insights": (CycleInsight, lambda p: CycleInsight.objects.filter(user=p)),
+    "chat": (ChatSession, lambda p: ChatSession.objects.filter(user=p)),
+}
+
+# Internal bookkeeping, not user data
+EXCLUDED_FIELDS = {"user", "data_version", "predicted"}
+
+
+def fields(model):
+    return [
+        f.attname for f in model._meta.concrete_fields
+        if f.name not in EXCLUDED_FIELDS
+    ]
+
+
+def iter_rows(profile, name):
+    """(field names, row tuples) for one dataset, streamed from the DB."""
+    model, queryset = DATASETS[name]
+    names = fields(model)
+    rows = queryset(profile).order_by("pk").values_list(*names).iterator(chunk_size=CHUNK_SIZE)
+    return names, rows
+
+
+# ============================================================
+# ENCODERS
+# ============================================================
+
+_json = DjangoJSONEncoder(ensure_ascii=False)
+
+
+def _cell(value):
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return "" if value is None else value
+
+
+class _LineBuffer:
+    """File-like target for csv.writer; hands back what was written."""
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, text):
+        self.parts.append(text)
+
+    def take(self):
+        text = "".join(self.parts)
+        self.parts = []
+        return text
+
+
+def _csv_chunks(names, rows):
+    buffer = _LineBuffer()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    pending = 0
+    for row in rows:
+        writer.writerow([_cell(v) for v in row])
+        pending += 1
+        if pending >= CHUNK_SIZE:
+            yield buffer.take().encode()
+            pending = 0
+    yield buffer.take().encode()
+
+
+def stream_ndjson(profile):
+    for name in DATASETS:
+        names, rows = iter_rows(profile, name)
+        lines = []
+        for row in rows:
+            lines.append(_json.encode({"type": name, **dict(zip(names, row))}))
+            if len(lines) >= CHUNK_SIZE:
+                yield ("\n".join(lines) + "\n").encode()
+                lines = []
+        if lines:
+            yield ("\n".join(lines) + "\n").encode()
+
+
+def stream_csv(profile, name):
+    yield from _csv_chunks(*iter_rows(profile, name))
+
+
+class _Sink(io.RawIOBase):
+    """Write-only, non-seekable target for ZipFile; drained by the caller."""
+
+    def __init__(self):
+        self.parts = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self.parts)
+        self.parts = []
+        return data
+
+
+def stream_zip(profile):
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name in DATASETS:
+            with archive.open(f"{name}.csv", "w", force_zip64=True) as entry:
+                for chunk in _csv_chunks(*iter_rows(profile, name)):
+                    entry.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+    # Remaining entry trailers + central directory
+    yield sink.drain()
+
+
+def stream(profile, fmt="ndjson", dataset=None):
+    """Generator of bytes for the requested format."""
+    if fmt == "zip":
+        return stream_zip(profile)
+    if fmt == "csv":
+        return stream_csv(profile, dataset)
+    return stream_ndjson(profile)
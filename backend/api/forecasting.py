@@ -0,0 +1,170 @@
+"""
+Cycle Forecasting Engine
+------------------------
+Forecasts the next N periods from a user's full logged history.
+
+• Gaps between consecutive start dates, vectorized in NumPy
+• Outliers (missed logs, one-off disruptions) dropped with a
+  median / MAD test before fitting
+• Recency weighting: a gap's weight halves every HALF_LIFE cycles
+• Per period k: start date, ovulation (next start − LUTEAL_DAYS),
+  fertile window and an interval that widens with √k
+
+One forecast per user + data version (api/cache.py), so calendar views
+can ask for a year ahead on every render for the cost of a cache hit.
+materialize() writes the forecast as CycleRecord(predicted=True) rows.
+"""
+
+from datetime import timedelta
+
+import numpy as np
+
+from django.db import transaction
+
+from . import cycle_history
+from .cache import user_cached
+from .cycle_stats import get_stats
+from .models import CycleRecord, CycleStats
+
+
+HALF_LIFE = 6            # cycles
+MAD_CUTOFF = 3.5         # robust z-score beyond which a gap is an outlier
+MIN_GAP, MAX_GAP = 15, 120
+LUTEAL_DAYS = 14
+FERTILE_BEFORE, FERTILE_AFTER = 5, 1
+INTERVAL_Z = 1.2816      # 80% interval
+MIN_SD = 1.0             # days; floor so short histories still get a range
+MAX_PERIODS = 24
+
+
+# ============================================================
+# FIT
+# ============================================================
+
+def fit(starts):
+    """
+    starts: ascending start dates. Returns (mean, sd, n_used) or None when
+    fewer than two cycles are logged.
+    """
+    if len(starts) < 2:
+        return None
+
+    ordinals = np.fromiter((d.toordinal() for d in starts), dtype=np.int64, count=len(starts))
+    gaps = np.diff(ordinals).astype(float)
+
+    keep = (gaps >= MIN_GAP) & (gaps <= MAX_GAP)
+    if gaps.size >= 4:
+        median = np.median(gaps)
+        mad = np.median(np.abs(gaps - median)) * 1.4826
+        if mad > 0:
+            keep &= np.abs(gaps - median) / mad <= MAD_CUTOFF
+    if not keep.any():
+        # Everything looks odd: fall back to the raw gaps
+        keep = np.ones_like(gaps, dtype=bool)
+
+    # Age 0 = most recent gap
+    ages = np.arange(gaps.size - 1, -1, -1)
+    weights = 0.5 ** (ages / HALF_LIFE) * keep
+
+    mean = float(np.average(gaps, weights=weights))
+    sd = float(np.sqrt(np.average((gaps - mean) ** 2, weights=weights)))
+    return mean, sd, int(keep.sum())
+
+
+# ============================================================
+# FORECAST
+# ============================================================
+
+def _compute(starts, periods):
+    fitted = fit(starts)
+    if fitted is None:
+        return None
+
+    mean, sd, n_used = fitted
+    last = starts[-1]
+
+    # Uncertainty of k cycles ahead: k independent gaps + error in the mean
+    ks = np.arange(1, periods + 2)
+    spread_sd = np.sqrt(ks * max(sd, MIN_SD) ** 2 + (ks * max(sd, MIN_SD)) ** 2 / max(n_used, 1))
+    offsets = np.rint(ks * mean).astype(int)
+    margins = np.rint(INTERVAL_Z * spread_sd).astype(int)
+
+    # Ovulation of period k happens LUTEAL_DAYS before period k+1
+    ovulation = offsets[1:] - LUTEAL_DAYS
+
+    forecasts = []
+    for i in range(periods):
+        start = last + timedelta(days=int(offsets[i]))
+        ov = last + timedelta(days=int(ovulation[i]))
+        forecasts.append({
+            "start_date": start,
+            "earliest": start - timedelta(days=int(margins[i])),
+            "latest": start + timedelta(days=int(margins[i])),
+            "ovulation_date": ov,
+            "fertile_start": ov - timedelta(days=FERTILE_BEFORE),
+            "fertile_end": ov + timedelta(days=FERTILE_AFTER),
+        })
+
+    current_ovulation = last + timedelta(days=int(offsets[0]) - LUTEAL_DAYS)
+
+    return {
+        "last_period_date": last,
+        "average_cycle_length": round(mean, 1),
+        "cycle_length_sd": round(sd, 1),
+        "cycles_used": n_used,
+        "current_cycle": {
+            "ovulation_date": current_ovulation,
+            "fertile_start": current_ovulation - timedelta(days=FERTILE_BEFORE),
+            "fertile_end": current_ovulation + timedelta(days=FERTILE_AFTER),
+        },
+        "forecasts": forecasts,
+        "interval": "80%",
+    }
+
+
+def forecast(profile, periods=1):
+    """
+    Next `periods` cycles for `profile`, or None with fewer than two
+    logged cycles. MAX_PERIODS are computed and cached once (until the
+    next cycle / metric write); shorter requests are slices of it.
+    """
+    periods = max(1, min(int(periods), MAX_PERIODS))
+
+    def compute():
+        starts = cycle_history.for_profile(profile.id).start_dates
+        return _compute(starts, MAX_PERIODS)
+
+    result = user_cached(profile, "forecast", compute)
+    if result is None:
+        return None
+    return {**result, "forecasts": result["forecasts"][:periods]}
+
+
+# ============================================================
+# MATERIALIZED FORECAST ROWS
+# ============================================================
+
+def materialize(profile):
+    """
+    Replace the user's predicted CycleRecords with the current forecast.
+    A no-op (and, once cached, query-free) until the next data write.
+    """
+    def compute():
+        get_stats(profile.id)   # make sure the row exists
+
+        with transaction.atomic():
+            stats = CycleStats.objects.select_for_update().get(user=profile)
+            if stats.forecast_version == profile.data_version:
+                return True
+
+            fc = forecast(profile, MAX_PERIODS)
+            CycleRecord.objects.filter(user=profile, predicted=True).delete()
+            if fc:
+                CycleRecord.objects.bulk_create([
+                    CycleRecord(user=profile, start_date=f["start_date"], predicted=True)
+                    for f in fc["forecasts"]
+                ])
+            CycleStats.objects.filter(pk=stats.pk).update(forecast_version=profile.data_version)
+        return True
+
+    user_cached(profile, "forecast_rows", compute)
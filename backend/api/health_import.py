@@ -0,0 +1,306 @@
+"""
+Phone Health Export Import
+--------------------------
+Seeds weight, sleep and exercise HealthMetrics from:
+
+• Apple Health  — export.xml (or the export.zip it ships in)
+• Google Fit    — Takeout "All Data" JSON files ({"Data Points": [...]})
+
+Both are read incrementally: iterparse with the root cleared after every
+<Record>, and a chunked JSON scanner that decodes one data point at a
+time. Readings are folded into per-day buckets as they stream past, so
+memory grows with the number of days covered, never with file size:
+
+    weight            → latest reading of the day (lb converted to kg)
+    sleep             → hours asleep, overlapping samples merged, by wake day
+    exercise_minutes  → sum for the day
+
+Buckets are written with chunked bulk upserts (metric_ingest.bulk_upsert).
+"""
+
+import codecs
+import json
+import zipfile
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+from xml.etree.ElementTree import iterparse
+
+from django.utils import timezone
+
+from .metric_ingest import METRIC_RANGES, bulk_upsert
+from .models import HealthMetric
+
+
+LB_TO_KG = 0.45359237
+
+APPLE_QUANTITIES = {
+    "HKQuantityTypeIdentifierBodyMass": "weight",
+    "HKQuantityTypeIdentifierAppleExerciseTime": "exercise_minutes",
+}
+APPLE_SLEEP = "HKCategoryTypeIdentifierSleepAnalysis"
+APPLE_ASLEEP_PREFIX = "HKCategoryValueSleepAnalysisAsleep"
+
+FIT_WEIGHT = "com.google.weight"
+FIT_SLEEP = "com.google.sleep.segment"
+FIT_ACTIVE_MINUTES = "com.google.active_minutes"
+FIT_ASLEEP_STAGES = {2, 4, 5, 6}     # sleep, light, deep, REM
+
+SOURCES = ("apple", "google_fit")
+
+
+class HealthImportError(ValueError):
+    """The export could not be read."""
+
+
+# ============================================================
+# DAY BUCKETS
+# ============================================================
+
+class DayBuckets:
+    """Per (day, metric_type) accumulators; one small entry per day."""
+
+    def __init__(self):
+        self.latest = {}                    # weight: key → (timestamp, value)
+        self.sums = defaultdict(float)      # exercise minutes
+        self.intervals = defaultdict(list)  # sleep: key → [(start, end)]
+        self.readings = 0
+
+    def last(self, day, metric, when, value):
+        key = (day, metric)
+        if key not in self.latest or when >= self.latest[key][0]:
+            self.latest[key] = (when, value)
+        self.readings += 1
+
+    def add(self, day, metric, value):
+        self.sums[(day, metric)] += value
+        self.readings += 1
+
+    def interval(self, day, metric, start, end):
+        if end > start:
+            self.intervals[(day, metric)].append((start, end))
+            self.readings += 1
+
+    def rows(self):
+        """(day, metric_type, value) per bucket, oldest first."""
+        values = {key: value for key, (_, value) in self.latest.items()}
+        values.update(self.sums)
+        for key, spans in self.intervals.items():
+            values[key] = _merged_seconds(spans) / 3600
+
+        for (day, metric) in sorted(values):
+            yield day, metric, round(values[(day, metric)], 2)
+
+
+def _merged_seconds(spans):
+    """Length of the union of (start, end) datetime spans, in seconds."""
+    total = 0.0
+    current_start = current_end = None
+    for start, end in sorted(spans):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += (current_end - current_start).total_seconds()
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += (current_end - current_start).total_seconds()
+    return total
+
+
+# ============================================================
+# APPLE HEALTH
+# ============================================================
+
+def _apple_time(text):
+    # "2024-01-31 07:12:44 +0100"
+    return datetime.strptime(text, "%Y-%m-%d %H:%M:%S %z")
+
+
+def _read_apple(stream, buckets):
+    context = iterparse(stream, events=("start", "end"))
+    _, root = next(context)
+    depth = 0
+
+    for event, elem in context:
+        if event == "start":
+            depth += 1
+            continue
+        depth -= 1
+        if depth:
+            continue    # still inside a top-level element (e.g. MetadataEntry)
+
+        if elem.tag == "Record":
+            _apple_record(elem, buckets)
+
+        # Drop every finished top-level element and its children
+        root.clear()
+
+
+def _apple_record(elem, buckets):
+    kind = elem.get("type")
+    try:
+        if kind in APPLE_QUANTITIES:
+            metric = APPLE_QUANTITIES[kind]
+            value = float(elem.get("value"))
+            start = _apple_time(elem.get("startDate"))
+            if metric == "weight":
+                if elem.get("unit") == "lb":
+                    value *= LB_TO_KG
+                buckets.last(start.date(), metric, start, value)
+            else:
+                buckets.add(start.date(), metric, value)
+
+        elif kind == APPLE_SLEEP and (elem.get("value") or "").startswith(APPLE_ASLEEP_PREFIX):
+            start, end = _apple_time(elem.get("startDate")), _apple_time(elem.get("endDate"))
+            buckets.interval(end.date(), "sleep", start, end)
+    except (TypeError, ValueError):
+        pass
+
+
+# ============================================================
+# GOOGLE FIT
+# ============================================================
+
+def _iter_json_array(stream, key, size=64 * 1024):
+    """Yield the items of the array stored under `key`, one at a time."""
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8-sig")()
+    marker = json.dumps(key)
+    buffer, pos, inside = "", 0, False
+
+    def fill():
+        nonlocal buffer, pos
+        data = stream.read(size)
+        if not data:
+            return False
+        buffer = buffer[pos:] + (text.decode(data) if isinstance(data, bytes) else data)
+        pos = 0
+        return True
+
+    while not inside:
+        found = buffer.find(marker, pos)
+        if found >= 0:
+            bracket = buffer.find("[", found)
+            if bracket >= 0:
+                pos, inside = bracket + 1, True
+                continue
+            pos = found
+        else:
+            pos = max(pos, len(buffer) - len(marker))
+        if not fill():
+            raise HealthImportError(f"No {key!r} array found")
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(buffer):
+            if not fill():
+                raise HealthImportError("Unexpected end of file")
+            continue
+        if buffer[pos] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if not fill():
+                raise HealthImportError("Invalid JSON")
+            continue
+        pos = end
+        yield item
+
+
+def _fit_time(nanos):
+    moment = datetime.fromtimestamp(int(nanos) / 1e9, tz=dt_timezone.utc)
+    return timezone.localtime(moment)
+
+
+def _fit_value(point):
+    value = (point.get("fitValue") or [{}])[0].get("value", {})
+    return value.get("fpVal", value.get("intVal"))
+
+
+def _read_google_fit(stream, buckets):
+    for point in _iter_json_array(stream, "Data Points"):
+        try:
+            kind = point.get("dataTypeName")
+            value = _fit_value(point)
+            if value is None:
+                continue
+            start = _fit_time(point["startTimeNanos"])
+
+            if kind == FIT_WEIGHT:
+                buckets.last(start.date(), "weight", start, float(value))
+            elif kind == FIT_ACTIVE_MINUTES:
+                buckets.add(start.date(), "exercise_minutes", float(value))
+            elif kind == FIT_SLEEP and int(value) in FIT_ASLEEP_STAGES:
+                end = _fit_time(point["endTimeNanos"])
+                buckets.interval(end.date(), "sleep", start, end)
+        except (AttributeError, KeyError, TypeError, ValueError):
+            continue
+
+
+# ============================================================
+# ENTRY POINT
+# ============================================================
+
+def detect_source(filename):
+    name = (filename or "").lower()
+    if name.endswith((".xml", ".zip")):
+        return "apple"
+    if name.endswith(".json"):
+        return "google_fit"
+    return None
+
+
+def _open_apple(stream):
+    """export.zip → the export.xml member, streamed; plain XML as is."""
+    if zipfile.is_zipfile(stream):
+        stream.seek(0)
+        archive = zipfile.ZipFile(stream)
+        members = [n for n in archive.namelist() if n.endswith("/export.xml") or n == "export.xml"]
+        if not members:
+            raise HealthImportError("export.xml not found in archive")
+        return archive.open(members[0])
+    stream.seek(0)
+    return stream
+
+
+def import_health_export(profile, stream, source, overwrite=True):
+    """
+    Import an Apple Health / Google Fit export for `profile`.
+    Returns {"readings", "days", "written", "metrics": {type: days}}.
+    """
+    if source not in SOURCES:
+        raise HealthImportError(f"source must be one of {', '.join(SOURCES)}")
+
+    buckets = DayBuckets()
+    try:
+        if source == "apple":
+            _read_apple(_open_apple(stream), buckets)
+        else:
+            _read_google_fit(stream, buckets)
+    except SyntaxError as e:    # xml.etree.ElementTree.ParseError
+        raise HealthImportError(f"Invalid XML: {e}")
+
+    per_metric = defaultdict(int)
+    days = set()
+
+    def rows():
+        for day, metric, value in buckets.rows():
+            low, high = METRIC_RANGES[metric]
+            if low <= value <= high:
+                per_metric[metric] += 1
+                days.add(day)
+                yield HealthMetric(
+                    user=profile, date=day, metric_type=metric, value=value,
+                    notes=f"Imported from {source.replace('_', ' ').title()}"
+                )
+
+    written = bulk_upsert(profile, rows(), overwrite=overwrite)
+
+    return {
+        "readings": buckets.readings,
+        "days": len(days),
+        "written": written,
+        "metrics": dict(per_metric),
+    }
@@ -6,6 +6,8 @@ Full health companion endpoints.
 ✔ Supports ?user_id=demo_user for testing
 ✔ Includes ALL endpoints used in urls.py
 """
+import csv
+
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 
@@ -13,9 +15,22 @@ from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from django.conf import settings
+from django.db.models import Avg, Case, Count, F, FloatField, Q, RowRange, Sum, When, Window
+from django.db.models.functions import LastValue
+from django.utils import timezone
 from datetime import datetime, timedelta
 
-from .insights import generate_cycle_insight
+from . import cycle_calendar as cycle_calendar_service
+from . import articles, cycle_import, export, health_import, metric_analytics, metric_ingest, metric_rollups, trends
+from . import jobs, search, tasks, view_counts
+from .cache import user_cached
+from .forecasting import forecast
+from .insights import create_insight
 from .models import (
     UserProfile,
     CycleRecord,
@@ -82,6 +97,7 @@ def log_cycle(request):
     serializer = CycleRecordSerializer(data=data)
     if serializer.is_valid():
         serializer.save()
+        jobs.refresh_insight(profile.id)
         return Response(serializer.data, status=201)
 
     return Response(serializer.errors, status=400)
@@ -98,50 +114,140 @@ def list_cycles(request):
     except:
         limit = 10
 
-    cycles = CycleRecord.objects.filter(user=profile).order_by("-start_date")[:limit]
-    return Response(CycleRecordSerializer(cycles, many=True).data)
+    def compute():
+        cycles = CycleRecord.objects.filter(user=profile, predicted=False).order_by("-start_date")[:limit]
+        return CycleRecordSerializer(cycles, many=True).data
+
+    return Response(user_cached(profile, "cycle_list", compute, limit))
 
 
 @api_view(["GET"])
 def predict_cycle(request):
+    """
+    GET /api/cycle/predict/?cycles=N
+
+    Next period from the full history (api/forecasting.py), plus the next
+    N cycles with ovulation / fertile windows and 80% intervals.
+    """
 
     profile, err = get_profile(request, request.GET.get("user_id"))
     if err: return err
 
-    cycles = CycleRecord.objects.filter(
-        user=profile,
-        predicted=False
-    ).order_by("-start_date")[:4]
+    try:
+        periods = int(request.GET.get("cycles", 1))
+    except ValueError:
+        periods = 1
 
-    if cycles.count() < 2:
+    fc = forecast(profile, periods)
+    if fc is None:
         return Response({
             "error": "Need at least 2 cycles",
             "next_period_date": None,
             "confidence": None
         })
 
-    cycles = list(cycles)[:3]
-    cycles.reverse()
-
-    lengths = [
-        (cycles[i+1].start_date - cycles[i].start_date).days
-        for i in range(len(cycles)-1)
-    ]
-
-    avg = sum(lengths)/len(lengths)
-    predicted = cycles[-1].start_date + timedelta(days=int(avg))
-
-    std = (sum((x-avg)**2 for x in lengths)/len(lengths))**0.5
-    confidence = max(50, min(95, 95 - std*5))
+    predicted = fc["forecasts"][0]["start_date"]
+    confidence = max(50, min(95, 95 - fc["cycle_length_sd"]*5))
 
     return Response({
         "next_period_date": predicted,
-        "average_cycle_length": round(avg,1),
+        "average_cycle_length": fc["average_cycle_length"],
         "confidence": round(confidence,1),
-        "days_until": (predicted - datetime.now().date()).days
+        "days_until": (predicted - datetime.now().date()).days,
+        "cycle_length_sd": fc["cycle_length_sd"],
+        "current_cycle": fc["current_cycle"],
+        "cycles": fc["forecasts"],
+        "interval": fc["interval"]
     })
 
 
+@api_view(["GET"])
+def cycle_calendar(request):
+    """
+    GET /api/cycle/calendar/?from=YYYY-MM-DD&to=YYYY-MM-DD
+
+    Logged + forecast cycles and per-day phase labels for the window.
+    Defaults to the current month and the following year.
+    """
+
+    profile, err = get_profile(request, request.GET.get("user_id"))
+    if err: return err
+
+    today = datetime.now().date()
+    try:
+        start = datetime.strptime(request.GET["from"], "%Y-%m-%d").date() \
+            if request.GET.get("from") else today.replace(day=1)
+        end = datetime.strptime(request.GET["to"], "%Y-%m-%d").date() \
+            if request.GET.get("to") else start + timedelta(days=365)
+    except ValueError:
+        return Response({"error": "Dates must be YYYY-MM-DD"}, status=400)
+
+    if end < start:
+        return Response({"error": "'to' must not be before 'from'"}, status=400)
+    if (end - start).days > cycle_calendar_service.MAX_RANGE_DAYS:
+        return Response(
+            {"error": f"Range is limited to {cycle_calendar_service.MAX_RANGE_DAYS} days"},
+            status=400
+        )
+
+    data = user_cached(
+        profile, "cycle_calendar",
+        lambda: cycle_calendar_service.build(profile, start, end),
+        start, end
+    )
+    return Response(data)
+
+
+@csrf_exempt
+@api_view(["POST"])
+def import_cycles(request):
+    """
+    POST /api/cycle/import/?user_id=&type=csv|json&tolerance=3&date_format=
+
+    Bulk import from another tracker's export: multipart `file`, or the
+    raw CSV / JSON as the request body. Format is sniffed when `type` is
+    omitted. Starts within `tolerance` days of an existing cycle are skipped.
+    """
+
+    profile, err = get_profile(request, request.GET.get("user_id"))
+    if err: return err
+
+    fmt = request.GET.get("type")
+    if fmt not in (None, "csv", "json"):
+        return Response({"error": "type must be csv or json"}, status=400)
+
+    try:
+        tolerance = max(0, int(request.GET.get("tolerance", cycle_import.DEFAULT_TOLERANCE)))
+    except ValueError:
+        return Response({"error": "tolerance must be an integer"}, status=400)
+
+    if request.content_type.startswith("multipart/"):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"error": "No file uploaded"}, status=400)
+        if fmt is None and upload.name.lower().endswith((".csv", ".json", ".ndjson", ".jsonl")):
+            fmt = "csv" if upload.name.lower().endswith(".csv") else "json"
+        stream = upload
+    else:
+        stream = request.stream
+        if stream is None:
+            return Response({"error": "Empty request body"}, status=400)
+        if fmt is None and "json" in request.content_type:
+            fmt = "json"
+
+    try:
+        summary = cycle_import.import_cycles(
+            profile, stream, fmt=fmt, tolerance=tolerance,
+            date_format=request.GET.get("date_format")
+        )
+    except (cycle_import.ImportFormatError, csv.Error, UnicodeDecodeError) as e:
+        return Response({"error": f"Could not read file: {e}"}, status=400)
+
+    print(f"📥 Imported {summary['imported']} cycles for {profile.user.username} "
+          f"({summary['duplicates']} duplicates, {summary['invalid']} invalid)")
+    return Response(summary, status=201 if summary["imported"] else 200)
+
+
 @csrf_exempt
 @api_view(["POST"])
 def delete_cycle(request, cycle_id):
@@ -150,8 +256,9 @@ def delete_cycle(request, cycle_id):
     if err: return err
     
     try:
-        cycle = CycleRecord.objects.get(id=cycle_id, user=profile)
+        cycle = CycleRecord.objects.get(id=cycle_id, user=profile, predicted=False)
         cycle.delete()
+        jobs.refresh_insight(profile.id)
         return Response({"message": "Cycle deleted successfully"}, status=200)
     except CycleRecord.DoesNotExist:
         return Response({"error": "Cycle not found"}, status=404)
@@ -173,104 +280,325 @@ def log_health_metric(request):
     serializer = HealthMetricSerializer(data=data)
     if serializer.is_valid():
         serializer.save()
+        jobs.refresh_insight(profile.id)
         return Response(serializer.data, status=201)
 
     return Response(serializer.errors, status=400)
 
 
+@csrf_exempt
+@api_view(["POST"])
+def bulk_health_metrics(request):
+    """
+    POST /api/health/metrics/bulk/
+    {"metrics": [{"date", "metric_type", "value", "notes"?}, ...]}
+
+    Upsert: an existing (date, metric_type) is overwritten. Returns counts,
+    a one-char-per-row `status` string (c/u/s/x) and errors by row index.
+    """
+
+    payload = request.data
+    items = payload.get("metrics") if isinstance(payload, dict) else payload
+    user_param = payload.get("user") if isinstance(payload, dict) else None
+
+    profile, err = get_profile(request, user_param or request.GET.get("user_id"))
+    if err: return err
+
+    if not isinstance(items, list):
+        return Response({"error": "Expected a list of metrics"}, status=400)
+
+    try:
+        summary = metric_ingest.upsert_metrics(profile, items)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+
+    return Response(summary)
+
+
+@csrf_exempt
+@api_view(["POST"])
+def import_health_export(request):
+    """
+    POST /api/health/import/  (multipart)
+    file=export.zip | export.xml | Google Fit JSON, source=apple|google_fit
+
+    Streams the export into per-day weight / sleep / exercise metrics
+    (api/health_import.py). keep_existing=1 leaves already-logged days alone.
+    For very large exports prefer `manage.py import_health`.
+    """
+
+    profile, err = get_profile(request, request.data.get("user") or request.GET.get("user_id"))
+    if err: return err
+
+    upload = request.FILES.get("file")
+    if upload is None:
+        return Response({"error": "No file uploaded"}, status=400)
+
+    source = request.data.get("source") or health_import.detect_source(upload.name)
+    overwrite = str(request.data.get("keep_existing", "")).lower() not in ("1", "true", "yes")
+
+    try:
+        summary = health_import.import_health_export(profile, upload, source, overwrite=overwrite)
+    except health_import.HealthImportError as e:
+        return Response({"error": str(e)}, status=400)
+
+    print(f"📥 Imported {summary['written']} metric days for {profile.user.username} from {source}")
+    return Response(summary, status=201 if summary["written"] else 200)
+
+
 @api_view(["GET"])
 def health_trends(request):
+    """
+    GET /api/health/trends/?metric_type=weight&days=30&resolution=auto&points=200
+
+    Columnar series (dates[], values[]) downsampled server-side
+    (api/trends.py) plus average / min / max / latest over the window.
+    Weekly series longer than a week are read from the weekly rollups.
+    Daily series carry a 7-day rolling mean; `analytics` holds slope,
+    anomalies and phase baselines (api/metric_analytics.py).
+
+    metric_type=weight,sleep (or repeated, or `all`) returns every series
+    from one query as {"series": {metric_type: {...}}}.
+    """
 
     profile, err = get_profile(request, request.GET.get("user_id"))
     if err: return err
 
-    metric = request.GET.get("metric_type", "weight")
-    days = int(request.GET.get("days", 30))
+    requested = [
+        t.strip() for item in request.GET.getlist("metric_type") or ["weight"]
+        for t in item.split(",") if t.strip()
+    ]
+    known = [t for t, _ in HealthMetric.METRIC_TYPES]
+    metrics = known if "all" in requested else list(dict.fromkeys(requested))
+    unknown = [t for t in metrics if t not in known]
+    if unknown or not metrics:
+        return Response({"error": f"Unknown metric_type: {', '.join(unknown)}"}, status=400)
+    multi = len(metrics) > 1 or "all" in requested
+
+    resolution = request.GET.get("resolution", "auto")
+    if resolution not in trends.RESOLUTIONS:
+        return Response({"error": f"resolution must be one of {', '.join(trends.RESOLUTIONS)}"}, status=400)
+
+    try:
+        days = int(request.GET.get("days", 30))
+        points = int(request.GET.get("points", trends.DEFAULT_POINTS))
+    except ValueError:
+        return Response({"error": "days and points must be integers"}, status=400)
+    points = max(trends.MIN_POINTS, min(points, trends.MAX_POINTS))
+    days = max(trends.MIN_DAYS, min(days, trends.MAX_DAYS))
+
+    today = datetime.now().date()
+    start = today - timedelta(days=days)
+
+    def compute():
+        # Weekly points over more than a week never need raw rows
+        if resolution == "weekly" and days > metric_rollups.ROLLUP_MIN_DAYS:
+            weeks = metric_rollups.weekly(profile.id, metrics, start, today)
+            return {m: trends.weekly_series(m, weeks.get(m, [])) for m in metrics}
+
+        rows = HealthMetric.objects.filter(
+            user=profile,
+            metric_type__in=metrics,
+            date__gte=start
+        ).order_by("metric_type", "date").values_list("metric_type", "date", "value")
 
-    start = datetime.now().date() - timedelta(days=days)
+        grouped = trends.group_rows(rows)
+        return {m: trends.series(m, grouped.get(m, []), resolution, points) for m in metrics}
 
-    metrics = HealthMetric.objects.filter(
-        user=profile,
-        metric_type=metric,
-        date__gte=start
-    ).order_by("date")
+    data = user_cached(profile, "health_trends", compute, ",".join(metrics), days, today, resolution, points)
+    analytics = metric_analytics.analyze(profile)
 
-    data = HealthMetricSerializer(metrics, many=True).data
-    values = [m.value for m in metrics]
+    if not multi:
+        metric = metrics[0]
+        return Response({**data[metric], "analytics": analytics.get(metric)})
 
     return Response({
-        "metric_type": metric,
-        "data_points": data,
-        "average": round(sum(values)/len(values),2) if values else 0,
-        "min": min(values) if values else 0,
-        "max": max(values) if values else 0,
-        "latest": values[-1] if values else None
+        "metric_types": metrics,
+        "days": days,
+        "series": {m: {**data[m], "analytics": analytics.get(m)} for m in metrics}
     })
 
 
 @api_view(["GET"])
 def health_summary(request):
+    """
+    GET /api/health/summary/
+
+    Last 7 days per metric type: average, latest and trend. One query:
+    window aggregates per metric_type, one DISTINCT row per type. The
+    trend compares the means of the window's two halves and only counts
+    a change that clears a Welch t-test (metric_analytics.half_trend), so
+    one noisy reading doesn't flip it. When the user's analytics are
+    already cached (/api/health/trends/), each type also carries them.
+    """
 
     profile, err = get_profile(request, request.GET.get("user_id"))
     if err: return err
 
-    start = datetime.now().date() - timedelta(days=7)
-
-    summary = {}
-    types = ["weight","sleep","stress","acne_severity","mood","energy"]
-
-    for t in types:
-        metrics = HealthMetric.objects.filter(
+    today = datetime.now().date()
+    start = today - timedelta(days=7)
+    mid = today - timedelta(days=3)
+
+    def compute():
+        per_type = {"partition_by": [F("metric_type")]}
+        in_order = {**per_type, "order_by": [F("date").asc()]}
+
+        # count, sum and sum of squares of each half of the window
+        halves = {}
+        for i, in_half in ((1, Q(date__lt=mid)), (2, Q(date__gte=mid))):
+            value = Case(When(in_half, then=F("value")), output_field=FloatField())
+            halves[f"n{i}"] = Window(Count(value), **per_type)
+            halves[f"s{i}"] = Window(Sum(value), **per_type)
+            halves[f"q{i}"] = Window(Sum(value * value), **per_type)
+
+        rows = HealthMetric.objects.filter(
             user=profile,
-            metric_type=t,
+            metric_type__in=[t for t, _ in HealthMetric.METRIC_TYPES],
             date__gte=start
-        ).order_by("date")
-
-        if metrics.exists():
-            vals = [m.value for m in metrics]
-            summary[t] = {
-                "average": round(sum(vals)/len(vals),1),
-                "latest": vals[-1],
-                "trend": "improving" if len(vals)>1 and vals[-1]<vals[0] else "stable"
+        ).annotate(
+            average=Window(Avg("value"), **per_type),
+            last=Window(
+                LastValue("value"), frame=RowRange(start=None, end=None), **in_order
+            ),
+            **halves,
+        ).order_by("metric_type").values("metric_type", "average", "last", *halves).distinct()
+
+        return {
+            r["metric_type"]: {
+                "average": round(r["average"], 1),
+                "latest": r["last"],
+                "trend": metric_analytics.half_trend(r["metric_type"], *(r[k] or 0 for k in halves))
             }
+            for r in rows
+        }
 
+    summary = user_cached(profile, "health_summary", compute, today)
+    analytics = metric_analytics.cached(profile)
+    if analytics is not None:
+        summary = {m: {**entry, "analytics": analytics.get(m)} for m, entry in summary.items()}
     return Response(summary)
 
 
+# ============================================================
+# DATA EXPORT
+# ============================================================
+
+@api_view(["GET"])
+def export_data(request):
+    """
+    GET /api/export/?type=ndjson|zip|csv&dataset=cycles
+
+    Streams everything stored for the user (api/export.py). `csv` exports
+    a single dataset; `zip` holds one CSV per dataset.
+    """
+
+    profile, err = get_profile(request, request.GET.get("user_id"))
+    if err: return err
+
+    # not ?format= — DRF reserves that for content negotiation
+    fmt = request.GET.get("type", "ndjson")
+    dataset = request.GET.get("dataset")
+    if fmt not in export.FORMATS:
+        return Response({"error": f"type must be one of {', '.join(export.FORMATS)}"}, status=400)
+    if fmt == "csv" and dataset not in export.DATASETS:
+        return Response(
+            {"error": f"csv needs dataset= one of {', '.join(export.DATASETS)} (or use type=zip)"},
+            status=400
+        )
+
+    content_types = {"ndjson": "application/x-ndjson", "csv": "text/csv", "zip": "application/zip"}
+    suffix = f"-{dataset}" if fmt == "csv" else ""
+    filename = f"ovasense-{profile.user.username}{suffix}-{datetime.now():%Y%m%d}.{fmt}"
+
+    response = StreamingHttpResponse(export.stream(profile, fmt, dataset), content_type=content_types[fmt])
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
 # ============================================================
 # KNOWLEDGE BASE
 # ============================================================
 
+@cache_control(public=True, max_age=settings.ARTICLE_CACHE_MAX_AGE)
+@condition(etag_func=articles.etag)
 @api_view(["GET"])
 def list_articles(request):
+    """
+    GET /api/articles/?category=diet
+    GET /api/articles/?search=insulin&page=2&page_size=20
 
-    qs = KnowledgeArticle.objects.filter(published=True)
-
-    if request.GET.get("category"):
-        qs = qs.filter(category=request.GET["category"])
+    With `search`: a ranked, paginated page from the full-text index
+    (api/search.py), each article carrying `rank` and a highlighted `snippet`.
+    Responses are cached per article content version (api/articles.py);
+    a matching If-None-Match gets a 304.
+    """
 
     if request.GET.get("search"):
-        s = request.GET["search"]
-        qs = qs.filter(title__icontains=s) | qs.filter(content__icontains=s)
+        try:
+            result = search.search(
+                request.GET["search"],
+                category=request.GET.get("category"),
+                page=request.GET.get("page", 1),
+                page_size=request.GET.get("page_size", search.PAGE_SIZE),
+            )
+        except ValueError:
+            return Response({"error": "page and page_size must be integers"}, status=400)
 
-    return Response(KnowledgeArticleListSerializer(qs, many=True).data)
+        results = []
+        for article, rank, snippet in result["results"]:
+            item = KnowledgeArticleListSerializer(article).data
+            item["rank"] = rank
+            item["snippet"] = snippet
+            results.append(item)
+        result["results"] = results
+        result["query"] = request.GET["search"]
+        return Response(result)
+
+    category = request.GET.get("category")
+
+    def compute():
+        qs = KnowledgeArticle.objects.filter(published=True)
+        if category:
+            qs = qs.filter(category=category)
+        return KnowledgeArticleListSerializer(qs, many=True).data
+
+    return Response(articles.cached(request, f"list:{category or ''}", compute))
 
 
 @api_view(["GET"])
 def get_article(request, article_id):
+    """
+    Full article with its pre-rendered `content_html`. Browsers revalidate
+    every time (no-cache) so each visit is counted, including revalidations
+    answered with a bodyless 304 (a reader reopening the article is still
+    a view).
+    """
 
     art = get_object_or_404(KnowledgeArticle, id=article_id, published=True)
-    art.views += 1
-    art.save(update_fields=["views"])
 
-    return Response(KnowledgeArticleSerializer(art).data)
+    # Buffered, written back in bulk (api/view_counts.py)
+    views = view_counts.record(art.id)
+
+    tag = f'"article-{art.id}-{art.updated_at.timestamp():.6f}"'
+    response = get_conditional_response(request, etag=tag)
+    if response is None:
+        art.views += views
+        response = Response(KnowledgeArticleSerializer(art).data)
+    response["ETag"] = tag
+    patch_cache_control(response, no_cache=True)
+    return response
 
 
+@cache_control(public=True, max_age=settings.ARTICLE_CACHE_MAX_AGE)
+@condition(etag_func=articles.etag)
 @api_view(["GET"])
 def get_faqs(request):
 
-    qs = KnowledgeArticle.objects.filter(category="faq", published=True)
-    return Response(KnowledgeArticleListSerializer(qs, many=True).data)
+    def compute():
+        qs = KnowledgeArticle.objects.filter(category="faq", published=True)
+        return KnowledgeArticleListSerializer(qs, many=True).data
+
+    return Response(articles.cached(request, "faqs", compute))
 
 
 # ============================================================
@@ -283,22 +611,22 @@ def cycle_ai_insight(request):
     profile, err = get_profile(request, request.GET.get("user_id"))
     if err: return err
 
-    today = datetime.now().date()
-
-
-
-    data = generate_cycle_insight(profile.id)
-
-
+    # Serve today's stored insight if it was built from the current data
+    # (data_version) and is not the AI-unavailable fallback
+    insight = None
+    if not tasks.is_pending(jobs.insight_key(profile.id)):
+        cutoff = timezone.now() - timedelta(seconds=settings.INSIGHT_MAX_AGE)
+        insight = CycleInsight.objects.filter(
+            user=profile,
+            data_version=profile.data_version,
+            fallback=False,
+            created_at__gte=cutoff,
+            created_at__date=timezone.localdate()
+        ).first()
 
-    insight = CycleInsight.objects.create(
-        user=profile,
-        phase=data.get("phase"),
-        cycle_day=data.get("cycle_day"),
-        risk_score=max(0,min(100,int(data.get("risk_score",50)))),
-        main_reason=data.get("main_reason",""),
-        recommendations=data.get("recommendations",[])
-    )
+    cached = insight is not None
+    if not cached:
+        insight = create_insight(profile.id)
 
     return Response({
         "phase": insight.phase,
@@ -306,7 +634,7 @@ def cycle_ai_insight(request):
         "risk_score": insight.risk_score,
         "main_reason": insight.main_reason,
         "recommendations": insight.recommendations,
-        "cached": False
+        "cached": cached
     })
 
 
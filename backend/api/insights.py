@@ -4,27 +4,16 @@ Cycle-Aware AI Insights Engine
 Uses:
 • Period history
 • Cycle irregularity
-• Last 7-day health metrics
+• Precomputed metric findings (phase patterns, trends, anomalies)
 • Few-shot LLM prompt with strict JSON output
 
 SAFE + DEBUGGABLE + WORKS WITH GROQ
 """
 
-import os
 import json
-from datetime import datetime, timedelta
-from dotenv import load_dotenv
-from groq import Groq
 
-from .models import CycleRecord, HealthMetric
-
-# ============================================================
-# LOAD ENV
-# ============================================================
-load_dotenv()
-
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+from . import cycle_history, llm, metric_analytics, phase_correlations
+from .models import CycleInsight, UserProfile
 
 
 # ============================================================
@@ -40,7 +29,8 @@ def fallback(phase, day):
             "Track sleep",
             "Reduce stress",
             "Log cycles"
-        ]
+        ],
+        "fallback": True
     }
 
 
@@ -48,84 +38,43 @@ def fallback(phase, day):
 # 1️⃣ Detect Current Cycle Phase
 # ============================================================
 def get_cycle_phase(profile_id):
-
-    cycle = CycleRecord.objects.filter(
-        user__id=profile_id,
-        predicted=False
-    ).order_by('-start_date').first()
-
-    if not cycle:
-        return "Unknown", None
-
-    today = datetime.now().date()
-    day = (today - cycle.start_date).days + 1
-
-    if day <= 5:
-        phase = "Menstrual"
-    elif day <= 13:
-        phase = "Follicular"
-    elif day <= 16:
-        phase = "Ovulation"
-    else:
-        phase = "Luteal"
-
-    return phase, day
+    return cycle_history.for_profile(profile_id).phase()
 
 
 # ============================================================
 # 2️⃣ Cycle Irregularity
 # ============================================================
 def get_cycle_irregularity(profile_id):
-
-    cycles = CycleRecord.objects.filter(
-        user__id=profile_id,
-        predicted=False
-    ).order_by('-start_date')[:3]
-
-    if len(cycles) < 2:
-        return {"irregular": False, "note": "Not enough data"}
-
-    cycles = list(cycles)[::-1]
-
-    lengths = []
-    for i in range(len(cycles) - 1):
-        gap = (cycles[i+1].start_date - cycles[i].start_date).days
-        lengths.append(gap)
-
-    variance = max(lengths) - min(lengths)
-
-    return {
-        "irregular": variance > 7,
-        "lengths": lengths,
-        "variance": variance
-    }
+    return cycle_history.for_profile(profile_id).irregularity()
 
 
 # ============================================================
-# 3️⃣ Last 7-Day Metrics
+# 3️⃣ Precomputed Findings
 # ============================================================
-def get_recent_metrics(profile_id):
+MAX_TREND_FINDINGS = 3
 
-    start = datetime.now().date() - timedelta(days=7)
 
-    metrics = HealthMetric.objects.filter(
-        user__id=profile_id,
-        date__gte=start
-    )
+def get_findings(profile_id, phase=None):
+    """
+    A few plain-language findings for the prompt instead of raw numbers:
+    phase patterns (api/phase_correlations.py), then significant trends
+    and recent anomalies (api/metric_analytics.py).
+    """
+    profile = UserProfile.objects.get(pk=profile_id)
 
-    data = {}
-    for m in metrics:
-        data.setdefault(m.metric_type, []).append(m.value)
+    found = [f["text"] for f in phase_correlations.findings(profile, current_phase=phase)]
 
-    summary = {}
-    for k, v in data.items():
-        summary[k] = {
-            "avg": round(sum(v) / len(v), 2),
-            "latest": v[-1],
-            "trend": "up" if len(v) > 1 and v[-1] > v[0] else "down"
-        }
+    trends = []
+    for metric, a in metric_analytics.analyze(profile).items():
+        label = metric.replace("_", " ").capitalize()
+        if a["trend"] != "stable":
+            trends.append(
+                f"{label} is {a['direction']} ({a['slope_per_week']:+g}/week, {a['trend']})"
+            )
+        for anomaly in a["anomalies"][-1:]:
+            trends.append(f"{label} on {anomaly['date']} was unusual: {anomaly['value']:g}")
 
-    return summary
+    return found + trends[:MAX_TREND_FINDINGS]
 
 
 # ============================================================
@@ -145,6 +94,9 @@ Schema:
   "recommendations": ["3 short actions"]
 }}
 
+Findings are precomputed from the patient's own logs; base the
+explanation on them and do not infer other patterns.
+
 Patient Data:
 {json.dumps(data, indent=2)}
 """
@@ -178,31 +130,27 @@ def clean_ai_json(text):
 def generate_cycle_insight(profile_id):
 
     phase, day = get_cycle_phase(profile_id)
-    metrics = get_recent_metrics(profile_id)
+    findings = get_findings(profile_id, phase)
     cycle_info = get_cycle_irregularity(profile_id)
 
     structured = {
         "cycle_phase": phase,
         "cycle_day": day,
         "cycle_irregularity": cycle_info,
-        "metrics": metrics
+        "findings": findings
     }
 
-    if not GROQ_API_KEY:
+    if not llm.is_configured():
         print("⚠️ GROQ_API_KEY missing")
         return fallback(phase, day)
 
     try:
-        client = Groq(api_key=GROQ_API_KEY)
-
-        chat = client.chat.completions.create(
-            model=GROQ_MODEL,
+        text = llm.chat_completion(
+            "insight",
             messages=[{"role": "user", "content": build_prompt(structured)}],
             temperature=0,
             max_tokens=300,
-        )
-
-        text = chat.choices[0].message.content.strip()
+        ).strip()
         text = clean_ai_json(text)
 
         try:
@@ -228,3 +176,25 @@ def generate_cycle_insight(profile_id):
     except Exception as e:
         print("⚠️ AI insight failed:", e)
         return fallback(phase, day)
+
+
+# ============================================================
+# STORE
+# ============================================================
+
+def create_insight(profile_id):
+    """Generate an insight and save it (request path or insight.precompute task)."""
+    # Read the version first: a write landing mid-generation leaves it stale
+    version = UserProfile.objects.filter(id=profile_id).values_list("data_version", flat=True).first()
+    data = generate_cycle_insight(profile_id)
+
+    return CycleInsight.objects.create(
+        user_id=profile_id,
+        phase=data.get("phase"),
+        cycle_day=data.get("cycle_day"),
+        risk_score=max(0,min(100,int(data.get("risk_score",50)))),
+        main_reason=data.get("main_reason",""),
+        recommendations=data.get("recommendations",[]),
+        data_version=version,
+        fallback=data.get("fallback", False)
+    )
@@ -0,0 +1,158 @@
+"""
+Background Jobs
+---------------
+Task handlers run by `manage.py run_worker`, plus the helpers views use
+to queue them. Heavy imports (reportlab, groq) stay inside the handlers.
+
+    classify.ai_sections  → fill ai_explanation + diet_plan on a result
+    report.render         → pre-render the PDF for /api/report/<id>/
+    insight.precompute    → store a fresh CycleInsight for a user
+    chat.extract          → extract + auto-log data from a chat turn
+
+report.render / insight.precompute are only queued from views with
+PRECOMPUTE_ASYNC (i.e. when a worker runs); handlers already running in
+the worker queue follow-ups unconditionally (force=True).
+"""
+
+from django.conf import settings
+
+from .tasks import enqueue, task
+
+
+# Higher runs first
+PRIORITY_USER_WAITING = 10
+PRIORITY_DEFAULT = 0
+PRIORITY_PRECOMPUTE = -10
+
+
+def insight_key(profile_id):
+    return f"insight:{profile_id}"
+
+
+# ============================================================
+# CLASSIFY AI SECTIONS
+# ============================================================
+
+def fill_ai_sections(result_id, symptom_data, classification):
+    return enqueue(
+        "classify.ai_sections",
+        {
+            "result_id": result_id,
+            "symptom_data": symptom_data,
+            "classification": {
+                "phenotype": classification["phenotype"],
+                "confidence": classification["confidence"],
+                "reasons": classification["reasons"],
+            },
+        },
+        priority=PRIORITY_USER_WAITING,
+        dedupe_key=f"ai_sections:{result_id}",
+    )
+
+
+@task("classify.ai_sections")
+def run_ai_sections(payload):
+    from .ml_engine import generate_ai_sections
+    from .models import PhenotypeResult, RenderedReport
+
+    ai_explanation, diet_plan = generate_ai_sections(
+        payload["symptom_data"], payload["classification"]
+    )
+    PhenotypeResult.objects.filter(id=payload["result_id"]).update(
+        ai_explanation=ai_explanation,
+        diet_plan=diet_plan,
+    )
+    RenderedReport.objects.filter(result_id=payload["result_id"]).delete()
+    render_report(payload["result_id"], force=True)
+    return {"result_id": payload["result_id"]}
+
+
+# ============================================================
+# REPORT RENDER
+# ============================================================
+
+def render_report(result_id, force=False):
+    if not (force or settings.PRECOMPUTE_ASYNC):
+        return None
+    return enqueue(
+        "report.render",
+        {"result_id": result_id},
+        priority=PRIORITY_DEFAULT,
+        dedupe_key=f"report:{result_id}",
+    )
+
+
+@task("report.render", max_attempts=3)
+def run_report_render(payload):
+    from .models import PhenotypeResult, RenderedReport
+    from .report import generate_pdf_report
+
+    result = PhenotypeResult.objects.select_related("symptom_log").filter(
+        id=payload["result_id"]
+    ).first()
+    if result is None or not result.ai_explanation:
+        # Deleted, or AI sections not ready — the view renders on demand
+        return {"skipped": True}
+
+    pdf = generate_pdf_report(
+        result.symptom_log, result, result.ai_explanation, result.diet_plan or ""
+    ).getvalue()
+    RenderedReport.objects.update_or_create(result=result, defaults={"pdf": pdf})
+    return {"bytes": len(pdf)}
+
+
+# ============================================================
+# INSIGHT PRECOMPUTE
+# ============================================================
+
+def refresh_insight(profile_id, force=False):
+    """Called after cycle / metric writes; one queued recompute per user."""
+    if not (force or settings.PRECOMPUTE_ASYNC):
+        return None
+    return enqueue(
+        "insight.precompute",
+        {"profile_id": profile_id},
+        priority=PRIORITY_PRECOMPUTE,
+        dedupe_key=insight_key(profile_id),
+    )
+
+
+@task("insight.precompute")
+def run_insight_precompute(payload):
+    from .insights import create_insight
+    from .models import UserProfile
+
+    if not UserProfile.objects.filter(id=payload["profile_id"]).exists():
+        return {"skipped": True}
+
+    insight = create_insight(payload["profile_id"])
+    return {"insight_id": insight.id}
+
+
+# ============================================================
+# CHAT EXTRACTION
+# ============================================================
+
+def extract_chat(profile_id, history):
+    return enqueue(
+        "chat.extract",
+        {"profile_id": profile_id, "history": history},
+        priority=PRIORITY_DEFAULT,
+    )
+
+
+@task("chat.extract")
+def run_chat_extract(payload):
+    from .auto_logging import apply_extracted_data
+    from .models import UserProfile
+    from .voice_pipeline import extract_symptom_data
+
+    profile = UserProfile.objects.filter(id=payload["profile_id"]).first()
+    if profile is None:
+        return {"skipped": True}
+
+    extracted = extract_symptom_data(payload["history"])
+    changed = apply_extracted_data(profile, extracted)
+    if changed:
+        refresh_insight(profile.id, force=True)
+    return {"extracted": extracted, "changed": changed}
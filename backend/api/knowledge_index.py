@@ -0,0 +1,213 @@
+"""
+Knowledge Base Retrieval (BM25)
+-------------------------------
+In-process BM25 over published KnowledgeArticle passages, used to ground
+Baymax replies (voice_pipeline.get_baymax_response) in our own content.
+
+• Articles are split into passages at headings / blank lines, capped at
+  PASSAGE_WORDS words, each prefixed by its article title and heading.
+• The index is a handful of NumPy arrays (CSR postings: term → passage
+  ids + term frequencies, per-term idf, per-passage length), so a query
+  is a few slices and one np.add.at; top-k uses argpartition.
+• Each worker builds it on first use and rebuilds when the article
+  content version changes (api/articles.content_version), i.e. after
+  any article is saved or deleted, in any worker.
+
+    context_for("what should I eat for breakfast")  → prompt-ready text
+"""
+
+import re
+import threading
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+
+from . import articles
+from .models import KnowledgeArticle
+
+
+K1 = 1.2
+B = 0.75
+PASSAGE_WORDS = 120
+MIN_SCORE = 0.5
+WORDS_PER_TOKEN = 0.75          # rough English average for LLM tokenizers
+
+STOPWORDS = frozenset("""
+a about above after again all am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had
+has have having he her here hers him his how i if in into is it its itself just me more most
+my no nor not now of off on once only or other our ours out over own same she should so some
+such than that the their them then there these they this those through to too under until up
+very was we were what when where which while who whom why will with would you your yours
+""".split())
+
+_WORD = re.compile(r"[a-z0-9]+")
+_HEADING = re.compile(r"^#{1,6}\s+(.*)$")
+_MARKUP = re.compile(r"[*_`>#]+")
+
+
+def stem(word):
+    """Very light suffix stripping so "cravings" and "craving" match."""
+    if word.endswith("ies") and len(word) > 4:
+        word = word[:-3] + "y"
+    elif word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+        word = word[:-1]
+    for suffix in ("ing", "ed"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text):
+    return [stem(w) for w in _WORD.findall(text.lower()) if w not in STOPWORDS]
+
+
+# ============================================================
+# PASSAGES
+# ============================================================
+
+def passages(title, content):
+    """Yield (heading, text) passages of one article."""
+    heading, words = None, []
+
+    def flush():
+        text = " ".join(words)
+        words.clear()
+        return (heading, text) if text else None
+
+    for line in (content or "").splitlines():
+        match = _HEADING.match(line)
+        if match:
+            done = flush()
+            if done:
+                yield done
+            heading = match.group(1).strip()
+            continue
+        if not line.strip() and len(words) >= PASSAGE_WORDS // 2:
+            done = flush()
+            if done:
+                yield done
+            continue
+        for word in _MARKUP.sub(" ", line).split():
+            words.append(word)
+            if len(words) >= PASSAGE_WORDS:
+                yield flush()
+
+    done = flush()
+    if done:
+        yield done
+
+
+# ============================================================
+# INDEX
+# ============================================================
+
+class Index:
+    """BM25 over a fixed list of passages, stored as flat arrays."""
+
+    def __init__(self, docs):
+        # docs: [(title, heading, text)]
+        self.docs = docs
+        counts = [Counter(tokenize(f"{title} {heading or ''} {text}")) for title, heading, text in docs]
+
+        vocab = {}
+        for c in counts:
+            for term in c:
+                vocab.setdefault(term, len(vocab))
+        self.vocab = vocab
+
+        n_terms = len(vocab)
+        postings = [[] for _ in range(n_terms)]
+        for doc, c in enumerate(counts):
+            for term, tf in c.items():
+                postings[vocab[term]].append((doc, tf))
+
+        lengths = np.fromiter((len(p) for p in postings), dtype=np.int32, count=n_terms)
+        self.indptr = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int32)
+        flat = [pair for p in postings for pair in p]
+        self.doc_ids = np.fromiter((d for d, _ in flat), dtype=np.int32, count=len(flat))
+        self.tf = np.fromiter((t for _, t in flat), dtype=np.float32, count=len(flat))
+
+        self.doc_len = np.fromiter((sum(c.values()) for c in counts), dtype=np.float32, count=len(counts))
+        avg = float(self.doc_len.mean()) if len(counts) else 1.0
+        self.norm = (K1 * (1 - B + B * self.doc_len / max(avg, 1.0))).astype(np.float32)
+
+        n = len(docs)
+        self.idf = np.log1p((n - lengths + 0.5) / (lengths + 0.5)).astype(np.float32)
+
+    def __len__(self):
+        return len(self.docs)
+
+    def search(self, query, k=3):
+        """[(score, doc index)] best first, only passages sharing a query term."""
+        terms = {self.vocab[t] for t in tokenize(query) if t in self.vocab}
+        if not terms or not self.docs:
+            return []
+
+        scores = np.zeros(len(self.docs), dtype=np.float32)
+        for t in terms:
+            lo, hi = self.indptr[t], self.indptr[t + 1]
+            docs, tf = self.doc_ids[lo:hi], self.tf[lo:hi]
+            np.add.at(scores, docs, self.idf[t] * tf * (K1 + 1) / (tf + self.norm[docs]))
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), int(i)) for i in top if scores[i] > 0]
+
+
+_lock = threading.Lock()
+_index = None
+_version = None
+
+
+def build():
+    docs = []
+    rows = KnowledgeArticle.objects.filter(published=True).order_by("id").values_list("title", "content")
+    for title, content in rows.iterator():
+        for heading, text in passages(title, content):
+            docs.append((title, heading, text))
+    return Index(docs)
+
+
+def get_index():
+    """This worker's index, rebuilt if the article content changed."""
+    global _index, _version
+    version = articles.content_version()
+    with _lock:
+        if _index is None or version != _version:
+            _index, _version = build(), version
+            print(f"📚 Knowledge index built: {len(_index)} passages")
+        return _index
+
+
+# ============================================================
+# PROMPT CONTEXT
+# ============================================================
+
+def retrieve(query, k=None):
+    """Top-k passages: [{"title", "heading", "text", "score"}]."""
+    index = get_index()
+    k = k or settings.KNOWLEDGE_TOP_K
+    return [
+        {"title": index.docs[i][0], "heading": index.docs[i][1], "text": index.docs[i][2], "score": round(score, 2)}
+        for score, i in index.search(query, k)
+        if score >= MIN_SCORE
+    ]
+
+
+def context_for(query, k=None, max_tokens=None):
+    """Retrieved passages as prompt text within a token budget ("" if none match)."""
+    budget = int((max_tokens or settings.KNOWLEDGE_CONTEXT_TOKENS) * WORDS_PER_TOKEN)
+    lines = []
+    for hit in retrieve(query, k):
+        source = hit["title"] + (f" › {hit['heading']}" if hit["heading"] else "")
+        words = hit["text"].split()
+        room = budget - len(source.split()) - 2
+        if room < 15:
+            break
+        text = " ".join(words[:room]) + (" …" if len(words) > room else "")
+        lines.append(f"[{source}] {text}")
+        budget -= len(source.split()) + 2 + min(len(words), room)
+    return "\n".join(lines)
@@ -0,0 +1,153 @@
+"""
+LLM Gateway
+-----------
+Single entry point for every Groq chat completion in the API.
+
+• One cached client per process (instead of one per call)
+• The groq SDK is imported on first use, not at worker boot
+• Latency + token usage recorded per call site:
+    classify | predictive | insight | chat | extraction
+
+• Record / replay of responses ("cassettes") for offline tests
+
+Callers keep their own prompt building, parsing and fallbacks.
+
+Cassettes
+---------
+LLM_CASSETTE_MODE (settings):
+    off     → always call the API (default)
+    replay  → only serve recorded responses; a miss raises CassetteMissing
+    record  → always call the API and (re)write the cassette
+    auto    → replay when recorded, otherwise call the API and record
+
+Cassettes live in LLM_CASSETTE_DIR/<call_site>/<hash>.json, keyed by a
+SHA-256 of the model, messages and sampling parameters.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+from django.conf import settings
+
+from . import metrics
+
+
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+
+_client = None
+
+
+def is_configured():
+    return bool(settings.GROQ_API_KEY)
+
+
+def get_client():
+    """
+    Lazily build and reuse the Groq client.
+    GROQ_BASE_URL in settings points it at a local stand-in (groq_stub.py).
+    """
+    global _client
+    if _client is None:
+        from groq import Groq
+
+        _client = Groq(
+            api_key=settings.GROQ_API_KEY,
+            base_url=settings.GROQ_BASE_URL,
+            timeout=settings.GROQ_TIMEOUT,
+            max_retries=settings.GROQ_MAX_RETRIES,
+        )
+    return _client
+
+
+class CassetteMissing(Exception):
+    """Replay mode found no recorded response for this prompt."""
+
+
+def cassette_key(model, messages, params):
+    payload = json.dumps(
+        {"model": model, "messages": messages, "params": params},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _cassette_path(call_site, key):
+    return os.path.join(str(settings.LLM_CASSETTE_DIR), call_site, f"{key}.json")
+
+
+def _load_cassette(call_site, key):
+    try:
+        with open(_cassette_path(call_site, key), encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_cassette(call_site, key, model, messages, params, content, usage):
+    path = _cassette_path(call_site, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump({
+            "call_site": call_site,
+            "request": {"model": model, "messages": messages, "params": params},
+            "response": {"content": content, "usage": usage},
+        }, fh, indent=2, ensure_ascii=False, default=str)
+
+
+def _live_completion(call_site, model, messages, params):
+    start = time.perf_counter()
+    outcome = "error"
+
+    try:
+        completion = get_client().chat.completions.create(
+            model=model,
+            messages=messages,
+            **params
+        )
+        outcome = "ok"
+    finally:
+        metrics.LLM_LATENCY.observe(
+            time.perf_counter() - start,
+            call_site=call_site,
+            outcome=outcome,
+        )
+
+    usage = getattr(completion, "usage", None)
+    usage = {
+        "prompt_tokens": getattr(usage, "prompt_tokens", None),
+        "completion_tokens": getattr(usage, "completion_tokens", None),
+    }
+    if usage["prompt_tokens"] is not None:
+        metrics.LLM_TOKENS.observe(usage["prompt_tokens"], call_site=call_site, kind="prompt")
+    if usage["completion_tokens"] is not None:
+        metrics.LLM_TOKENS.observe(usage["completion_tokens"], call_site=call_site, kind="completion")
+
+    return completion.choices[0].message.content or "", usage
+
+
+def chat_completion(call_site, messages, model=None, **kwargs):
+    """
+    Run a chat completion and return the message text ("" if empty).
+    Exceptions propagate so callers keep their existing fallbacks.
+    """
+    model = model or settings.GROQ_MODEL or DEFAULT_MODEL
+    mode = settings.LLM_CASSETTE_MODE
+
+    if mode == "off":
+        return _live_completion(call_site, model, messages, kwargs)[0]
+
+    key = cassette_key(model, messages, kwargs)
+    if mode in ("replay", "auto"):
+        cassette = _load_cassette(call_site, key)
+        if cassette is not None:
+            return cassette["response"]["content"]
+        if mode == "replay":
+            raise CassetteMissing(f"No recorded {call_site} response for {key[:12]}")
+
+    content, usage = _live_completion(call_site, model, messages, kwargs)
+    _save_cassette(call_site, key, model, messages, kwargs, content, usage)
+    return content
@@ -0,0 +1,43 @@
+"""
+python manage.py export_user_data USERNAME PATH [--type ndjson|csv|zip] [--dataset NAME]
+
+Writes everything stored for one user to PATH, streamed chunk by chunk
+(api/export.py).
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api import export
+from api.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = "Export a user's data as NDJSON, CSV or a zip of CSVs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("username")
+        parser.add_argument("path")
+        parser.add_argument("--type", choices=export.FORMATS, default="zip")
+        parser.add_argument("--dataset", choices=list(export.DATASETS),
+                            help="Required with --type csv")
+
+    def handle(self, *args, **options):
+        try:
+            profile = UserProfile.objects.select_related("user").get(user__username=options["username"])
+        except UserProfile.DoesNotExist:
+            raise CommandError(f"User not found: {options['username']}")
+
+        fmt = options["type"]
+        if fmt == "csv" and not options["dataset"]:
+            raise CommandError("--dataset is required with --type csv")
+
+        size = 0
+        try:
+            with open(options["path"], "wb") as out:
+                for chunk in export.stream(profile, fmt, options["dataset"]):
+                    out.write(chunk)
+                    size += len(chunk)
+        except OSError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f"✅ Exported {profile.user.username} → {options['path']} ({size:,} bytes)")
@@ -0,0 +1,53 @@
+"""
+python manage.py import_cycles USERNAME FILE [--type csv|json] [--tolerance 3]
+                               [--date-format %d/%m/%Y] [--dry-run]
+
+Bulk-imports period history exported from another tracker (api/cycle_import.py).
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api import cycle_import
+from api.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = "Import cycle history from a CSV / JSON export"
+
+    def add_arguments(self, parser):
+        parser.add_argument("username")
+        parser.add_argument("path")
+        parser.add_argument("--type", choices=["csv", "json"], help="Default: sniffed from the file")
+        parser.add_argument("--tolerance", type=int, default=cycle_import.DEFAULT_TOLERANCE,
+                            help="Skip starts within this many days of an existing cycle")
+        parser.add_argument("--date-format", help="strptime format, e.g. %%d/%%m/%%Y")
+        parser.add_argument("--dry-run", action="store_true", help="Validate only, write nothing")
+
+    def handle(self, *args, **options):
+        try:
+            profile = UserProfile.objects.select_related("user").get(user__username=options["username"])
+        except UserProfile.DoesNotExist:
+            raise CommandError(f"User not found: {options['username']}")
+
+        try:
+            with open(options["path"], "rb") as stream:
+                summary = cycle_import.import_cycles(
+                    profile, stream,
+                    fmt=options["type"],
+                    tolerance=options["tolerance"],
+                    date_format=options["date_format"],
+                    dry_run=options["dry_run"],
+                )
+        except OSError as e:
+            raise CommandError(str(e))
+        except cycle_import.ImportFormatError as e:
+            raise CommandError(f"Could not read file: {e}")
+
+        for error in summary["errors"]:
+            self.stderr.write(f"⚠️ Row {error['row']}: {error['error']}")
+
+        verb = "Would import" if options["dry_run"] else "Imported"
+        self.stdout.write(
+            f"✅ {verb} {summary['imported']} cycle(s) for {profile.user.username} "
+            f"({summary['duplicates']} duplicate(s), {summary['invalid']} invalid)"
+        )
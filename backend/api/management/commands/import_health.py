@@ -0,0 +1,47 @@
+"""
+python manage.py import_health USERNAME FILE [--source apple|google_fit] [--keep-existing]
+
+Streams an Apple Health export (export.zip / export.xml) or a Google Fit
+Takeout JSON file into daily HealthMetrics (api/health_import.py).
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api import health_import
+from api.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = "Import weight / sleep / exercise from a phone health export"
+
+    def add_arguments(self, parser):
+        parser.add_argument("username")
+        parser.add_argument("path")
+        parser.add_argument("--source", choices=health_import.SOURCES,
+                            help="Default: guessed from the file extension")
+        parser.add_argument("--keep-existing", action="store_true",
+                            help="Don't overwrite days that already have a value")
+
+    def handle(self, *args, **options):
+        try:
+            profile = UserProfile.objects.select_related("user").get(user__username=options["username"])
+        except UserProfile.DoesNotExist:
+            raise CommandError(f"User not found: {options['username']}")
+
+        source = options["source"] or health_import.detect_source(options["path"])
+
+        try:
+            with open(options["path"], "rb") as stream:
+                summary = health_import.import_health_export(
+                    profile, stream, source, overwrite=not options["keep_existing"]
+                )
+        except OSError as e:
+            raise CommandError(str(e))
+        except health_import.HealthImportError as e:
+            raise CommandError(f"Could not read export: {e}")
+
+        metrics = ", ".join(f"{k}: {v}" for k, v in sorted(summary["metrics"].items())) or "none"
+        self.stdout.write(
+            f"✅ {summary['readings']} readings → {summary['written']} daily metrics "
+            f"for {profile.user.username} ({metrics})"
+        )
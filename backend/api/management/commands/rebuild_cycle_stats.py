@@ -0,0 +1,31 @@
+"""
+python manage.py rebuild_cycle_stats [--user USERNAME]
+
+Recomputes CycleStats from CycleRecord rows (repair / backfill).
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.cycle_stats import rebuild
+from api.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = "Recompute per-user cycle statistics from scratch"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Only this username")
+
+    def handle(self, *args, **options):
+        profiles = UserProfile.objects.all()
+        if options["user"]:
+            profiles = profiles.filter(user__username=options["user"])
+            if not profiles.exists():
+                raise CommandError(f"User not found: {options['user']}")
+
+        count = 0
+        for profile_id in profiles.values_list("id", flat=True).iterator():
+            rebuild(profile_id)
+            count += 1
+
+        self.stdout.write(f"✅ Rebuilt cycle stats for {count} user(s)")
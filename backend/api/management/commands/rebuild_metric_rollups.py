@@ -0,0 +1,29 @@
+"""
+python manage.py rebuild_metric_rollups [--user USERNAME]
+
+Recomputes weekly HealthMetricRollup rows from HealthMetric (repair / backfill).
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.metric_rollups import rebuild
+from api.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = "Recompute weekly health-metric rollups from scratch"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Only this username")
+
+    def handle(self, *args, **options):
+        user_id = None
+        if options["user"]:
+            user_id = UserProfile.objects.filter(
+                user__username=options["user"]
+            ).values_list("id", flat=True).first()
+            if user_id is None:
+                raise CommandError(f"User not found: {options['user']}")
+
+        written = rebuild(user_id)
+        self.stdout.write(f"✅ Rebuilt {written} weekly metric rollup(s)")
@@ -0,0 +1,125 @@
+"""
+python manage.py run_worker [--concurrency N] [--mode thread|process]
+
+Processes BackgroundTask rows until interrupted (Ctrl+C / SIGTERM).
+
+    --once            drain ready tasks, then exit (cron / tests)
+    --task NAME       only run these task names (repeatable)
+    --poll-interval   seconds to sleep when the queue is empty
+"""
+
+import multiprocessing
+import signal
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from api import jobs  # noqa: F401  (registers handlers)
+from api.tasks import Worker, registered
+
+
+def _process_main(options):
+    # Forked children must not reuse the parent's DB sockets
+    connections.close_all()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    worker = Worker(
+        poll_interval=options["poll_interval"],
+        names=options["task"] or None,
+        max_tasks=options["max_tasks"],
+    )
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    worker.run(once=options["once"])
+
+
+class Command(BaseCommand):
+    help = "Run background task workers (thread or process pool)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=2, help="Number of workers")
+        parser.add_argument("--mode", choices=["thread", "process"], default="thread")
+        parser.add_argument("--poll-interval", type=float, default=1.0)
+        parser.add_argument("--once", action="store_true", help="Exit once the queue is empty")
+        parser.add_argument("--max-tasks", type=int, default=None, help="Per worker, then exit")
+        parser.add_argument("--task", action="append", default=[], help="Task name filter")
+
+    def handle(self, *args, **options):
+        unknown = set(options["task"]) - set(registered())
+        if unknown:
+            raise CommandError(f"Unknown task(s): {', '.join(sorted(unknown))}")
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency must be at least 1")
+
+        self.stdout.write(
+            f"🧵 Starting {options['concurrency']} {options['mode']} worker(s) "
+            f"for: {', '.join(options['task'] or registered())}"
+        )
+
+        if options["mode"] == "process":
+            self._run_processes(options)
+        else:
+            self._run_threads(options)
+
+    def _run_threads(self, options):
+        workers = [
+            Worker(
+                poll_interval=options["poll_interval"],
+                names=options["task"] or None,
+                max_tasks=options["max_tasks"],
+            )
+            for _ in range(options["concurrency"])
+        ]
+        threads = [
+            threading.Thread(target=w.run, kwargs={"once": options["once"]}, daemon=True)
+            for w in workers
+        ]
+
+        def stop(*_):
+            for w in workers:
+                w.stop()
+
+        signal.signal(signal.SIGTERM, stop)
+        for t in threads:
+            t.start()
+
+        try:
+            while any(t.is_alive() for t in threads):
+                for t in threads:
+                    t.join(timeout=0.5)
+        except KeyboardInterrupt:
+            self.stdout.write("⏹️ Stopping workers after their current task...")
+            stop()
+            for t in threads:
+                t.join()
+
+        self.stdout.write(f"✅ Processed {sum(w.processed for w in workers)} task(s)")
+
+    def _run_processes(self, options):
+        connections.close_all()
+        worker_options = {
+            k: options[k] for k in ("poll_interval", "task", "max_tasks", "once")
+        }
+        procs = [
+            multiprocessing.Process(target=_process_main, args=(worker_options,))
+            for _ in range(options["concurrency"])
+        ]
+        for p in procs:
+            p.start()
+
+        def stop(*_):
+            for p in procs:
+                if p.is_alive():
+                    p.terminate()
+
+        signal.signal(signal.SIGTERM, stop)
+        try:
+            for p in procs:
+                p.join()
+        except KeyboardInterrupt:
+            self.stdout.write("⏹️ Stopping workers after their current task...")
+            stop()
+            for p in procs:
+                p.join()
+
+        self.stdout.write("✅ Workers stopped")
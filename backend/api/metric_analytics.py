@@ -0,0 +1,236 @@
+"""
+Health-Metric Analytics
+-----------------------
+Per-metric statistics over a user's recent history, computed for every
+metric type at once from one query:
+
+• rolling 7-day mean (calendar days, gaps allowed)
+• robust z-score anomalies: residuals from a Theil–Sen line scaled
+  by their MAD, so a steady trend isn't mistaken for an outlier
+• least-squares slope (per week) fitted without the outliers and
+  t-tested, so one noisy reading can't flip the trend
+• per-cycle-phase baselines, phases derived from logged CycleRecords
+
+Grouped sums run through np.bincount over (metric, phase) codes, so the
+cost is a handful of array passes regardless of how many types are logged.
+Results are cached per user data version (api/cache.py).
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+from django.core.cache import cache
+
+from . import cycle_history
+from .cache import user_cached, user_key
+from .models import HealthMetric
+
+
+ANALYTICS_DAYS = 120
+ROLLING_DAYS = 7
+ANOMALY_Z = 3.5
+ANOMALY_RECENT_DAYS = 14
+TREND_T = 2.0            # |t| of the slope needed to call a trend
+MIN_TREND_POINTS = 4
+MAX_CYCLE_DAY = 45       # beyond this a day isn't assigned a phase
+
+PHASES = ["Menstrual", "Follicular", "Ovulation", "Luteal"]
+PHASE_ENDS = [5, 13, 16]     # last cycle day of each phase (as CycleHistory.phase)
+
+# Falling values are good news for these; rising for the rest
+LOWER_IS_BETTER = {"weight", "stress", "acne_severity"}
+
+
+# ============================================================
+# BUILDING BLOCKS
+# ============================================================
+
+def phase_codes(day_ordinals, start_ordinals):
+    """
+    Phase index (into PHASES) per day, -1 before the first logged cycle
+    or more than MAX_CYCLE_DAY days into a cycle.
+    """
+    days = np.asarray(day_ordinals, dtype=np.int64)
+    starts = np.asarray(start_ordinals, dtype=np.int64)
+    if starts.size == 0:
+        return np.full(days.shape, -1)
+
+    idx = np.searchsorted(starts, days, side="right") - 1
+    cycle_day = days - starts[np.clip(idx, 0, None)] + 1
+    codes = np.searchsorted(PHASE_ENDS, cycle_day, side="left")
+    return np.where((idx >= 0) & (cycle_day <= MAX_CYCLE_DAY), codes, -1)
+
+
+def rolling_mean(day_ordinals, values, window=ROLLING_DAYS):
+    """Mean of the readings in the `window` calendar days ending on each reading."""
+    days = np.asarray(day_ordinals, dtype=np.int64)
+    values = np.asarray(values, dtype=float)
+    if days.size == 0:
+        return values
+
+    offsets = days - days[0]
+    dense_sum = np.zeros(offsets[-1] + 1)
+    dense_cnt = np.zeros(offsets[-1] + 1)
+    np.add.at(dense_sum, offsets, values)
+    np.add.at(dense_cnt, offsets, 1)
+
+    csum = np.concatenate([[0.0], np.cumsum(dense_sum)])
+    ccnt = np.concatenate([[0.0], np.cumsum(dense_cnt)])
+    lo = np.clip(offsets - window + 1, 0, None)
+    return (csum[offsets + 1] - csum[lo]) / (ccnt[offsets + 1] - ccnt[lo])
+
+
+def _theil_sen_residuals(x, y):
+    """Residuals from the median-of-pairwise-slopes line (robust to outliers)."""
+    if x.size < 3:
+        return y - np.median(y)
+    i, j = np.triu_indices(x.size, k=1)
+    dx = x[j] - x[i]
+    valid = dx != 0
+    slope = np.median((y[j] - y[i])[valid] / dx[valid]) if valid.any() else 0.0
+    intercept = np.median(y - slope * x)
+    return y - (intercept + slope * x)
+
+
+def _robust_scale(resid):
+    """σ estimate: MAD / 0.6745, or the mean absolute deviation when MAD is 0."""
+    mad = np.median(np.abs(resid - np.median(resid)))
+    if mad > 0:
+        return mad / 0.6745
+    return 1.2533 * np.mean(np.abs(resid - np.median(resid)))
+
+
+def _grouped(codes, weights, n):
+    return np.bincount(codes, weights=weights, minlength=n)
+
+
+def _label(metric, rising):
+    return "improving" if rising != (metric in LOWER_IS_BETTER) else "worsening"
+
+
+def half_trend(metric, n1, s1, q1, n2, s2, q2):
+    """
+    Trend from the two halves of a window given each half's count, sum and
+    sum of squares: the change in mean must clear TREND_T standard errors
+    (Welch), so a single noisy reading can't flip it.
+    """
+    if min(n1, n2) < 2:
+        return "stable"
+    m1, m2 = s1 / n1, s2 / n2
+    v1 = max(q1 - n1 * m1 * m1, 0.0) / (n1 - 1)
+    v2 = max(q2 - n2 * m2 * m2, 0.0) / (n2 - 1)
+    se = np.sqrt(v1 / n1 + v2 / n2)
+    diff = m2 - m1
+    if diff == 0 or abs(diff) < TREND_T * se:
+        return "stable"
+    return _label(metric, diff > 0)
+
+
+# ============================================================
+# ANALYSIS
+# ============================================================
+
+def _analyze(rows, start_dates, today):
+    """rows: (metric_type, date, value) sorted by metric_type, date."""
+    if not rows:
+        return {}
+
+    types, dates, values = zip(*rows)
+    names, group = np.unique(np.array(types), return_inverse=True)
+    days = np.fromiter((d.toordinal() for d in dates), dtype=np.int64, count=len(dates))
+    y = np.array(values, dtype=float)
+    k = len(names)
+
+    x = (days - today.toordinal()).astype(float)
+    counts = _grouped(group, None, k)
+    my = _grouped(group, y, k) / counts
+
+    # ── robust z of residuals from a Theil–Sen line (rows are grouped contiguously) ──
+    bounds = np.flatnonzero(np.diff(group)) + 1
+    med = np.array([np.median(part) for part in np.split(y, bounds)])
+    resid = np.concatenate([
+        _theil_sen_residuals(xs, ys) for xs, ys in zip(np.split(x, bounds), np.split(y, bounds))
+    ])
+    scale = np.array([_robust_scale(part) for part in np.split(resid, bounds)])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(scale[group] > 0, resid / scale[group], 0.0)
+    outlier = np.abs(z) >= ANOMALY_Z
+    anomalous = outlier & (days >= today.toordinal() - ANOMALY_RECENT_DAYS)
+
+    # ── OLS slope + t-test per group, outliers left out ──
+    w = (~outlier).astype(float)
+    n = _grouped(group, w, k)
+    mx = _grouped(group, w * x, k) / np.maximum(n, 1)
+    mw = _grouped(group, w * y, k) / np.maximum(n, 1)
+    dx, dy = x - mx[group], y - mw[group]
+    sxx = _grouped(group, w * dx * dx, k)
+    sxy = _grouped(group, w * dx * dy, k)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where(sxx > 0, sxy / sxx, 0.0)
+        fit_resid = dy - slope[group] * dx
+        sse = _grouped(group, w * fit_resid * fit_resid, k)
+        se = np.sqrt(sse / np.maximum(n - 2, 1) / sxx)
+        t = np.where(se > 0, slope / se, np.where(slope != 0, np.inf, 0.0))
+    significant = (n >= MIN_TREND_POINTS) & (np.abs(t) >= TREND_T)
+
+    # ── rolling mean (per group, rows already in date order) ──
+    rolling = np.concatenate([
+        rolling_mean(d, v) for d, v in zip(np.split(days, bounds), np.split(y, bounds))
+    ])
+    last_row = np.append(bounds, len(y)) - 1
+
+    # ── per-phase baselines: one bincount over (group, phase) ──
+    phase = phase_codes(days, [d.toordinal() for d in start_dates])
+    labelled = phase >= 0
+    cell = group[labelled] * len(PHASES) + phase[labelled]
+    cells = k * len(PHASES)
+    p_n = _grouped(cell, None, cells).reshape(k, len(PHASES))
+    p_sum = _grouped(cell, y[labelled], cells).reshape(k, len(PHASES))
+
+    out = {}
+    for g, name in enumerate(names.tolist()):
+        direction = "stable"
+        if significant[g]:
+            direction = "rising" if slope[g] > 0 else "falling"
+        trend = "stable" if direction == "stable" else _label(name, direction == "rising")
+
+        rows_g = np.flatnonzero((group == g) & anomalous)
+        out[name] = {
+            "count": int(counts[g]),
+            "mean": round(float(my[g]), 2),
+            "median": round(float(med[g]), 2),
+            "rolling_mean_7d": round(float(rolling[last_row[g]]), 2),
+            "slope_per_week": round(float(slope[g]) * 7, 3),
+            "direction": direction,
+            "trend": trend,
+            "anomalies": [
+                {"date": dates[i], "value": float(y[i]), "z": round(float(z[i]), 1)}
+                for i in rows_g[-5:]
+            ],
+            "phase_baselines": {
+                PHASES[p]: {"mean": round(float(p_sum[g, p] / p_n[g, p]), 2), "count": int(p_n[g, p])}
+                for p in range(len(PHASES)) if p_n[g, p]
+            },
+        }
+    return out
+
+
+def analyze(profile, days=ANALYTICS_DAYS):
+    """{metric_type: analytics} over the last `days` days, cached per data version."""
+    today = datetime.now().date()
+
+    def compute():
+        rows = list(HealthMetric.objects.filter(
+            user=profile,
+            date__gte=today - timedelta(days=days),
+        ).order_by("metric_type", "date").values_list("metric_type", "date", "value"))
+        starts = cycle_history.for_profile(profile.id).start_dates
+        return _analyze(rows, starts, today)
+
+    return user_cached(profile, "metric_analytics", compute, days, today)
+
+
+def cached(profile, days=ANALYTICS_DAYS):
+    """analyze()'s result if it is already cached for this data version, else None."""
+    today = datetime.now().date()
+    return cache.get(user_key(profile, "metric_analytics", days, today))
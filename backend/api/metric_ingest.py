@@ -0,0 +1,233 @@
+"""
+Bulk Health-Metric Ingestion
+----------------------------
+Upserts thousands of HealthMetric rows per call (wearable sync, backfills):
+
+1. Columns are validated as NumPy arrays (dates, types, values, ranges)
+2. Within the batch the last row per (date, metric_type) wins
+3. One existing-key query tells created from updated
+4. bulk_create(update_conflicts=True) per chunk of CHUNK_SIZE
+
+Per-row status comes back as one character per input row:
+
+    c created · u updated · s superseded by a later row · x rejected
+"""
+
+import re
+from datetime import date
+
+import numpy as np
+
+from django.db import transaction
+
+from . import jobs, metric_rollups
+from .metric_rollups import week_start
+from .models import HealthMetric
+
+
+CHUNK_SIZE = 1000
+MAX_ROWS = 10000
+MAX_ERRORS = 50
+
+# Accepted value range per metric type (inclusive)
+METRIC_RANGES = {
+    "weight": (1, 500),
+    "sleep": (0, 24),
+    "stress": (1, 10),
+    "acne_severity": (1, 10),
+    "mood": (1, 10),
+    "energy": (1, 10),
+    "exercise_minutes": (0, 1440),
+}
+
+CREATED, UPDATED, SUPERSEDED, REJECTED = "c", "u", "s", "x"
+
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+# ============================================================
+# VALIDATION
+# ============================================================
+
+def _scalars(raw, accept, missing):
+    """1-D object array of the cells; anything `accept` rejects becomes `missing`."""
+    cells = np.empty(len(raw), dtype=object)
+    for i, value in enumerate(raw):
+        cells[i] = value if accept(value) else missing
+    return cells
+
+
+def _is_iso_date(value):
+    # Numbers would be read as days since the epoch, so only "YYYY-MM-DD"
+    return isinstance(value, str) and _ISO_DATE.fullmatch(value) is not None
+
+
+def _is_number(value):
+    return isinstance(value, (str, int, float)) and not isinstance(value, (bool, np.bool_))
+
+
+def _to_dates(raw):
+    """datetime64[D] array; NaT where a value isn't a valid ISO date."""
+    raw = _scalars(raw, _is_iso_date, "NaT")
+    try:
+        return raw.astype("datetime64[D]")
+    except (ValueError, TypeError):
+        out = np.full(len(raw), np.datetime64("NaT"), dtype="datetime64[D]")
+        for i, value in enumerate(raw):
+            try:
+                out[i] = np.datetime64(value, "D")
+            except (ValueError, TypeError):
+                pass
+        return out
+
+
+def _to_floats(raw):
+    """float array; NaN where a value isn't numeric."""
+    raw = _scalars(raw, _is_number, np.nan)
+    try:
+        return raw.astype(float)
+    except (ValueError, TypeError):
+        out = np.full(len(raw), np.nan)
+        for i, value in enumerate(raw):
+            try:
+                out[i] = float(value)
+            except (ValueError, TypeError):
+                pass
+        return out
+
+
+def validate(items):
+    """
+    Returns (dates, types, values, notes, errors, rejected): errors holds
+    a message per row (None when valid), rejected is the boolean mask.
+    """
+    n = len(items)
+    dicts = np.array([isinstance(item, dict) for item in items], dtype=bool)
+    get = lambda key: [item.get(key) if isinstance(item, dict) else None for item in items]
+
+    dates = _to_dates(get("date"))
+    types = np.array([str(t) if t is not None else "" for t in get("metric_type")], dtype=str)
+    values = _to_floats(get("value"))
+    notes = [str(x or "") for x in get("notes")]
+
+    known = np.array(sorted(METRIC_RANGES), dtype=str)
+    pos = np.clip(np.searchsorted(known, types), 0, len(known) - 1)
+    valid_type = known[pos] == types
+    lows = np.array([METRIC_RANGES[k][0] for k in known])[pos]
+    highs = np.array([METRIC_RANGES[k][1] for k in known])[pos]
+
+    with np.errstate(invalid="ignore"):
+        in_range = (values >= lows) & (values <= highs)
+
+    errors = np.full(n, None, dtype=object)
+    checks = [
+        (~dicts, "Expected an object"),
+        (np.isnat(dates), "Invalid date"),
+        (dates > np.datetime64(date.today()), "Date is in the future"),
+        (~valid_type, "Unknown metric_type"),
+        (~np.isfinite(values), "Value must be a number"),
+        (~in_range, "Value out of range"),
+    ]
+    # Reversed so the first failing check's message is the one kept
+    rejected = np.zeros(n, dtype=bool)
+    for mask, message in reversed(checks):
+        errors[mask] = message
+        rejected |= mask
+
+    return dates, types, values, notes, errors, rejected
+
+
+# ============================================================
+# UPSERT
+# ============================================================
+
+def bulk_upsert(profile, rows, overwrite=True):
+    """
+    Write HealthMetric objects (or any iterable of them) in chunks.
+    overwrite=False keeps rows that already exist for (date, metric_type).
+    """
+    if overwrite:
+        options = {
+            "update_conflicts": True,
+            "unique_fields": ["user", "date", "metric_type"],
+            "update_fields": ["value", "notes"],
+        }
+    else:
+        options = {"ignore_conflicts": True}
+
+    written = 0
+    chunk = []
+    buckets = set()
+    with transaction.atomic():
+        for row in rows:
+            chunk.append(row)
+            buckets.add((row.metric_type, week_start(row.date)))
+            if len(chunk) >= CHUNK_SIZE:
+                HealthMetric.objects.bulk_create(chunk, **options)
+                written += len(chunk)
+                chunk = []
+        if chunk:
+            HealthMetric.objects.bulk_create(chunk, **options)
+            written += len(chunk)
+
+        # bulk_create skips the post_save signals
+        if written:
+            metric_rollups.refresh(profile.id, buckets)
+            profile.bump_data_version()
+
+    if written:
+        jobs.refresh_insight(profile.id)
+    return written
+
+
+def upsert_metrics(profile, items):
+    """
+    Upsert `items` ([{date, metric_type, value, notes?}, ...]) for `profile`.
+    Returns {"created", "updated", "superseded", "rejected", "status", "errors"}.
+    """
+    if len(items) > MAX_ROWS:
+        raise ValueError(f"At most {MAX_ROWS} metrics per request")
+
+    dates, types, values, notes, errors, rejected = validate(items)
+    status = np.full(len(items), REJECTED, dtype="<U1")
+    valid = np.flatnonzero(~rejected)
+
+    # Last occurrence of each (date, type) wins
+    latest = {}
+    for i in valid:
+        key = (dates[i].item(), str(types[i]))
+        if key in latest:
+            status[latest[key]] = SUPERSEDED
+        latest[key] = i
+
+    if latest:
+        existing = set(
+            HealthMetric.objects.filter(
+                user=profile,
+                date__gte=min(d for d, _ in latest),
+                date__lte=max(d for d, _ in latest),
+                metric_type__in={t for _, t in latest},
+            ).values_list("date", "metric_type")
+        )
+
+        rows = []
+        for key, i in latest.items():
+            status[i] = UPDATED if key in existing else CREATED
+            rows.append(HealthMetric(
+                user=profile, date=key[0], metric_type=key[1],
+                value=float(values[i]), notes=notes[i]
+            ))
+
+        bulk_upsert(profile, rows)
+
+    codes = "".join(status.tolist())
+    return {
+        "created": codes.count(CREATED),
+        "updated": codes.count(UPDATED),
+        "superseded": codes.count(SUPERSEDED),
+        "rejected": codes.count(REJECTED),
+        "status": codes,
+        "errors": {
+            int(i): errors[i] for i in np.flatnonzero(rejected)[:MAX_ERRORS]
+        },
+    }
@@ -0,0 +1,197 @@
+"""
+Weekly Metric Rollups
+---------------------
+One HealthMetricRollup row per (user, metric_type, week) holding count,
+sum, min, max, first and last value.
+
+• HealthMetric signals call refresh() for the touched week (≤ 7 raw rows
+  per bucket, so a refresh is one small read + one upsert)
+• bulk paths (metric_ingest.bulk_upsert) refresh every week they wrote
+• rebuild() recomputes from scratch (see the rebuild_metric_rollups command)
+
+Reads over windows longer than a week go through window() / weekly():
+whole weeks come from rollups, partial weeks at either edge from raw rows.
+"""
+
+from datetime import date, datetime, timedelta
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import HealthMetric, HealthMetricRollup
+
+
+ROLLUP_MIN_DAYS = 7     # shorter windows read raw rows
+CHUNK_SIZE = 1000
+
+FIELDS = ["count", "total", "min_value", "max_value",
+          "first_date", "first_value", "last_date", "last_value"]
+
+
+def week_start(day):
+    if isinstance(day, str):
+        day = date.fromisoformat(day)
+    elif isinstance(day, datetime):
+        day = day.date()
+    return day - timedelta(days=day.weekday())
+
+
+# ============================================================
+# AGGREGATION
+# ============================================================
+
+def _piece(day, value):
+    return {
+        "count": 1, "total": value, "min_value": value, "max_value": value,
+        "first_date": day, "first_value": value, "last_date": day, "last_value": value,
+    }
+
+
+def _merge(a, b):
+    """Combine two aggregates (in any order) into a new one."""
+    first = a if a["first_date"] <= b["first_date"] else b
+    latest = a if a["last_date"] >= b["last_date"] else b
+    return {
+        "count": a["count"] + b["count"],
+        "total": a["total"] + b["total"],
+        "min_value": min(a["min_value"], b["min_value"]),
+        "max_value": max(a["max_value"], b["max_value"]),
+        "first_date": first["first_date"],
+        "first_value": first["first_value"],
+        "last_date": latest["last_date"],
+        "last_value": latest["last_value"],
+    }
+
+
+def _aggregate(rows):
+    """rows: (metric_type, date, value) → {(metric_type, week_start): aggregate}."""
+    out = {}
+    for metric, day, value in rows:
+        key = (metric, week_start(day))
+        piece = _piece(day, value)
+        out[key] = _merge(out[key], piece) if key in out else piece
+    return out
+
+
+# ============================================================
+# MAINTENANCE
+# ============================================================
+
+def _write(user_id, aggregates):
+    rows = [
+        HealthMetricRollup(user_id=user_id, metric_type=metric, week_start=week, **agg)
+        for (metric, week), agg in aggregates.items()
+    ]
+    HealthMetricRollup.objects.bulk_create(
+        rows,
+        batch_size=CHUNK_SIZE,
+        update_conflicts=True,
+        unique_fields=["user", "metric_type", "week_start"],
+        update_fields=FIELDS + ["updated_at"],
+    )
+
+
+def refresh(user_id, buckets):
+    """Recompute the given (metric_type, week_start) buckets of one user."""
+    buckets = set(buckets)
+    if not buckets:
+        return
+
+    weeks = {week for _, week in buckets}
+    rows = HealthMetric.objects.filter(
+        user_id=user_id,
+        metric_type__in={metric for metric, _ in buckets},
+        date__gte=min(weeks),
+        date__lte=max(weeks) + timedelta(days=6),
+    ).order_by().values_list("metric_type", "date", "value")
+
+    aggregates = {k: v for k, v in _aggregate(rows).items() if k in buckets}
+    empty = buckets - aggregates.keys()
+
+    with transaction.atomic():
+        if aggregates:
+            _write(user_id, aggregates)
+        if empty:
+            stale = Q()
+            for metric, week in empty:
+                stale |= Q(metric_type=metric, week_start=week)
+            HealthMetricRollup.objects.filter(stale, user_id=user_id).delete()
+
+
+def rebuild(user_id=None):
+    """Recompute all rollups (of one user, or everyone). Returns rows written."""
+    metrics = HealthMetric.objects.all()
+    rollups = HealthMetricRollup.objects.all()
+    if user_id is not None:
+        metrics = metrics.filter(user_id=user_id)
+        rollups = rollups.filter(user_id=user_id)
+
+    written = 0
+    with transaction.atomic():
+        rollups.delete()
+
+        current, rows = None, []
+        stream = metrics.order_by("user_id").values_list("user_id", "metric_type", "date", "value")
+        for uid, metric, day, value in stream.iterator(chunk_size=CHUNK_SIZE):
+            if uid != current:
+                if rows:
+                    aggregates = _aggregate(rows)
+                    _write(current, aggregates)
+                    written += len(aggregates)
+                current, rows = uid, []
+            rows.append((metric, day, value))
+        if rows:
+            aggregates = _aggregate(rows)
+            _write(current, aggregates)
+            written += len(aggregates)
+
+    return written
+
+
+# ============================================================
+# READS
+# ============================================================
+
+def _pieces(user_id, start, end, metric_types=None):
+    """
+    {(metric_type, week_start): aggregate} covering [start, end]:
+    full weeks from rollups, partial edge weeks from raw rows.
+    """
+    first_full = week_start(start) if start.weekday() == 0 else week_start(start) + timedelta(days=7)
+    last_full = week_start(end) if end.weekday() == 6 else week_start(end) - timedelta(days=7)
+
+    types = {"metric_type__in": list(metric_types)} if metric_types else {}
+    pieces = {}
+
+    if first_full <= last_full:
+        for r in HealthMetricRollup.objects.filter(
+            user_id=user_id, week_start__gte=first_full, week_start__lte=last_full, **types
+        ).order_by().values("metric_type", "week_start", *FIELDS):
+            pieces[(r.pop("metric_type"), r.pop("week_start"))] = r
+        edges = Q(date__gte=start, date__lt=first_full) | \
+            Q(date__gt=last_full + timedelta(days=6), date__lte=end)
+    else:
+        edges = Q(date__gte=start, date__lte=end)
+
+    raw = HealthMetric.objects.filter(edges, user_id=user_id, **types) \
+        .order_by().values_list("metric_type", "date", "value")
+    for key, agg in _aggregate(raw).items():
+        pieces[key] = _merge(pieces[key], agg) if key in pieces else agg
+
+    return pieces
+
+
+def window(user_id, start, end, metric_types=None):
+    """Per metric type: one aggregate (count, total, min/max, first/last) over [start, end]."""
+    out = {}
+    for (metric, _), agg in sorted(_pieces(user_id, start, end, metric_types).items()):
+        out[metric] = _merge(out[metric], agg) if metric in out else agg
+    return out
+
+
+def weekly(user_id, metric_types, start, end):
+    """{metric_type: [(week_start, aggregate)]} over [start, end], oldest first."""
+    out = {}
+    for (metric, week), agg in sorted(_pieces(user_id, start, end, metric_types).items()):
+        out.setdefault(metric, []).append((week, agg))
+    return out
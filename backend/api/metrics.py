@@ -0,0 +1,324 @@
+"""
+Instrumentation Registry
+------------------------
+Small Prometheus-compatible metrics layer used by:
+
+• MetricsMiddleware   → view latency + DB time per request
+• api.llm             → LLM latency + token usage per call site
+• cache helpers       → hit / miss counters
+
+Each gunicorn worker keeps its own in-memory registry. When
+METRICS_MULTIPROC_DIR is set, a background thread in every worker
+writes a snapshot file there each METRICS_FLUSH_INTERVAL seconds and
+/api/metrics/ merges all snapshots, so the scraped numbers cover every
+worker, not just the one that answered. Snapshots of exited workers are
+pruned on scrape (the directory must not be shared across pid
+namespaces).
+"""
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from bisect import bisect_left
+
+from django.conf import settings
+
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+
+# ============================================================
+# METRIC TYPES
+# ============================================================
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(l, "")) for l in self.labelnames)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+        _maybe_flush()
+
+    def snapshot(self):
+        return [[list(k), v] for k, v in self.values.items()]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # label key -> [per-bucket counts..., +Inf count, sum]
+        self.values = {}
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(l, "")) for l in self.labelnames)
+        idx = bisect_left(self.buckets, value)
+        with _lock:
+            row = self.values.get(key)
+            if row is None:
+                row = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            row[idx] += 1
+            row[-1] += value
+        _maybe_flush()
+
+    def snapshot(self):
+        return [[list(k), list(v)] for k, v in self.values.items()]
+
+
+# ============================================================
+# REGISTRY
+# ============================================================
+
+_lock = threading.Lock()
+_registry = {}
+
+
+def _register(metric):
+    _registry[metric.name] = metric
+    return metric
+
+
+REQUEST_LATENCY = _register(Histogram(
+    "ovasense_http_request_duration_seconds",
+    "View latency in seconds.",
+    ("view", "method", "status"),
+))
+REQUEST_DB_TIME = _register(Histogram(
+    "ovasense_http_request_db_seconds",
+    "Total database time spent per request in seconds.",
+    ("view",),
+))
+DB_QUERIES = _register(Counter(
+    "ovasense_db_queries_total",
+    "Database queries executed, by view.",
+    ("view",),
+))
+LLM_LATENCY = _register(Histogram(
+    "ovasense_llm_request_duration_seconds",
+    "LLM call latency in seconds, by call site.",
+    ("call_site", "outcome"),
+))
+LLM_TOKENS = _register(Histogram(
+    "ovasense_llm_tokens",
+    "Tokens used per LLM call, by call site and kind (prompt/completion).",
+    ("call_site", "kind"),
+    buckets=TOKEN_BUCKETS,
+))
+CACHE_REQUESTS = _register(Counter(
+    "ovasense_cache_requests_total",
+    "Cache lookups, by cache name and result (hit/miss).",
+    ("cache", "result"),
+))
+
+
+def record_cache(cache_name, hit):
+    CACHE_REQUESTS.inc(cache=cache_name, result="hit" if hit else "miss")
+
+
+# ============================================================
+# MULTI-PROCESS SNAPSHOTS
+# ============================================================
+
+_process_token = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+_flush_lock = threading.Lock()
+_flusher_lock = threading.Lock()
+_flusher_pid = None
+
+
+def _multiproc_dir():
+    return getattr(settings, "METRICS_MULTIPROC_DIR", None)
+
+
+def _snapshot():
+    with _lock:
+        return {name: m.snapshot() for name, m in _registry.items()}
+
+
+def flush():
+    """Write this process's snapshot to the shared directory (atomic replace)."""
+    global _process_token
+
+    directory = _multiproc_dir()
+    if not directory:
+        return
+
+    # Forked workers inherit the parent's token; give each its own file.
+    if not _process_token.startswith(f"{os.getpid()}-"):
+        _process_token = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+    with _flush_lock:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"metrics-{_process_token}.json")
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=f"metrics-{os.getpid()}-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as fh:
+                json.dump(_snapshot(), fh)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"⚠️ Metrics flush failed: {e}")
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+
+def _flush_loop():
+    while True:
+        time.sleep(getattr(settings, "METRICS_FLUSH_INTERVAL", 1.0))
+        flush()
+
+
+def _maybe_flush():
+    """
+    Make sure this process has its background flusher; observe() never
+    touches the disk itself. Threads don't survive fork, so a worker whose
+    pid differs from the one that started the flusher starts its own.
+    """
+    global _flusher_pid
+    if _flusher_pid == os.getpid() or not _multiproc_dir():
+        return
+    with _flusher_lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+    threading.Thread(target=_flush_loop, name="metrics-flush", daemon=True).start()
+
+
+atexit.register(flush)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True         # exists, owned by someone else
+    return True
+
+
+def _prune(directory, fname):
+    """Remove a snapshot (or stray temp file) left by a process that has exited."""
+    try:
+        pid = int(fname.split("-")[1])
+    except (IndexError, ValueError):
+        return False
+    if _pid_alive(pid):
+        return False
+    try:
+        os.unlink(os.path.join(directory, fname))
+    except OSError:
+        pass
+    return True
+
+
+def _collect():
+    """
+    Merge snapshots of every process into {name: {label_key: value}}.
+    Without a multiproc dir this is just the local registry.
+    """
+    directory = _multiproc_dir()
+    if not directory:
+        snapshots = [_snapshot()]
+    else:
+        flush()
+        snapshots = []
+        for fname in os.listdir(directory):
+            if not fname.startswith("metrics-") or _prune(directory, fname):
+                continue
+            if not fname.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(directory, fname)) as fh:
+                    snapshots.append(json.load(fh))
+            except (OSError, ValueError):
+                continue
+
+    merged = {name: {} for name in _registry}
+    for snap in snapshots:
+        for name, rows in snap.items():
+            if name not in merged:
+                continue
+            target = merged[name]
+            for key, value in rows:
+                key = tuple(key)
+                if isinstance(value, list):
+                    existing = target.get(key)
+                    if existing is None or len(existing) != len(value):
+                        target[key] = list(value)
+                    else:
+                        target[key] = [a + b for a, b in zip(existing, value)]
+                else:
+                    target[key] = target.get(key, 0) + value
+    return merged
+
+
+# ============================================================
+# PROMETHEUS TEXT FORMAT
+# ============================================================
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _fmt_num(v):
+    if v == float("inf"):
+        return "+Inf"
+    if float(v).is_integer():
+        return str(int(v))
+    return repr(float(v))
+
+
+def render():
+    merged = _collect()
+    lines = []
+
+    for name, metric in _registry.items():
+        lines.append(f"# HELP {name} {metric.help}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+
+        for key, value in sorted(merged[name].items()):
+            if metric.kind == "counter":
+                lines.append(f"{name}{_fmt_labels(metric.labelnames, key)} {_fmt_num(value)}")
+                continue
+
+            cumulative = 0
+            bounds = list(metric.buckets) + [float("inf")]
+            for bound, count in zip(bounds, value[:-1]):
+                cumulative += count
+                le = ("le", _fmt_num(bound))
+                lines.append(
+                    f"{name}_bucket{_fmt_labels(metric.labelnames, key, le)} {cumulative}"
+                )
+            lines.append(f"{name}_sum{_fmt_labels(metric.labelnames, key)} {_fmt_num(value[-1])}")
+            lines.append(f"{name}_count{_fmt_labels(metric.labelnames, key)} {cumulative}")
+
+    return "\n".join(lines) + "\n"
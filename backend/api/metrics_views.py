@@ -0,0 +1,25 @@
+"""
+metrics_views.py
+Prometheus scrape endpoint.
+"""
+from django.conf import settings
+from django.http import HttpResponse
+
+from . import metrics
+
+
+def metrics_view(request):
+    """
+    GET /api/metrics/
+
+    Prometheus text exposition, merged across worker processes.
+    If METRICS_TOKEN is set, requires `Authorization: Bearer <token>`.
+    """
+    token = getattr(settings, "METRICS_TOKEN", None)
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return HttpResponse("Unauthorized", status=401, content_type="text/plain")
+
+    return HttpResponse(
+        metrics.render(),
+        content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
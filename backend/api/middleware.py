@@ -1,3 +1,10 @@
+import time
+
+from django.db import connection
+
+from . import cycle_history, metrics
+
+
 class DisableCSRFMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
@@ -8,3 +15,55 @@ class DisableCSRFMiddleware:
             setattr(request, "_dont_enforce_csrf_checks", True)
 
         return self.get_response(request)
+
+
+class MetricsMiddleware:
+    """
+    Records view latency, DB time and query count for every request.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        db_time = [0.0, 0]
+
+        def timed_execute(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                db_time[0] += time.perf_counter() - start
+                db_time[1] += 1
+
+        start = time.perf_counter()
+        with connection.execute_wrapper(timed_execute):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        match = getattr(request, "resolver_match", None)
+        view = (match.view_name or match.route) if match else "unmatched"
+
+        metrics.REQUEST_LATENCY.observe(
+            elapsed,
+            view=view,
+            method=request.method,
+            status=f"{response.status_code // 100}xx",
+        )
+        metrics.REQUEST_DB_TIME.observe(db_time[0], view=view)
+        if db_time[1]:
+            metrics.DB_QUERIES.inc(db_time[1], view=view)
+
+        return response
+
+
+class RequestMemoMiddleware:
+    """
+    Per-request memo scope, so engines share one CycleHistory per user
+    instead of each querying CycleRecord again.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with cycle_history.scope():
+            return self.get_response(request)
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.1 on 2026-10-19 04:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_userprofile_data_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CycleStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cycle_count', models.IntegerField(default=0)),
+                ('gap_count', models.IntegerField(default=0)),
+                ('gap_mean', models.FloatField(default=0)),
+                ('gap_m2', models.FloatField(default=0, help_text='Sum of squared deviations from the mean')),
+                ('last_start', models.DateField(blank=True, null=True)),
+                ('recent_gaps', models.JSONField(blank=True, default=list, help_text='Last few gaps in days, newest first')),
+                ('irregular', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='cycle_stats', to='api.userprofile')),
+            ],
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.1 on 2026-10-19 04:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_cyclestats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cyclestats',
+            name='forecast_version',
+            field=models.PositiveIntegerField(blank=True, help_text='UserProfile.data_version the predicted CycleRecords were written for', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='cyclerecord',
+            index=models.Index(fields=['user', 'start_date'], name='cycle_user_start_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.0.1 on 2026-10-19 04:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_rollups(apps, schema_editor):
+    from api.metric_rollups import _aggregate
+
+    HealthMetric = apps.get_model("api", "HealthMetric")
+    HealthMetricRollup = apps.get_model("api", "HealthMetricRollup")
+
+    user_ids = HealthMetric.objects.values_list("user_id", flat=True).distinct()
+    for user_id in user_ids.iterator():
+        rows = HealthMetric.objects.filter(user_id=user_id).values_list("metric_type", "date", "value")
+        HealthMetricRollup.objects.bulk_create([
+            HealthMetricRollup(user_id=user_id, metric_type=metric, week_start=week, **agg)
+            for (metric, week), agg in _aggregate(rows).items()
+        ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_cycle_calendar'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HealthMetricRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric_type', models.CharField(choices=[('weight', 'Weight (kg)'), ('sleep', 'Sleep Hours'), ('stress', 'Stress Level (1-10)'), ('acne_severity', 'Acne Severity (1-10)'), ('mood', 'Mood (1-10)'), ('energy', 'Energy Level (1-10)'), ('exercise_minutes', 'Exercise Minutes')], max_length=50)),
+                ('week_start', models.DateField(help_text='Monday of the week')),
+                ('count', models.IntegerField(default=0)),
+                ('total', models.FloatField(default=0, help_text='Sum of values')),
+                ('min_value', models.FloatField()),
+                ('max_value', models.FloatField()),
+                ('first_date', models.DateField()),
+                ('first_value', models.FloatField()),
+                ('last_date', models.DateField()),
+                ('last_value', models.FloatField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='metric_rollups', to='api.userprofile')),
+            ],
+            options={
+                'ordering': ['week_start'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='healthmetricrollup',
+            constraint=models.UniqueConstraint(fields=('user', 'metric_type', 'week_start'), name='unique_metric_rollup_week'),
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,95 @@
+# Full-text search index for KnowledgeArticle (api/search.py).
+#
+# PostgreSQL: a generated, weighted tsvector column + GIN index.
+# SQLite: an external-content FTS5 table kept in sync by triggers.
+# Both are maintained by the database on every save, bulk writes included.
+# Other backends get nothing and search falls back to icontains.
+
+from django.db import migrations
+
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE api_knowledgearticle ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(summary, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(content, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX article_search_idx ON api_knowledgearticle USING GIN (search_vector)",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS article_search_idx",
+    "ALTER TABLE api_knowledgearticle DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE api_article_fts USING fts5(
+        title, summary, content,
+        content='api_knowledgearticle', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER api_article_fts_insert AFTER INSERT ON api_knowledgearticle BEGIN
+        INSERT INTO api_article_fts(rowid, title, summary, content)
+        VALUES (new.id, new.title, new.summary, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER api_article_fts_delete AFTER DELETE ON api_knowledgearticle BEGIN
+        INSERT INTO api_article_fts(api_article_fts, rowid, title, summary, content)
+        VALUES ('delete', old.id, old.title, old.summary, old.content);
+    END
+    """,
+    # Only text edits touch the index (view counters don't)
+    """
+    CREATE TRIGGER api_article_fts_update AFTER UPDATE OF title, summary, content
+    ON api_knowledgearticle BEGIN
+        INSERT INTO api_article_fts(api_article_fts, rowid, title, summary, content)
+        VALUES ('delete', old.id, old.title, old.summary, old.content);
+        INSERT INTO api_article_fts(rowid, title, summary, content)
+        VALUES (new.id, new.title, new.summary, new.content);
+    END
+    """,
+    "INSERT INTO api_article_fts(api_article_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS api_article_fts_insert",
+    "DROP TRIGGER IF EXISTS api_article_fts_delete",
+    "DROP TRIGGER IF EXISTS api_article_fts_update",
+    "DROP TABLE IF EXISTS api_article_fts",
+]
+
+STATEMENTS = {
+    "postgresql": (POSTGRES_FORWARD, POSTGRES_BACKWARD),
+    "sqlite": (SQLITE_FORWARD, SQLITE_BACKWARD),
+}
+
+
+def _run(schema_editor, direction):
+    statements = STATEMENTS.get(schema_editor.connection.vendor)
+    if statements:
+        for sql in statements[direction]:
+            schema_editor.execute(sql)
+
+
+def forward(apps, schema_editor):
+    _run(schema_editor, 0)
+
+
+def backward(apps, schema_editor):
+    _run(schema_editor, 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_health_metric_rollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(forward, backward),
+    ]
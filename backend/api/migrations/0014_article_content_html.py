@@ -0,0 +1,29 @@
+# Generated by Django 5.0.1 on 2026-10-19 05:10
+
+from django.db import migrations, models
+
+
+def render_existing(apps, schema_editor):
+    from api.articles import render_markdown
+
+    KnowledgeArticle = apps.get_model("api", "KnowledgeArticle")
+    articles = list(KnowledgeArticle.objects.only("id", "content"))
+    for article in articles:
+        article.content_html = render_markdown(article.content)
+    KnowledgeArticle.objects.bulk_update(articles, ["content_html"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_article_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='knowledgearticle',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False, help_text='Sanitized HTML rendered from content on save'),
+        ),
+        migrations.RunPython(render_existing, migrations.RunPython.noop),
+    ]
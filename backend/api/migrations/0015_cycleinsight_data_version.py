@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-19 05:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_article_content_html'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cycleinsight',
+            name='data_version',
+            field=models.PositiveIntegerField(blank=True, help_text='UserProfile.data_version the insight was generated from', null=True),
+        ),
+        migrations.AddField(
+            model_name='cycleinsight',
+            name='fallback',
+            field=models.BooleanField(default=False, help_text='Basic analysis stored while the AI was unavailable'),
+        ),
+    ]
@@ -3,12 +3,9 @@ OvaSense ML Engine
 Hybrid PCOS Intelligence Engine
 """
 
-import os
 import json
-from groq import Groq
-from dotenv import load_dotenv
 
-load_dotenv()
+from . import llm
 
 
 # ============================================================
@@ -49,8 +46,8 @@ def rule_based_classification(symptom_data):
     sleep = symptom_data.get("sleep_hours", 8)
 
     ovulatory = regular is False
-    androgen = acne or hair or dark
-    metabolic = bmi >= 27 or dark
+    androgen = bool(acne or hair or dark)
+    metabolic = bool(bmi >= 27 or dark)
 
     criteria = sum([ovulatory, androgen, metabolic])
 
@@ -99,8 +96,6 @@ def rule_based_classification(symptom_data):
 def generate_llm_explanation(symptom_data, phenotype):
 
     try:
-        client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-
         prompt = f"""
 Explain WHY this PCOS phenotype was predicted.
 
@@ -113,14 +108,14 @@ Symptoms:
 Keep it short.
 """
 
-        chat = client.chat.completions.create(
-            model=os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile"),
+        text = llm.chat_completion(
+            "classify",
             messages=[{"role": "user", "content": prompt}],
             temperature=0.3,
             max_tokens=300,
         )
 
-        return chat.choices[0].message.content.strip()
+        return text.strip()
 
     except Exception as e:
         print("⚠️ Explanation LLM failed:", e)
@@ -134,8 +129,6 @@ Keep it short.
 def generate_predictive_analysis(symptom_data, phenotype):
 
     try:
-        client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-
         prompt = f"""
 Predict PCOS risk for next 3-6 months.
 
@@ -154,14 +147,14 @@ Return ONLY JSON:
 }}
 """
 
-        chat = client.chat.completions.create(
-            model=os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile"),
+        text = llm.chat_completion(
+            "predictive",
             messages=[{"role": "user", "content": prompt}],
             temperature=0,
             max_tokens=400,
         )
 
-        result = safe_json_parse(chat.choices[0].message.content)
+        result = safe_json_parse(text)
         if result and "future_risk_score" in result:
             try:
                 # Handle 0-1 range by converting to percentage
@@ -178,6 +171,61 @@ Return ONLY JSON:
         return {}
 
 
+# ============================================================
+# AI SECTIONS (explanation + diet plan stored on the result)
+# ============================================================
+
+def generate_ai_sections(symptom_data, classification):
+    """
+    Returns (ai_explanation, diet_plan).
+    Used inline by /api/classify/ or by the classify.ai_sections task.
+    """
+    try:
+        if not llm.is_configured():
+            return "GROQ_API_KEY missing. AI analysis skipped.", "Diet plan unavailable."
+
+        symptom_summary = json.dumps(
+            {k: v for k, v in symptom_data.items() if v is not None},
+            indent=2
+        )
+
+        ai_prompt = f"""You are an expert PCOS endocrinologist.
+
+Patient phenotype: {classification['phenotype']}
+Confidence: {classification['confidence']}%
+
+Symptoms:
+{symptom_summary}
+
+Reasons: {'; '.join(classification['reasons'])}
+
+Return TWO SECTIONS:
+
+SECTION 1 - ANALYSIS
+Explain why this phenotype.
+
+SECTION 2 - DIET PLAN
+Give personalized diet advice.
+"""
+
+        full_response = llm.chat_completion(
+            "classify",
+            messages=[{"role": "user", "content": ai_prompt}],
+            temperature=0.4,
+            max_tokens=1200,
+        )
+
+        if "SECTION 2" in full_response:
+            parts = full_response.split("SECTION 2")
+            return parts[0].replace("SECTION 1", "").strip(), parts[1].strip()
+
+        return full_response, "Diet plan unavailable."
+
+    except Exception as e:
+        print("Groq AI error:", e)
+        return "AI analysis unavailable.", "Diet plan generation failed."
+
+
 # ============================================================
 # MAIN ENTRY
 # ============================================================
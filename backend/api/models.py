@@ -180,11 +180,31 @@ class UserProfile(models.Model):
     height_cm = models.FloatField(null=True, blank=True)
     preferences = models.JSONField(default=dict, blank=True)
 
+    # Bumped on every cycle / metric write; part of every per-user cache key
+    # (api/cache.py). Only changed through bump_data_version().
+    data_version = models.PositiveIntegerField(default=0, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return self.user.username
 
+    def save(self, *args, **kwargs):
+        # A stale in-memory profile must never roll data_version back, or
+        # cache entries from older versions would become reachable again.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name != "data_version"
+            ]
+        super().save(*args, **kwargs)
+
+    def bump_data_version(self):
+        UserProfile.objects.filter(pk=self.pk).update(
+            data_version=models.F("data_version") + 1
+        )
+        self.refresh_from_db(fields=["data_version"])
+
 
 
 class CycleRecord(models.Model):
@@ -236,6 +256,54 @@ class CycleRecord(models.Model):
 
     class Meta:
         ordering = ['-start_date']
+        indexes = [
+            models.Index(fields=['user', 'start_date'], name='cycle_user_start_idx'),
+        ]
+
+
+
+class CycleStats(models.Model):
+    """
+    Running statistics of a user's logged (non-predicted) cycles.
+    Kept current by CycleRecord signals (api/cycle_stats.py) so prediction
+    and irregularity checks are single-row reads.
+
+    Gaps are days between consecutive start dates; mean / M2 follow
+    Welford's online algorithm.
+    """
+    user = models.OneToOneField(
+        UserProfile,
+        on_delete=models.CASCADE,
+        related_name='cycle_stats'
+    )
+    cycle_count = models.IntegerField(default=0)
+    gap_count = models.IntegerField(default=0)
+    gap_mean = models.FloatField(default=0)
+    gap_m2 = models.FloatField(default=0, help_text="Sum of squared deviations from the mean")
+    last_start = models.DateField(null=True, blank=True)
+    recent_gaps = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Last few gaps in days, newest first"
+    )
+    irregular = models.BooleanField(default=False)
+    forecast_version = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="UserProfile.data_version the predicted CycleRecords were written for"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def gap_variance(self):
+        return self.gap_m2 / self.gap_count if self.gap_count else 0.0
+
+    @property
+    def gap_std(self):
+        return self.gap_variance ** 0.5
+
+    def __str__(self):
+        return f"Cycle stats for {self.user_id}"
 
 
 class HealthMetric(models.Model):
@@ -283,6 +351,47 @@ class HealthMetric(models.Model):
         unique_together = ['user', 'date', 'metric_type']
 
 
+class HealthMetricRollup(models.Model):
+    """
+    Weekly aggregate of one metric type for one user (weeks start Monday).
+    Kept current by HealthMetric signals and the bulk import paths
+    (api/metric_rollups.py); trend / history reads over windows longer
+    than a week use these instead of raw rows.
+    """
+    user = models.ForeignKey(
+        UserProfile,
+        on_delete=models.CASCADE,
+        related_name='metric_rollups'
+    )
+    metric_type = models.CharField(max_length=50, choices=HealthMetric.METRIC_TYPES)
+    week_start = models.DateField(help_text="Monday of the week")
+    count = models.IntegerField(default=0)
+    total = models.FloatField(default=0, help_text="Sum of values")
+    min_value = models.FloatField()
+    max_value = models.FloatField()
+    first_date = models.DateField()
+    first_value = models.FloatField()
+    last_date = models.DateField()
+    last_value = models.FloatField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def __str__(self):
+        return f"{self.user_id} - {self.metric_type} week of {self.week_start}"
+
+    class Meta:
+        ordering = ['week_start']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'metric_type', 'week_start'],
+                name='unique_metric_rollup_week'
+            ),
+        ]
+
+
 class KnowledgeArticle(models.Model):
     """
     Knowledge base articles for PCOS education and lifestyle guidance.
@@ -314,6 +423,11 @@ class KnowledgeArticle(models.Model):
     content = models.TextField(
         help_text="Article content in Markdown format"
     )
+    content_html = models.TextField(
+        blank=True,
+        editable=False,
+        help_text="Sanitized HTML rendered from content on save"
+    )
     summary = models.TextField(
         blank=True,
         help_text="Short summary for article cards"
@@ -348,6 +462,14 @@ class KnowledgeArticle(models.Model):
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        from .articles import render_markdown
+        self.content_html = render_markdown(self.content)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "content" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "content_html"}
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ['-publish_date']
 
@@ -359,11 +481,17 @@ class CycleInsight(models.Model):
     risk_score = models.IntegerField()
     main_reason = models.TextField()
     recommendations = models.JSONField(default=list)
+    data_version = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="UserProfile.data_version the insight was generated from"
+    )
+    fallback = models.BooleanField(default=False, help_text="Basic analysis stored while the AI was unavailable")
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ['-created_at']
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 
@@ -380,6 +508,64 @@ def save_user_profile(sender, instance, **kwargs):
         instance.profile.save()
 
 
+@receiver(pre_save, sender=CycleRecord)
+def remember_cycle_start(sender, instance, **kwargs):
+    instance._old_start_date = None
+    if instance.pk and not instance._state.adding:
+        instance._old_start_date = CycleRecord.objects.filter(
+            pk=instance.pk
+        ).values_list("start_date", flat=True).first()
+
+
+@receiver(post_save, sender=CycleRecord)
+def update_cycle_stats_on_save(sender, instance, created, **kwargs):
+    from . import cycle_history
+    from .cycle_stats import record_saved
+    record_saved(instance, getattr(instance, "_old_start_date", None), created)
+    cycle_history.invalidate(instance.user_id)
+
+
+@receiver(post_delete, sender=CycleRecord)
+def update_cycle_stats_on_delete(sender, instance, **kwargs):
+    from . import cycle_history
+    from .cycle_stats import record_deleted
+    record_deleted(instance)
+    cycle_history.invalidate(instance.user_id)
+
+
+@receiver(pre_save, sender=HealthMetric)
+def remember_metric_bucket(sender, instance, **kwargs):
+    instance._old_bucket = None
+    if instance.pk and not instance._state.adding:
+        instance._old_bucket = HealthMetric.objects.filter(
+            pk=instance.pk
+        ).values_list("metric_type", "date").first()
+
+
+@receiver(post_save, sender=HealthMetric)
+@receiver(post_delete, sender=HealthMetric)
+def update_metric_rollup(sender, instance, **kwargs):
+    from .metric_rollups import refresh, week_start
+    buckets = {(instance.metric_type, week_start(instance.date))}
+    old = getattr(instance, "_old_bucket", None)
+    if old:
+        buckets.add((old[0], week_start(old[1])))
+    refresh(instance.user_id, buckets)
+
+
+@receiver(post_save, sender=CycleRecord)
+@receiver(post_delete, sender=CycleRecord)
+@receiver(post_save, sender=HealthMetric)
+@receiver(post_delete, sender=HealthMetric)
+def bump_user_data_version(sender, instance, **kwargs):
+    # Forecast rows are derived data; writing them must not invalidate
+    if getattr(instance, "predicted", False):
+        return
+    UserProfile.objects.filter(pk=instance.user_id).update(
+        data_version=models.F("data_version") + 1
+    )
+
+
 class ChatSession(models.Model):
     """
     Stores persistent chat history for Baymax interactions.
@@ -403,3 +589,70 @@ class ChatSession(models.Model):
 
     def __str__(self):
         return f"{self.user.name} - {self.sender} - {self.created_at}"
+
+
+class BackgroundTask(models.Model):
+    """
+    Durable job queue row, processed by `manage.py run_worker`.
+    See api/tasks.py for enqueue / claim / retry logic.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    ACTIVE_STATUSES = ['pending', 'running']
+
+    name = models.CharField(max_length=100, help_text="Registered task name")
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    priority = models.IntegerField(default=0, help_text="Higher runs first")
+    dedupe_key = models.CharField(
+        max_length=200,
+        null=True,
+        blank=True,
+        help_text="Only one pending task may hold a given key"
+    )
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=5)
+    run_at = models.DateTimeField(help_text="Not claimed before this time (used for backoff)")
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    result = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_at', 'priority'], name='task_claim_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dedupe_key'],
+                condition=models.Q(status='pending'),
+                name='unique_pending_task_dedupe_key',
+            ),
+        ]
+
+
+class RenderedReport(models.Model):
+    """
+    PDF bytes rendered off the request path by the `report.render` task.
+    Dropped whenever the result's AI sections change.
+    """
+    result = models.OneToOneField(
+        PhenotypeResult,
+        on_delete=models.CASCADE,
+        related_name='rendered_report'
+    )
+    pdf = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Report for result {self.result_id}"
@@ -12,15 +12,10 @@ No hardcoded medical logic.
 Explainable + auditable.
 """
 
-import os
 import json
 from datetime import datetime, timedelta
-from groq import Groq
-from dotenv import load_dotenv
 
-from .models import CycleRecord, HealthMetric
-
-load_dotenv()
+from . import cycle_history, llm, metric_rollups
 
 
 # ============================================================
@@ -29,24 +24,23 @@ load_dotenv()
 
 def get_patient_history(profile):
 
-    cycles = CycleRecord.objects.filter(
-        user=profile,
-        predicted=False
-    ).order_by("-start_date")[:6]
-
-    cycle_lengths = []
-    for i in range(len(cycles)-1):
-        gap = (cycles[i].start_date - cycles[i+1].start_date).days
-        cycle_lengths.append(gap)
+    # Newest first, from the last six cycles
+    cycle_lengths = cycle_history.for_profile(profile.id).recent_gaps(5)
 
-    metrics = HealthMetric.objects.filter(
-        user=profile,
-        date__gte=datetime.now().date() - timedelta(days=30)
-    )
+    # Last 30 days per metric, from the weekly rollups
+    today = datetime.now().date()
+    window = metric_rollups.window(profile.id, today - timedelta(days=30), today)
 
-    metric_summary = {}
-    for m in metrics:
-        metric_summary.setdefault(m.metric_type, []).append(m.value)
+    metric_summary = {
+        metric: {
+            "avg": round(agg["total"] / agg["count"], 2),
+            "min": agg["min_value"],
+            "max": agg["max_value"],
+            "latest": agg["last_value"],
+            "count": agg["count"],
+        }
+        for metric, agg in window.items()
+    }
 
     return {
         "recent_cycle_lengths": cycle_lengths,
@@ -94,18 +88,14 @@ Do NOT add extra text.
 def run_predictive_llm(symptoms, history, phenotype):
 
     try:
-        client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-
         prompt = build_predictive_prompt(symptoms, history, phenotype)
 
-        chat = client.chat.completions.create(
-            model=os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile"),
+        text = llm.chat_completion(
+            "predictive",
             messages=[{"role": "user", "content": prompt}],
             temperature=0,
             max_tokens=400,
-        )
-
-        text = chat.choices[0].message.content.strip()
+        ).strip()
 
         # Remove ```json fences if present
         if "```" in text:
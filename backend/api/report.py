@@ -1,12 +1,10 @@
 """
 PDF report generation for PCOS phenotype results.
 Includes AI-powered analysis and personalized diet plan.
+
+reportlab is imported inside generate_pdf_report so workers that never
+render a report don't pay for it at boot.
 """
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-from reportlab.lib import colors
 from io import BytesIO
 from datetime import datetime
 
@@ -15,6 +13,12 @@ def generate_pdf_report(symptom_log, phenotype_result, ai_explanation="", diet_p
     """
     Generate a comprehensive PDF report with AI analysis and diet plan.
     """
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+    from reportlab.lib import colors
+
     buffer = BytesIO()
     doc = SimpleDocTemplate(
         buffer, pagesize=letter,
@@ -0,0 +1,211 @@
+"""
+Knowledge Article Search
+------------------------
+Ranked full-text search over published KnowledgeArticles, backed by the
+index migration 0013 creates for the database in use:
+
+    postgresql  search_vector (weighted tsvector, GIN) + ts_rank_cd / ts_headline
+    sqlite      api_article_fts (FTS5, porter stemming) + bm25 / snippet
+
+Every query word is prefix-matched and all must appear, so results stay
+useful while the user is still typing. Title matches outrank summary
+matches, which outrank body matches. Other backends fall back to a plain
+icontains filter (no rank, no snippet).
+
+Snippets come from the article body: HTML-escaped text with the matched
+words wrapped in <mark>.
+"""
+
+import html
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import KnowledgeArticle
+
+
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 50
+MAX_TERMS = 8
+
+# Column weights for bm25 (title, summary, content)
+FTS_WEIGHTS = (10.0, 4.0, 1.0)
+SNIPPET_WORDS = 16
+
+# Control characters can't occur in article text; they mark matches until escaping
+_START, _STOP = "\x02", "\x03"
+_MARKDOWN = re.compile(r"[#*_`]+")
+
+
+def terms(query):
+    return re.findall(r"\w+", (query or "").lower())[:MAX_TERMS]
+
+
+def _highlight(snippet):
+    if not snippet:
+        return None
+    text = html.escape(" ".join(_MARKDOWN.sub(" ", snippet).split()))
+    return text.replace(_START, "<mark>").replace(_STOP, "</mark>")
+
+
+# ============================================================
+# INDEX REPAIR (the index itself is created by migration 0013)
+# ============================================================
+
+# Same triggers as 0013, idempotent; recreated after a table remake
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS api_article_fts_insert AFTER INSERT ON api_knowledgearticle BEGIN
+        INSERT INTO api_article_fts(rowid, title, summary, content)
+        VALUES (new.id, new.title, new.summary, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS api_article_fts_delete AFTER DELETE ON api_knowledgearticle BEGIN
+        INSERT INTO api_article_fts(api_article_fts, rowid, title, summary, content)
+        VALUES ('delete', old.id, old.title, old.summary, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS api_article_fts_update AFTER UPDATE OF title, summary, content
+    ON api_knowledgearticle BEGIN
+        INSERT INTO api_article_fts(api_article_fts, rowid, title, summary, content)
+        VALUES ('delete', old.id, old.title, old.summary, old.content);
+        INSERT INTO api_article_fts(rowid, title, summary, content)
+        VALUES (new.id, new.title, new.summary, new.content);
+    END
+    """,
+]
+SQLITE_REBUILD = "INSERT INTO api_article_fts(api_article_fts) VALUES ('rebuild')"
+
+
+def repair_sqlite_index(connection):
+    """
+    SQLite drops triggers when a migration remakes api_knowledgearticle
+    (most AlterField / AddField operations do). Recreate them and
+    rebuild the FTS table if that happened. Returns True if repaired.
+    """
+    if connection.vendor != "sqlite":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT type, COUNT(*) FROM sqlite_master "
+            "WHERE name LIKE %s AND type IN ('table', 'trigger') GROUP BY type",
+            ["api_article_fts%"],
+        )
+        found = dict(cursor.fetchall())
+        if not found.get("table") or found.get("trigger") == len(SQLITE_TRIGGERS):
+            return False
+        for sql in SQLITE_TRIGGERS:
+            cursor.execute(sql)
+        cursor.execute(SQLITE_REBUILD)
+    return True
+
+
+# ============================================================
+# BACKENDS
+# ============================================================
+
+def _sqlite(words, category, limit, offset):
+    match = " ".join(f'"{w}"*' for w in words)
+    where = "api_article_fts MATCH %s AND a.published"
+    params = [match]
+    if category:
+        where += " AND a.category = %s"
+        params.append(category)
+
+    joined = "FROM api_article_fts JOIN api_knowledgearticle a ON a.id = api_article_fts.rowid"
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) {joined} WHERE {where}", params)
+        total = cursor.fetchone()[0]
+        if not total:
+            return 0, []
+        cursor.execute(
+            f"""
+            SELECT a.id, bm25(api_article_fts, %s, %s, %s) AS score,
+                   snippet(api_article_fts, 2, %s, %s, '…', %s)
+            {joined} WHERE {where}
+            ORDER BY score LIMIT %s OFFSET %s
+            """,
+            [*FTS_WEIGHTS, _START, _STOP, SNIPPET_WORDS, *params, limit, offset],
+        )
+        # bm25 is lower-is-better; flip it so rank reads naturally
+        return total, [(pk, -score, snippet) for pk, score, snippet in cursor.fetchall()]
+
+
+def _postgres(words, category, limit, offset):
+    tsquery = " & ".join(f"{w}:*" for w in words)
+    where = "search_vector @@ to_tsquery('english', %s) AND published"
+    params = [tsquery]
+    if category:
+        where += " AND category = %s"
+        params.append(category)
+
+    options = (
+        f"StartSel={_START}, StopSel={_STOP}, MaxWords={SNIPPET_WORDS * 2}, "
+        f"MinWords={SNIPPET_WORDS // 2}, MaxFragments=2, FragmentDelimiter=\" … \""
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) FROM api_knowledgearticle WHERE {where}", params)
+        total = cursor.fetchone()[0]
+        if not total:
+            return 0, []
+        # Headlines are expensive, so only the page's rows get one
+        cursor.execute(
+            f"""
+            SELECT page.id, page.score,
+                   ts_headline('english', a.content, to_tsquery('english', %s), %s)
+            FROM (
+                SELECT id, ts_rank_cd(search_vector, to_tsquery('english', %s)) AS score
+                FROM api_knowledgearticle WHERE {where}
+                ORDER BY score DESC, id LIMIT %s OFFSET %s
+            ) page JOIN api_knowledgearticle a ON a.id = page.id
+            ORDER BY page.score DESC, page.id
+            """,
+            [tsquery, options, tsquery, *params, limit, offset],
+        )
+        return total, cursor.fetchall()
+
+
+def _fallback(words, category, limit, offset):
+    qs = KnowledgeArticle.objects.filter(published=True)
+    if category:
+        qs = qs.filter(category=category)
+    for w in words:
+        qs = qs.filter(Q(title__icontains=w) | Q(summary__icontains=w) | Q(content__icontains=w))
+    ids = list(qs.values_list("id", flat=True))
+    return len(ids), [(pk, None, None) for pk in ids[offset:offset + limit]]
+
+
+BACKENDS = {"sqlite": _sqlite, "postgresql": _postgres}
+
+
+# ============================================================
+# ENTRY POINT
+# ============================================================
+
+def search(query, category=None, page=1, page_size=PAGE_SIZE):
+    """
+    One page of ranked results:
+    {"count", "page", "page_size", "results": [(article, rank, snippet)]}.
+    """
+    page = max(int(page), 1)
+    page_size = min(max(int(page_size), 1), MAX_PAGE_SIZE)
+    words = terms(query)
+    if not words:
+        return {"count": 0, "page": page, "page_size": page_size, "results": []}
+
+    run = BACKENDS.get(connection.vendor, _fallback)
+    total, hits = run(words, category, page_size, (page - 1) * page_size)
+
+    articles = KnowledgeArticle.objects.in_bulk([pk for pk, _, _ in hits])
+    return {
+        "count": total,
+        "page": page,
+        "page_size": page_size,
+        "results": [
+            (articles[pk], float(f"{rank:.4g}") if rank is not None else None, _highlight(snippet))
+            for pk, rank, snippet in hits if pk in articles
+        ],
+    }
@@ -0,0 +1,285 @@
+"""
+Background Task Queue
+---------------------
+Durable job queue on the BackgroundTask table — no broker needed.
+
+• enqueue()  → insert a pending row (priority, delay, dedupe key)
+• claim()    → atomically move ready rows to "running"
+      Postgres / MySQL : SELECT ... FOR UPDATE SKIP LOCKED
+      SQLite           : conditional UPDATE per row (first writer wins)
+• run_task() → call the handler; failures retry with exponential
+               backoff until max_attempts, then stay "failed"
+• Worker     → poll loop used by `manage.py run_worker`
+
+Handlers are registered with @task("name") in api/jobs.py and get the
+task payload dict as their only argument. Their return value (if JSON
+serialisable) is stored in BackgroundTask.result.
+"""
+
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import cycle_history
+from .models import BackgroundTask
+
+
+_handlers = {}
+
+
+def task(name, max_attempts=None):
+    """Register a handler under `name`."""
+    def decorator(func):
+        _handlers[name] = {
+            "func": func,
+            "max_attempts": max_attempts or settings.TASK_MAX_ATTEMPTS,
+        }
+        return func
+    return decorator
+
+
+def registered():
+    return sorted(_handlers)
+
+
+# ============================================================
+# ENQUEUE
+# ============================================================
+
+def enqueue(name, payload=None, priority=0, dedupe_key=None, delay=0):
+    """
+    Queue a task and return its row.
+
+    With a dedupe_key, a still-pending task holding the same key is
+    returned instead of inserting a duplicate. A task that is already
+    running does not absorb new requests (it may be working on old data).
+    """
+    if name not in _handlers:
+        raise KeyError(f"Unknown task: {name}")
+
+    if dedupe_key:
+        existing = BackgroundTask.objects.filter(
+            dedupe_key=dedupe_key, status="pending"
+        ).first()
+        if existing:
+            return existing
+
+    try:
+        with transaction.atomic():
+            return BackgroundTask.objects.create(
+                name=name,
+                payload=payload or {},
+                priority=priority,
+                dedupe_key=dedupe_key or None,
+                max_attempts=_handlers[name]["max_attempts"],
+                run_at=timezone.now() + timedelta(seconds=delay),
+            )
+    except IntegrityError:
+        # Lost a race with another enqueue of the same key
+        return BackgroundTask.objects.filter(
+            dedupe_key=dedupe_key, status="pending"
+        ).first()
+
+
+def is_pending(dedupe_key):
+    """True while a task with this key is queued or running."""
+    return BackgroundTask.objects.filter(
+        dedupe_key=dedupe_key,
+        status__in=BackgroundTask.ACTIVE_STATUSES
+    ).exists()
+
+
+# ============================================================
+# CLAIM
+# ============================================================
+
+def _ready(names=None):
+    qs = BackgroundTask.objects.filter(status="pending", run_at__lte=timezone.now())
+    if names:
+        qs = qs.filter(name__in=names)
+    return qs.order_by("-priority", "run_at", "id")
+
+
+def claim(worker_id, limit=1, names=None):
+    """Mark up to `limit` ready tasks as running for this worker."""
+    now = timezone.now()
+    claimed_fields = dict(
+        status="running",
+        locked_by=worker_id,
+        locked_at=now,
+        attempts=F("attempts") + 1,
+    )
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(
+                _ready(names)
+                .select_for_update(skip_locked=True)
+                .values_list("id", flat=True)[:limit]
+            )
+            if ids:
+                BackgroundTask.objects.filter(id__in=ids).update(**claimed_fields)
+    else:
+        # SQLite has no row locks: the UPDATE only matches while the row is
+        # still pending, so exactly one worker wins each candidate.
+        ids = []
+        for task_id in _ready(names).values_list("id", flat=True)[:limit * 4]:
+            won = BackgroundTask.objects.filter(
+                id=task_id, status="pending"
+            ).update(**claimed_fields)
+            if won:
+                ids.append(task_id)
+                if len(ids) >= limit:
+                    break
+
+    return list(BackgroundTask.objects.filter(id__in=ids).order_by("-priority", "run_at", "id"))
+
+
+def _requeue(task_id, run_at, **fields):
+    """
+    Put a running task back to pending. If a newer task with the same
+    dedupe key is already queued, that one supersedes this retry.
+    """
+    try:
+        with transaction.atomic():
+            BackgroundTask.objects.filter(id=task_id).update(
+                status="pending", locked_by="", locked_at=None,
+                run_at=run_at, updated_at=timezone.now(), **fields
+            )
+    except IntegrityError:
+        BackgroundTask.objects.filter(id=task_id).update(
+            status="failed", locked_at=None, updated_at=timezone.now(),
+            last_error=(fields.get("last_error") or "") + "\nSuperseded by a queued duplicate.",
+        )
+
+
+def requeue_stale():
+    """Hand tasks back to the queue when their worker died mid-run."""
+    cutoff = timezone.now() - timedelta(seconds=settings.TASK_LOCK_TIMEOUT)
+    stale = list(
+        BackgroundTask.objects.filter(status="running", locked_at__lt=cutoff)
+        .values_list("id", flat=True)
+    )
+    for task_id in stale:
+        _requeue(task_id, timezone.now(), last_error="Worker lock expired.")
+    return len(stale)
+
+
+# ============================================================
+# RUN
+# ============================================================
+
+def backoff_seconds(attempts):
+    """Exponential backoff with jitter: base * 2^(n-1), capped."""
+    delay = min(settings.TASK_BACKOFF_MAX, settings.TASK_BACKOFF_BASE * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def run_task(bg_task):
+    """Execute one claimed task and record the outcome."""
+    handler = _handlers.get(bg_task.name)
+
+    try:
+        if handler is None:
+            raise KeyError(f"No handler registered for {bg_task.name}")
+        with cycle_history.scope():
+            result = handler["func"](bg_task.payload or {})
+    except Exception as e:
+        print(f"❌ Task {bg_task} failed: {e}")
+        error = traceback.format_exc()[-4000:]
+
+        if bg_task.attempts < bg_task.max_attempts and handler is not None:
+            _requeue(
+                bg_task.id,
+                timezone.now() + timedelta(seconds=backoff_seconds(bg_task.attempts)),
+                last_error=error,
+            )
+        else:
+            BackgroundTask.objects.filter(id=bg_task.id).update(
+                status="failed",
+                locked_at=None,
+                last_error=error,
+                updated_at=timezone.now(),
+            )
+        return False
+
+    if not isinstance(result, (dict, list, str, int, float, bool, type(None))):
+        result = None
+
+    BackgroundTask.objects.filter(id=bg_task.id).update(
+        status="done",
+        locked_at=None,
+        result=result,
+        updated_at=timezone.now(),
+    )
+    return True
+
+
+def run_pending(worker_id="inline", limit=100, names=None):
+    """Drain ready tasks in this thread. Returns the number processed."""
+    processed = 0
+    while processed < limit:
+        batch = claim(worker_id, limit=1, names=names)
+        if not batch:
+            break
+        run_task(batch[0])
+        processed += 1
+    return processed
+
+
+# ============================================================
+# WORKER
+# ============================================================
+
+class Worker:
+    """
+    Poll loop: requeue stale tasks, claim, run, sleep when idle.
+    One Worker per thread; threads share nothing but the database.
+    """
+
+    def __init__(self, worker_id=None, poll_interval=1.0, names=None, max_tasks=None):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+        self.poll_interval = poll_interval
+        self.names = names
+        self.max_tasks = max_tasks
+        self.processed = 0
+        self.stop_event = threading.Event()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self, once=False):
+        last_stale_check = 0.0
+
+        try:
+            while not self.stop_event.is_set():
+                close_old_connections()
+
+                if time.monotonic() - last_stale_check > settings.TASK_LOCK_TIMEOUT / 2:
+                    requeue_stale()
+                    last_stale_check = time.monotonic()
+
+                batch = claim(self.worker_id, limit=1, names=self.names)
+                if batch:
+                    run_task(batch[0])
+                    self.processed += 1
+                    if self.max_tasks and self.processed >= self.max_tasks:
+                        break
+                    continue
+
+                if once:
+                    break
+                self.stop_event.wait(self.poll_interval)
+        finally:
+            connection.close()
+
+        return self.processed
@@ -0,0 +1,169 @@
+"""
+Health Trend Downsampling
+-------------------------
+Turns a metric series into a chart-sized, columnar payload:
+
+    resolution = "daily"    one point per logged day
+                 "weekly"   mean per ISO week (dated by its Monday)
+                 "monthly"  mean per calendar month (dated by the 1st)
+                 "auto"     daily, or LTTB down to `points` when longer
+
+LTTB (Largest-Triangle-Three-Buckets) keeps the points that preserve the
+visual shape of the line (peaks, dips) instead of averaging them away.
+
+series() / weekly_series() build the per-metric payload used by
+/api/health/trends/ (one metric or several).
+"""
+
+from itertools import groupby
+
+import numpy as np
+
+from .metric_analytics import rolling_mean
+
+
+RESOLUTIONS = ("daily", "weekly", "monthly", "auto")
+DEFAULT_POINTS = 200
+MIN_POINTS, MAX_POINTS = 10, 1000
+MIN_DAYS, MAX_DAYS = 1, 3650        # requested history is clamped to this
+
+
+# ============================================================
+# BUCKETING
+# ============================================================
+
+def _bucket_means(days, values, keys):
+    """Mean of `values` per distinct key; keys are datetime64[D] bucket starts."""
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    sums = np.bincount(inverse, weights=values)
+    counts = np.bincount(inverse)
+    return uniq, sums / counts
+
+
+def _week_start(days):
+    # 1970-01-01 was a Thursday (weekday 3, Monday = 0)
+    offset = (days.astype(np.int64) + 3) % 7
+    return days - offset.astype("timedelta64[D]")
+
+
+def _month_start(days):
+    return days.astype("datetime64[M]").astype("datetime64[D]")
+
+
+# ============================================================
+# LTTB
+# ============================================================
+
+def lttb(x, y, threshold):
+    """Indices of the `threshold` points of (x, y) picked by LTTB."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = x.astype(float)
+    y = y.astype(float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+
+    picked = np.empty(threshold, dtype=int)
+    picked[0], picked[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point) is the third vertex
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+
+        area = np.abs(
+            (x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        picked[i + 1] = a
+    return picked
+
+
+# ============================================================
+# ENTRY POINT
+# ============================================================
+
+def downsample(rows, resolution="auto", points=DEFAULT_POINTS):
+    """
+    rows: (date, value) pairs, ascending by date.
+    Returns (dates, values, resolution_used) as plain lists.
+    """
+    if not rows:
+        return [], [], resolution
+
+    dates, values = zip(*rows)
+    days = np.array(dates, dtype="datetime64[D]")
+    vals = np.array(values, dtype=float)
+
+    if resolution == "weekly":
+        days, vals = _bucket_means(days, vals, _week_start(days))
+    elif resolution == "monthly":
+        days, vals = _bucket_means(days, vals, _month_start(days))
+    elif resolution == "auto":
+        if len(days) > points:
+            keep = lttb(days.astype(np.int64), vals, points)
+            days, vals = days[keep], vals[keep]
+            resolution = "lttb"
+        else:
+            resolution = "daily"
+
+    return days.tolist(), np.round(vals, 2).tolist(), resolution
+
+
+# ============================================================
+# PAYLOADS
+# ============================================================
+
+def _stats(count, total, low, high, latest):
+    return {
+        "count": count,
+        "average": round(total / count, 2) if count else 0,
+        "min": low if count else 0,
+        "max": high if count else 0,
+        "latest": latest if count else None,
+    }
+
+
+def series(metric, rows, resolution="auto", points=DEFAULT_POINTS):
+    """rows: (date, value) ascending → columnar series + window stats."""
+    values = [v for _, v in rows]
+    dates, out, used = downsample(rows, resolution, points)
+
+    payload = {"metric_type": metric, "resolution": used, "dates": dates, "values": out}
+    if used == "daily" and rows:
+        ordinals = [d.toordinal() for d, _ in rows]
+        payload["rolling_mean"] = np.round(rolling_mean(ordinals, values), 2).tolist()
+
+    payload.update(_stats(
+        len(values), sum(values),
+        min(values, default=0), max(values, default=0), values[-1] if values else None
+    ))
+    return payload
+
+
+def weekly_series(metric, weeks):
+    """weeks: [(week_start, rollup aggregate)] ascending → weekly series + stats."""
+    payload = {
+        "metric_type": metric,
+        "resolution": "weekly",
+        "dates": [week for week, _ in weeks],
+        "values": [round(agg["total"] / agg["count"], 2) for _, agg in weeks],
+    }
+    aggs = [agg for _, agg in weeks]
+    payload.update(_stats(
+        sum(a["count"] for a in aggs), sum(a["total"] for a in aggs),
+        min((a["min_value"] for a in aggs), default=0),
+        max((a["max_value"] for a in aggs), default=0),
+        aggs[-1]["last_value"] if aggs else None
+    ))
+    return payload
+
+
+def group_rows(rows):
+    """(metric_type, date, value) sorted by type → {metric_type: [(date, value)]}."""
+    return {
+        metric: [(day, value) for _, day, value in items]
+        for metric, items in groupby(rows, key=lambda r: r[0])
+    }
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views, health_views,auth_views
+from . import views, health_views,auth_views, metrics_views
 
 urlpatterns = [
     # Original PCOS Assessment APIs
@@ -15,13 +15,20 @@ urlpatterns = [
     path('cycle/log/', health_views.log_cycle, name='log_cycle'),
     path('cycle/list/', health_views.list_cycles, name='list_cycles'),
     path('cycle/predict/', health_views.predict_cycle, name='predict_cycle'),
+    path('cycle/calendar/', health_views.cycle_calendar, name='cycle_calendar'),
+    path('cycle/import/', health_views.import_cycles, name='import_cycles'),
     path('cycle/delete/<int:cycle_id>/', health_views.delete_cycle, name='delete_cycle'),
     
     # Health Metrics & Trends
     path('health/metric/', health_views.log_health_metric, name='log_health_metric'),
+    path('health/metrics/bulk/', health_views.bulk_health_metrics, name='bulk_health_metrics'),
+    path('health/import/', health_views.import_health_export, name='import_health_export'),
     path('health/trends/', health_views.health_trends, name='health_trends'),
     path('health/summary/', health_views.health_summary, name='health_summary'),
     path('insights/cycle-aware/', health_views.cycle_ai_insight),
+
+    # Data Export
+    path('export/', health_views.export_data, name='export_data'),
     
     # Knowledge Base
     path('articles/', health_views.list_articles, name='list_articles'),
@@ -36,6 +43,9 @@ urlpatterns = [
     path("auth/csrf/", auth_views.csrf),
     path("seed/", auth_views.seed_knowledge),
 
+    # Observability
+    path("metrics/", metrics_views.metrics_view, name="metrics"),
+
 
 ]
 
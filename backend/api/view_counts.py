@@ -0,0 +1,89 @@
+"""
+Article View Counters (write-behind)
+------------------------------------
+get_article() only records a view in this worker's memory; the counts
+are written back in bulk, at most every ARTICLE_VIEWS_FLUSH_INTERVAL
+seconds, once a response has been sent (request_finished, connected in
+apps.py) and at exit, as
+
+    UPDATE api_knowledgearticle SET views = views + n WHERE id IN (...)
+
+one statement per distinct n. The increment happens inside the database,
+so concurrent workers never overwrite each other's counts, and article
+reads stay read-only in between flushes.
+"""
+
+import atexit
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import F
+
+
+_lock = threading.Lock()
+_pending = Counter()
+_last_flush = time.monotonic()
+
+
+def record(article_id, count=1):
+    """Count a view; returns this worker's unwritten views of the article."""
+    with _lock:
+        _pending[article_id] += count
+        return _pending[article_id]
+
+
+def pending(article_id):
+    """Views of `article_id` recorded here but not yet written."""
+    with _lock:
+        return _pending.get(article_id, 0)
+
+
+def flush():
+    """Write buffered counts. Returns the number of articles updated."""
+    global _last_flush
+
+    from .models import KnowledgeArticle
+
+    with _lock:
+        counts = dict(_pending)
+        _pending.clear()
+        _last_flush = time.monotonic()
+    if not counts:
+        return 0
+
+    by_count = defaultdict(list)
+    for article_id, n in counts.items():
+        by_count[n].append(article_id)
+
+    try:
+        with transaction.atomic():
+            for n, ids in by_count.items():
+                KnowledgeArticle.objects.filter(id__in=ids).update(views=F("views") + n)
+    except DatabaseError as e:
+        # Keep the counts for the next flush rather than dropping them
+        with _lock:
+            _pending.update(counts)
+        print(f"⚠️ Article view flush failed: {e}")
+        return 0
+
+    return len(counts)
+
+
+def flush_if_due(sender=None, **kwargs):
+    """request_finished receiver: flush once the interval has elapsed."""
+    interval = getattr(settings, "ARTICLE_VIEWS_FLUSH_INTERVAL", 10.0)
+    if _pending and time.monotonic() - _last_flush >= interval:
+        flush()
+
+
+def _flush_at_exit():
+    try:
+        flush()
+    except Exception as e:
+        print(f"⚠️ Article view flush at exit failed: {e}")
+
+
+atexit.register(_flush_at_exit)
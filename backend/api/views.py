@@ -1,24 +1,25 @@
+import json
+from datetime import date
+
 from rest_framework import status
 from rest_framework.decorators import api_view, parser_classes
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
+from django.conf import settings
 from django.http import HttpResponse
-from .models import SymptomLog, PhenotypeResult
+from django.views.decorators.csrf import csrf_exempt
+
+from . import cycle_history, jobs, llm
+from .models import SymptomLog, PhenotypeResult, RenderedReport
 from .serializers import (
     SymptomLogSerializer,
     PhenotypeResultSerializer,
     HistorySerializer
 )
-from .ml_engine import classify_phenotype
+from .auto_logging import apply_extracted_data
+from .ml_engine import classify_phenotype, generate_ai_sections
+# PDF rendering imports reportlab lazily, so this stays cheap at boot
 from .report import generate_pdf_report
-from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.csrf import csrf_exempt
-from rest_framework.decorators import api_view
-from datetime import date
-
-# Load environment variables
-from dotenv import load_dotenv
-load_dotenv()
 
 
 @api_view(['POST'])
@@ -59,54 +60,6 @@ def log_symptoms(request):
         status=status.HTTP_400_BAD_REQUEST
     )
 
-from rest_framework.decorators import api_view
-from rest_framework.response import Response
-from rest_framework import status
-import os, json
-from groq import Groq
-
-from .serializers import SymptomLogSerializer, PhenotypeResultSerializer
-from .ml_engine import classify_phenotype
-# ================================================================
-# CLASSIFY PCOS SYMPTOMS VIEW
-# ================================================================
-
-import os
-import json
-
-from rest_framework.decorators import api_view
-from rest_framework.response import Response
-from rest_framework import status
-from django.views.decorators.csrf import csrf_exempt
-
-from groq import Groq
-
-from .serializers import SymptomLogSerializer, PhenotypeResultSerializer
-from .ml_engine import classify_phenotype
-
-
-# ================================================================
-# API ENDPOINT
-# ================================================================
-from rest_framework import status
-from rest_framework.decorators import api_view, parser_classes
-from rest_framework.parsers import MultiPartParser, FormParser
-from rest_framework.response import Response
-from django.http import HttpResponse
-from .models import SymptomLog, PhenotypeResult
-from .serializers import (
-    SymptomLogSerializer,
-    PhenotypeResultSerializer,
-    HistorySerializer
-)
-from .ml_engine import classify_phenotype
-from .report import generate_pdf_report
-from django.views.decorators.csrf import csrf_exempt
-from rest_framework.decorators import api_view
-
-from dotenv import load_dotenv
-load_dotenv()
-
 
 # ================================================================
 # LOG SYMPTOMS
@@ -125,11 +78,6 @@ def log_symptoms(request):
 # CLASSIFY PCOS SYMPTOMS
 # ================================================================
 
-import os
-import json
-from groq import Groq
-
-
 @csrf_exempt
 @api_view(['POST'])
 def classify_symptoms(request):
@@ -169,64 +117,13 @@ def classify_symptoms(request):
     classification.setdefault("priority_lifestyle_changes", [])
 
     # ── 3. GROQ AI ANALYSIS ──────────────────────────────────────
-    ai_explanation = ""
-    diet_plan = ""
-
-    try:
-        api_key = os.environ.get("GROQ_API_KEY")
-
-        if api_key:
-            client = Groq(api_key=api_key)
-
-            symptom_summary = json.dumps(
-                {k: v for k, v in request.data.items() if v is not None},
-                indent=2
-            )
-
-            ai_prompt = f"""You are an expert PCOS endocrinologist.
-
-Patient phenotype: {classification['phenotype']}
-Confidence: {classification['confidence']}%
-
-Symptoms:
-{symptom_summary}
-
-Reasons: {'; '.join(classification['reasons'])}
-
-Return TWO SECTIONS:
-
-SECTION 1 - ANALYSIS
-Explain why this phenotype.
-
-SECTION 2 - DIET PLAN
-Give personalized diet advice.
-"""
-
-            chat = client.chat.completions.create(
-                model=os.environ.get("GROQ_MODEL", "llama-3.3-70b-versatile"),
-                messages=[{"role": "user", "content": ai_prompt}],
-                temperature=0.4,
-                max_tokens=1200,
-            )
-
-            full_response = chat.choices[0].message.content or ""
-
-            if "SECTION 2" in full_response:
-                parts = full_response.split("SECTION 2")
-                ai_explanation = parts[0].replace("SECTION 1", "").strip()
-                diet_plan = parts[1].strip()
-            else:
-                ai_explanation = full_response
-                diet_plan = "Diet plan unavailable."
-
-        else:
-            ai_explanation = "GROQ_API_KEY missing. AI analysis skipped."
-            diet_plan = "Diet plan unavailable."
-
-    except Exception as e:
-        print("Groq AI error:", e)
-        ai_explanation = "AI analysis unavailable."
-        diet_plan = "Diet plan generation failed."
+    # With CLASSIFY_AI_ASYNC the sections are filled in by the worker
+    # (classify.ai_sections task) and the response returns immediately.
+    ai_pending = settings.CLASSIFY_AI_ASYNC
+    if ai_pending:
+        ai_explanation, diet_plan = "", ""
+    else:
+        ai_explanation, diet_plan = generate_ai_sections(request.data, classification)
 
     # ── 4. SAVE RESULT  ──────────────────────────────────────────
     # ✅ FIXED: ai_explanation and diet_plan are now included in
@@ -255,6 +152,11 @@ Give personalized diet advice.
 
     phenotype_result = result_serializer.save()
 
+    if ai_pending:
+        jobs.fill_ai_sections(phenotype_result.id, dict(request.data.items()), classification)
+    else:
+        jobs.render_report(phenotype_result.id)
+
     # ── 5. FINAL RESPONSE ────────────────────────────────────────
     return Response({
         "symptom_log_id":           symptom_log.id,
@@ -266,6 +168,7 @@ Give personalized diet advice.
 
         "ai_explanation":           phenotype_result.ai_explanation,
         "diet_plan":                phenotype_result.diet_plan,
+        "ai_pending":               ai_pending,
 
         "future_risk_score":        classification["future_risk_score"],
         "mixed_pcos_types":         classification["mixed_pcos_types"],
@@ -308,6 +211,7 @@ def download_report(request, result_id):
 
     Download PDF report. Reuses ai_explanation + diet_plan already
     saved in the DB — no need to regenerate via Groq.
+    Serves the PDF pre-rendered by the report.render task when present.
     """
     try:
         phenotype_result = PhenotypeResult.objects.get(id=result_id)
@@ -317,10 +221,15 @@ def download_report(request, result_id):
         ai_explanation = phenotype_result.ai_explanation or ""
         diet_plan      = phenotype_result.diet_plan or ""
 
+        pdf_bytes = None
+        if ai_explanation:
+            rendered = RenderedReport.objects.filter(result_id=result_id).only("pdf").first()
+            if rendered is not None:
+                pdf_bytes = bytes(rendered.pdf)
+
         # If for some reason they're empty (old records), regenerate
         if not ai_explanation:
             try:
-                client = Groq(api_key=os.environ.get('GROQ_API_KEY'))
                 symptom_fields = {}
                 for f in [
                     'cycle_gap_days', 'bmi', 'stress_level', 'sleep_hours',
@@ -345,13 +254,12 @@ Why this PCOS type, root cause mechanism, hormonal explanation.
 SECTION 2 - PERSONALIZED DIET PLAN:
 Foods to eat and avoid, meal timing, supplements.
 """
-                chat = client.chat.completions.create(
-                    model=os.environ.get('GROQ_MODEL', 'llama-3.3-70b-versatile'),
+                full = llm.chat_completion(
+                    "classify",
                     messages=[{"role": "user", "content": prompt}],
                     max_tokens=2000,
                     temperature=0.4,
                 )
-                full = chat.choices[0].message.content or ""
                 if "SECTION 2" in full:
                     parts = full.split("SECTION 2")
                     ai_explanation = parts[0].replace("SECTION 1", "").strip()
@@ -368,11 +276,12 @@ Foods to eat and avoid, meal timing, supplements.
             except Exception as e:
                 print(f"Report AI regeneration error: {e}")
 
-        pdf_buffer = generate_pdf_report(
-            symptom_log, phenotype_result, ai_explanation, diet_plan
-        )
+        if pdf_bytes is None:
+            pdf_bytes = generate_pdf_report(
+                symptom_log, phenotype_result, ai_explanation, diet_plan
+            ).getvalue()
 
-        response = HttpResponse(pdf_buffer.getvalue(), content_type='application/pdf')
+        response = HttpResponse(pdf_bytes, content_type='application/pdf')
         filename = f"OvaSense_Report_{result_id}_{symptom_log.created_at.strftime('%Y%m%d')}.pdf"
         response['Content-Disposition'] = f'attachment; filename="{filename}"'
         return response
@@ -413,8 +322,7 @@ def process_text(request):
                 print(f"✅ [DEBUG] Found Profile: {profile.name}")
                 
                 # Get latest cycle info
-                from .models import CycleRecord
-                latest_cycle = CycleRecord.objects.filter(user=profile).order_by('-start_date').first()
+                latest_cycle = cycle_history.for_profile(profile.id).latest
                 if latest_cycle:
                     days_since = (date.today() - latest_cycle.start_date).days
                     user_context_str += f"Last Period: {latest_cycle.start_date} ({days_since} days ago). "
@@ -465,12 +373,21 @@ def process_text(request):
         # Combine with client-sent history (if any, though usually client sends empty for new session)
         full_history = db_history + conversation_history
 
-        result = get_baymax_response(user_text, full_history, current_data, user_context=user_context_str)
+        # With CHAT_EXTRACTION_ASYNC the extraction call runs in the
+        # chat.extract task instead of doubling this request's latency.
+        has_profile = request.user.is_authenticated and hasattr(request.user, 'profile')
+        extract_later = settings.CHAT_EXTRACTION_ASYNC and has_profile
+
+        result = get_baymax_response(
+            user_text, full_history, current_data,
+            user_context=user_context_str,
+            extract=not extract_later,
+        )
         
         extracted_data = result.get('extracted_data', {})
         
         # Save new interaction to DB
-        if request.user.is_authenticated and hasattr(request.user, 'profile'):
+        if has_profile:
             try:
                 ChatSession.objects.create(user=request.user.profile, sender='user', message=user_text)
                 ChatSession.objects.create(user=request.user.profile, sender='assistant', message=result['response_text'])
@@ -478,96 +395,14 @@ def process_text(request):
                 print(f"Failed to save chat history: {e}")
         
         # ── AUTO-LOGGING LOGIC ──────────────────────────────────────
-        # 1. Start Date
-        start_date_str = extracted_data.get('period_start_date')
-        if start_date_str:
-            from .models import CycleRecord
-            from datetime import datetime, timedelta
-            
-            try:
-                s_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
-                
-                # Check for existing record near this date (within 5 days) to avoid duplicates
-                existing = CycleRecord.objects.filter(
-                    user=request.user.profile,
-                    start_date__gte=s_date - timedelta(days=5),
-                    start_date__lte=s_date + timedelta(days=5)
-                ).first()
-                
-                if existing:
-                    # Update start date if needed, or just append symptoms
-                    existing.start_date = s_date # Update to precise date if user corrected it
-                    existing.save()
-                    print(f"✅ Updated existing cycle record for {s_date}")
-                else:
-                    CycleRecord.objects.create(user=request.user.profile, start_date=s_date)
-                    print(f"✅ Created new cycle record for {s_date}")
-                    
-            except ValueError:
-                print(f"⚠️ Invalid start date format: {start_date_str}")
-
-        # 2. End Date
-        end_date_str = extracted_data.get('period_end_date')
-        if end_date_str:
-            from .models import CycleRecord
-            from datetime import datetime
-            
-            try:
-                e_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
-                
-                # Find the most recent open cycle (no end date) or recent cycle
-                latest_cycle = CycleRecord.objects.filter(
-                    user=request.user.profile,
-                    start_date__lte=e_date
-                ).order_by('-start_date').first()
-                
-                if latest_cycle:
-                    latest_cycle.end_date = e_date
-                    latest_cycle.save()
-                    print(f"✅ Logged end date {e_date} for cycle starting {latest_cycle.start_date}")
-                else:
-                    # If no start date found, create one assuming standard length? 
-                    # For now just log end date if we can't find start? 
-                    # Or maybe create a record with start_date = end_date - 5 days?
-                    # Let's just log it if we can find a record.
-                    print(f"⚠️ Could not find start date for end date {e_date}")
-                    
-            except ValueError:
-                print(f"⚠️ Invalid end date format: {end_date_str}")
-
-        # 3. Log Symptoms to latest active cycle
-        new_symptoms = extracted_data.get('symptoms', {})
-        if new_symptoms:
-            from .models import CycleRecord
-            from datetime import date
-            
-            # Find cycle active today or most recent
-            today = date.today()
-            active_cycle = CycleRecord.objects.filter(
-                user=request.user.profile,
-                start_date__lte=today
-            ).order_by('-start_date').first()
-            
-            if active_cycle:
-                # Merge symptoms
-                current_symptoms = active_cycle.symptoms or []
-                # If new_symptoms is dict, convert to list of strings "key: value" or just keys
-                # The pipeline returns dict {acne: true, pain: "high"}
-                # Let's convert to list of strings
-                
-                formatted_new = []
-                if isinstance(new_symptoms, dict):
-                    for k, v in new_symptoms.items():
-                        if v is True: formatted_new.append(k)
-                        elif v: formatted_new.append(f"{k}: {v}")
-                elif isinstance(new_symptoms, list):
-                    formatted_new = new_symptoms
-                    
-                # Add unique
-                updated_list = list(set(current_symptoms + formatted_new))
-                active_cycle.symptoms = updated_list
-                active_cycle.save()
-                print(f"✅ Added symptoms to cycle {active_cycle.id}: {formatted_new}")
+        if extract_later:
+            jobs.extract_chat(request.user.profile.id, full_history + [
+                {'sender': 'user', 'text': user_text},
+                {'sender': 'assistant', 'text': result['response_text']},
+            ])
+        elif extracted_data and has_profile:
+            if apply_extracted_data(request.user.profile, extracted_data):
+                jobs.refresh_insight(request.user.profile.id)
 
         return Response({
             'response_text':          result['response_text'],
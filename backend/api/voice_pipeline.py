@@ -3,20 +3,18 @@ Voice processing module for Baymax AI assistant.
 Uses Groq API for text processing. Audio handling is offloaded to the frontend.
 """
 
-import os
 import json
 import re
 from datetime import datetime
 
-# Load settings from environment
-from dotenv import load_dotenv
-load_dotenv()
+from django.conf import settings
 
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+from . import llm
+
+# Chat uses the faster model unless GROQ_MODEL overrides it
+DEFAULT_CHAT_MODEL = "llama-3.1-8b-instant"
 
 # Lazy-loaded globals
-_groq_client = None
 _baymax_prompt = None
 
 
@@ -54,24 +52,18 @@ STRICTLY FORBIDDEN:
 
 
 def load_groq():
-    """Lazy-load Groq client"""
-    global _groq_client
-    if _groq_client:
-        return _groq_client
-    
-    if not GROQ_API_KEY:
+    """Check the Groq key and return the shared gateway client"""
+    if not llm.is_configured():
         raise ValueError("GROQ_API_KEY not set in .env file")
-    
-    from groq import Groq
-    _groq_client = Groq(api_key=GROQ_API_KEY)
-    return _groq_client
+
+    return llm.get_client()
 
 
 def extract_symptom_data(conversation_history):
     """
     Extract structured data (symptoms, period logs, diet requests) from conversation.
     """
-    groq_client = load_groq()
+    load_groq()
     
     conv_text = "\n".join([
         f"{'User' if msg.get('sender') == 'user' else 'Baymax'}: {msg.get('text', '')}"
@@ -97,14 +89,13 @@ Format: {{"period_start_date": "2023-10-27", "period_end_date": null, "diet_requ
 """
 
     try:
-        completion = groq_client.chat.completions.create(
-            model=GROQ_MODEL,
+        response_text = llm.chat_completion(
+            "extraction",
             messages=[{"role": "user", "content": extraction_prompt}],
+            model=settings.GROQ_MODEL or DEFAULT_CHAT_MODEL,
             temperature=0.1,
             max_tokens=256
-        )
-        
-        response_text = completion.choices[0].message.content.strip()
+        ).strip()
         print(f"🔍 Extraction response: {response_text}")
         
         # Clean and parse JSON
@@ -117,17 +108,37 @@ Format: {{"period_start_date": "2023-10-27", "period_end_date": null, "diet_requ
         return {}
 
 
-def get_baymax_response(user_text, conversation_history=None, current_data=None, user_context=None):
+def get_knowledge_context(user_text):
+    """Knowledge-base passages for the prompt; never fails the chat turn."""
+    from .knowledge_index import context_for
+    try:
+        return context_for(user_text)
+    except Exception as e:
+        print(f"⚠️ Knowledge retrieval error: {e}")
+        return ""
+
+
+def get_baymax_response(user_text, conversation_history=None, current_data=None, user_context=None, extract=True):
     """
     Get Baymax response using Groq.
+    extract=False skips the extraction call (done later by the chat.extract task).
     """
-    groq_client = load_groq()
+    load_groq()
     system_prompt = load_system_prompt()
     
     # Inject user context if available
     if user_context:
         system_prompt += f"\n\nUSER CONTEXT:\n{user_context}\nUse this information to personalize your response (e.g. use their name, refer to their cycle). "
 
+    # Ground answers in our curated articles when they cover the question
+    knowledge = get_knowledge_context(user_text)
+    if knowledge:
+        system_prompt += (
+            f"\n\nOVASENSE ARTICLES (relevant excerpts):\n{knowledge}\n"
+            "Base factual advice on these excerpts when they answer the question. "
+            "Do not mention that you were given articles."
+        )
+
     # Build messages
     messages = [{"role": "system", "content": system_prompt}]
     
@@ -142,23 +153,24 @@ def get_baymax_response(user_text, conversation_history=None, current_data=None,
     print(f"📤 [DEBUG] SENT TO GROQ:\n{json.dumps(messages, indent=2)}")
     
     try:
-        completion = groq_client.chat.completions.create(
-            model=GROQ_MODEL,
+        response_text = llm.chat_completion(
+            "chat",
             messages=messages,
+            model=settings.GROQ_MODEL or DEFAULT_CHAT_MODEL,
             temperature=0.7,
             max_tokens=256 # Keep replies concise
-        )
-        
-        response_text = completion.choices[0].message.content.strip()
+        ).strip()
         print(f"💬 Baymax: {response_text}")
         
-        # Extract data from just this turn (heuristic for speed)
-        full_history = (conversation_history or []) + [
-            {'sender': 'user', 'text': user_text},
-            {'sender': 'assistant', 'text': response_text}
-        ]
-        
-        extracted_data = extract_symptom_data(full_history)
+        extracted_data = {}
+        if extract:
+            # Extract data from just this turn (heuristic for speed)
+            full_history = (conversation_history or []) + [
+                {'sender': 'user', 'text': user_text},
+                {'sender': 'assistant', 'text': response_text}
+            ]
+
+            extracted_data = extract_symptom_data(full_history)
         
         return {
             'response_text': response_text,
@@ -0,0 +1,376 @@
+"""
+Local Groq / OpenAI-compatible stand-in server.
+
+Lets the backend (and load tests) run without live Groq access.
+Point the backend at it with:
+
+    GROQ_BASE_URL=http://127.0.0.1:8010 GROQ_API_KEY=stub python manage.py runserver
+
+Run with: python groq_stub.py [--port 8010] [options]
+
+Features:
+• POST /openai/v1/chat/completions   (Groq SDK path)
+• POST /v1/chat/completions          (plain OpenAI clients)
+• Canned responses that follow each prompt's JSON schema
+  (classify sections, explanation, predictive, insight, extraction, chat)
+• Configurable latency distribution
+• Token streaming (stream=true → SSE chunks)
+• Error injection: 429s, 500s, timeouts, malformed JSON content
+
+Standard library only, so it runs anywhere Python does.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# ============================================================
+# LATENCY
+# ============================================================
+
+def parse_latency(spec):
+    """
+    Parse a latency spec into a sampler returning seconds.
+
+      fixed:0.3            always 300 ms
+      uniform:0.1,0.8      uniform between 100 and 800 ms
+      normal:0.4,0.1       mean 400 ms, sd 100 ms (clamped at 0)
+      lognormal:0.4,0.6    median 400 ms, log-space sigma 0.6 (long tail)
+    """
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",") if v.strip()] if params else []
+
+    if kind == "fixed":
+        (value,) = values or [0.0]
+        return lambda rng: value
+    if kind == "uniform":
+        low, high = values
+        return lambda rng: rng.uniform(low, high)
+    if kind == "normal":
+        mean, sd = values
+        return lambda rng: max(0.0, rng.gauss(mean, sd))
+    if kind == "lognormal":
+        median, sigma = values
+        mu = math.log(median)
+        return lambda rng: rng.lognormvariate(mu, sigma)
+
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+# ============================================================
+# CANNED RESPONSES
+# ============================================================
+
+PHENOTYPES = ["Insulin-Resistant PCOS", "Lean PCOS", "Inflammatory PCOS", "Adrenal PCOS"]
+
+
+def classify_prompt(messages):
+    """Work out which call site sent the prompt from its wording."""
+    text = "\n".join(str(m.get("content", "")) for m in messages)
+    system = next((m.get("content", "") for m in messages if m.get("role") == "system"), "")
+
+    if "data extraction AI" in text:
+        return "extraction"
+    if "future_risk_score" in text:
+        return "predictive"
+    if '"risk_score"' in text and "main_reason" in text:
+        return "insight"
+    if "SECTION 1" in text and "SECTION 2" in text:
+        return "classify"
+    if "Explain WHY this PCOS phenotype" in text:
+        return "explanation"
+    if "Baymax" in system:
+        return "chat"
+    return "generic"
+
+
+def canned_response(kind, messages, rng):
+    last_user = next(
+        (m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), ""
+    )
+
+    if kind == "predictive":
+        return json.dumps({
+            "future_risk_score": rng.randint(20, 80),
+            "mixed_pcos_types": rng.sample(PHENOTYPES, 2),
+            "recommended_lab_tests": ["Fasting insulin", "HbA1c", "Total testosterone"],
+            "priority_lifestyle_changes": [
+                "Walk 30 minutes after meals",
+                "Prioritise 7-8 hours of sleep",
+                "Add protein to breakfast",
+            ],
+            "reasoning": "Stub prediction based on irregular cycles and metabolic markers.",
+        })
+
+    if kind == "insight":
+        return json.dumps({
+            "risk_score": rng.randint(20, 80),
+            "main_reason": "Stub insight: cycle variation combined with recent sleep trend.",
+            "recommendations": ["Track sleep", "Light exercise", "Reduce refined sugar"],
+        })
+
+    if kind == "extraction":
+        lowered = last_user.lower()
+        started = "period started" in lowered or "period today" in lowered
+        return json.dumps({
+            "period_start_date": date.today().isoformat() if started else None,
+            "period_end_date": None,
+            "diet_request": "diet" in lowered or "food" in lowered,
+            "mental_state": "stressed" if "stress" in lowered else None,
+            "symptoms": {"acne": True} if "acne" in lowered else {},
+        })
+
+    if kind == "classify":
+        return (
+            "SECTION 1 - ANALYSIS\n"
+            "The symptom pattern points to hormonal and metabolic involvement. "
+            "Irregular cycles with androgen signs meet two Rotterdam criteria.\n\n"
+            "SECTION 2 - DIET PLAN\n"
+            "- Choose jowar or bajra roti over refined wheat\n"
+            "- Include dal, sabzi and curd with every meal\n"
+            "- Limit sugary drinks and fried snacks\n"
+        )
+
+    if kind == "explanation":
+        return "The phenotype reflects irregular cycles together with androgen and metabolic signs."
+
+    if kind == "chat":
+        replies = [
+            "I hear you, and it is okay to feel this way. I am here for you.",
+            "You are doing your best, and that is enough. I have made a note of it.",
+            "Thank you for checking in today. Small steps still count.",
+        ]
+        return rng.choice(replies)
+
+    return "This is a stub response."
+
+
+def malformed(text):
+    """Break a response the way real models occasionally do."""
+    if text.lstrip().startswith("{"):
+        return "```json\n" + text[: max(1, len(text) // 2)]
+    return text + "\n```json\n{\"unterminated\": "
+
+
+def count_tokens(text):
+    return max(1, len(text) // 4)
+
+
+# ============================================================
+# HTTP HANDLER
+# ============================================================
+
+class StubHandler(BaseHTTPRequestHandler):
+    server_version = "GroqStub/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        if self.server.options.verbose:
+            super().log_message(fmt, *args)
+
+    # ---------------- helpers ----------------
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message, err_type, headers=None):
+        self._send_json(status, {"error": {"message": message, "type": err_type}}, headers)
+
+    # ---------------- routes ----------------
+
+    def do_GET(self):
+        if self.path in ("/health", "/healthz"):
+            return self._send_json(200, {"status": "ok"})
+        if self.path.rstrip("/") in ("/openai/v1/models", "/v1/models"):
+            return self._send_json(200, {
+                "object": "list",
+                "data": [{"id": m, "object": "model", "owned_by": "stub"} for m in self.server.options.models],
+            })
+        self._error(404, "Not found", "not_found")
+
+    def do_POST(self):
+        if self.path.rstrip("/") not in ("/openai/v1/chat/completions", "/v1/chat/completions"):
+            return self._error(404, "Not found", "not_found")
+
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._error(400, "Request body is not valid JSON", "invalid_request_error")
+
+        messages = body.get("messages") or []
+        opts = self.server.options
+        rng = self.server.next_rng(messages)
+
+        # ---- error injection (decided before any latency) ----
+        roll = rng.random()
+        if roll < opts.rate_429:
+            return self._error(
+                429, "Rate limit reached (stub)", "rate_limit_exceeded",
+                headers={"Retry-After": str(opts.retry_after)},
+            )
+        roll -= opts.rate_429
+        if roll < opts.rate_500:
+            return self._error(500, "Internal server error (stub)", "internal_server_error")
+        roll -= opts.rate_500
+        if roll < opts.rate_timeout:
+            time.sleep(opts.timeout_seconds)
+            self.close_connection = True
+            return
+        roll -= opts.rate_timeout
+        broken = roll < opts.rate_malformed
+
+        kind = classify_prompt(messages)
+        text = canned_response(kind, messages, rng)
+        if broken:
+            text = malformed(text)
+
+        time.sleep(self.server.sample_latency(rng))
+
+        prompt_tokens = sum(count_tokens(str(m.get("content", ""))) for m in messages)
+        completion_tokens = count_tokens(text)
+        max_tokens = body.get("max_tokens")
+        if max_tokens and completion_tokens > max_tokens:
+            text = text[: max_tokens * 4]
+            completion_tokens = max_tokens
+
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        meta = {
+            "id": f"chatcmpl-stub-{uuid.uuid4().hex[:12]}",
+            "created": int(time.time()),
+            "model": body.get("model") or opts.models[0],
+            "system_fingerprint": "stub",
+        }
+
+        if body.get("stream"):
+            return self._stream(text, usage, meta)
+
+        self._send_json(200, {
+            **meta,
+            "object": "chat.completion",
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+                "logprobs": None,
+            }],
+            "usage": usage,
+        }, headers={"X-Stub-Kind": kind})
+
+    def _stream(self, text, usage, meta):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def emit(delta, finish=None, extra=None):
+            chunk = {
+                **meta,
+                "object": "chat.completion.chunk",
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish, "logprobs": None}],
+            }
+            if extra:
+                chunk.update(extra)
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+
+        delay = 1.0 / self.server.options.tokens_per_second
+        emit({"role": "assistant", "content": ""})
+        # ~4 characters per token, like count_tokens()
+        for i in range(0, len(text), 4):
+            emit({"content": text[i:i + 4]})
+            time.sleep(delay)
+        emit({}, finish="stop", extra={"x_groq": {"usage": usage}, "usage": usage})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, options):
+        super().__init__(address, StubHandler)
+        self.options = options
+        self.sample_latency = parse_latency(options.latency)
+        self._seed_lock = threading.Lock()
+        self._counter = 0
+
+    def next_rng(self, messages):
+        """
+        Per-request RNG. With --deterministic the same prompt always gets
+        the same response (useful for recording fixtures); otherwise each
+        request draws fresh values from the seeded sequence.
+        """
+        if self.options.deterministic:
+            digest = hashlib.sha256(json.dumps(messages, sort_keys=True).encode()).hexdigest()
+            return random.Random(f"{self.options.seed}:{digest}")
+        with self._seed_lock:
+            self._counter += 1
+            return random.Random(f"{self.options.seed}:{self._counter}")
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def build_parser():
+    p = argparse.ArgumentParser(description="Local Groq/OpenAI-compatible stub server")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8010)
+    p.add_argument("--latency", default="lognormal:0.35,0.5",
+                   help="fixed:S | uniform:LO,HI | normal:MEAN,SD | lognormal:MEDIAN,SIGMA")
+    p.add_argument("--tokens-per-second", type=float, default=250.0,
+                   help="Streaming pace")
+    p.add_argument("--rate-429", type=float, default=0.0, help="Fraction of requests answered with 429")
+    p.add_argument("--rate-500", type=float, default=0.0, help="Fraction answered with 500")
+    p.add_argument("--rate-timeout", type=float, default=0.0,
+                   help="Fraction that hang for --timeout-seconds and drop the connection")
+    p.add_argument("--rate-malformed", type=float, default=0.0,
+                   help="Fraction whose content is truncated / malformed JSON")
+    p.add_argument("--timeout-seconds", type=float, default=65.0)
+    p.add_argument("--retry-after", type=int, default=1)
+    p.add_argument("--seed", default="ovasense")
+    p.add_argument("--deterministic", action="store_true",
+                   help="Same prompt -> same response and latency")
+    p.add_argument("--models", nargs="+",
+                   default=["llama-3.3-70b-versatile", "llama-3.1-8b-instant"])
+    p.add_argument("--verbose", action="store_true")
+    return p
+
+
+def main(argv=None):
+    options = build_parser().parse_args(argv)
+    server = StubServer((options.host, options.port), options)
+    print(f"🧪 Groq stub listening on http://{options.host}:{options.port} "
+          f"(latency={options.latency})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,428 @@
+"""
+End-to-end load test for the OvaSense API.
+
+Drives the main user journeys concurrently and reports throughput and
+latency percentiles per endpoint:
+
+    register → login → classify → chat → cycle log → metric log
+    → dashboard reads (history, cycles, prediction, summary, trends,
+      insight, articles) → report download
+
+Run against an already running server:
+    python loadtest.py --base-url http://127.0.0.1:8000/api --users 10 --iterations 5
+
+Or let it start the Groq stand-in and a Django server itself:
+    python loadtest.py --spawn --users 10 --duration 60
+    python loadtest.py --spawn --server-cmd "gunicorn ovasense_backend.wsgi:application --workers 4 --bind 127.0.0.1:{port}"
+
+Results are written as JSON to loadtest_results/ (one file per run) so
+runs can be compared across commits:
+    python loadtest.py --spawn --compare loadtest_results/<previous>.json
+
+Standard library only.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "loadtest_results")
+
+CLASSIFY_PAYLOAD = {
+    "cycle_gap_days": 48,
+    "periods_regular": False,
+    "acne": True,
+    "facial_hair_growth": False,
+    "dark_patches": True,
+    "bmi": 29.5,
+    "stress_level": 6,
+    "sleep_hours": 6.5,
+}
+
+CHAT_MESSAGES = [
+    "Hi Baymax, I have been feeling stressed this week.",
+    "My period started today and I have some acne.",
+    "Can you suggest a diet for insulin resistant PCOS?",
+]
+
+
+# ============================================================
+# STATS
+# ============================================================
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.status_codes = defaultdict(lambda: defaultdict(int))
+
+    def add(self, endpoint, seconds, status, ok):
+        with self.lock:
+            self.samples[endpoint].append(seconds)
+            self.status_codes[endpoint][str(status)] += 1
+            if not ok:
+                self.errors[endpoint] += 1
+
+    def summary(self, wall_seconds):
+        endpoints = {}
+        everything = []
+
+        for name, values in sorted(self.samples.items()):
+            values = sorted(values)
+            everything.extend(values)
+            endpoints[name] = _describe(values, wall_seconds)
+            endpoints[name]["errors"] = self.errors[name]
+            endpoints[name]["status_codes"] = dict(self.status_codes[name])
+
+        overall = _describe(sorted(everything), wall_seconds)
+        overall["errors"] = sum(self.errors.values())
+        return endpoints, overall
+
+
+def _describe(values, wall_seconds):
+    if not values:
+        return {"count": 0}
+    ms = lambda v: round(v * 1000, 2)
+    return {
+        "count": len(values),
+        "throughput_rps": round(len(values) / wall_seconds, 2) if wall_seconds else None,
+        "mean_ms": ms(sum(values) / len(values)),
+        "p50_ms": ms(percentile(values, 50)),
+        "p90_ms": ms(percentile(values, 90)),
+        "p95_ms": ms(percentile(values, 95)),
+        "p99_ms": ms(percentile(values, 99)),
+        "max_ms": ms(values[-1]),
+    }
+
+
+# ============================================================
+# HTTP CLIENT
+# ============================================================
+
+class Client:
+    def __init__(self, base_url, recorder, timeout):
+        self.base_url = base_url.rstrip("/")
+        self.recorder = recorder
+        self.timeout = timeout
+        self.token = None
+
+    def request(self, endpoint, method, path, payload=None, expect=(200, 201)):
+        url = f"{self.base_url}{path}"
+        data = json.dumps(payload).encode() if payload is not None else None
+        req = urllib.request.Request(url, data=data, method=method)
+        req.add_header("Content-Type", "application/json")
+        if self.token:
+            req.add_header("Authorization", f"Token {self.token}")
+
+        start = time.perf_counter()
+        status, body = 0, b""
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                status = resp.status
+                body = resp.read()
+        except urllib.error.HTTPError as e:
+            status = e.code
+            body = e.read()
+        except Exception:
+            status = "exception"
+        elapsed = time.perf_counter() - start
+
+        ok = status in expect
+        self.recorder.add(endpoint, elapsed, status, ok)
+
+        if not ok or not body:
+            return None
+        if body[:1] in (b"{", b"["):
+            try:
+                return json.loads(body)
+            except ValueError:
+                return None
+        return body
+
+
+# ============================================================
+# USER JOURNEY
+# ============================================================
+
+def run_user(user_index, args, recorder, deadline):
+    rng = random.Random(f"{args.seed}:{user_index}")
+    client = Client(args.base_url, recorder, args.timeout)
+
+    username = f"load_{args.run_id}_{user_index}"
+    password = "load-test-password"
+
+    client.request("auth.register", "POST", "/auth/register/", {
+        "username": username, "password": password, "name": f"Load User {user_index}",
+    })
+    login = client.request("auth.login", "POST", "/auth/login/", {
+        "username": username, "password": password,
+    })
+    if not login:
+        return
+    client.token = login["token"]
+
+    iteration = 0
+    while True:
+        if deadline and time.monotonic() >= deadline:
+            break
+        if not deadline and iteration >= args.iterations:
+            break
+
+        # ---- writes ----
+        # One cycle per iteration, ~29 days apart, going back in time
+        start = date.today() - timedelta(days=29 * iteration + rng.randint(0, 3))
+        client.request("cycle.log", "POST", "/cycle/log/", {
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(days=5)).isoformat(),
+            "flow_intensity": rng.randint(1, 5),
+        })
+
+        # (user, date, metric_type) is unique, so use a fresh date per iteration
+        metric_day = (date.today() - timedelta(days=iteration)).isoformat()
+        for metric_type, low, high in (("weight", 55, 85), ("sleep", 4, 9), ("mood", 1, 10)):
+            client.request("health.metric", "POST", "/health/metric/", {
+                "date": metric_day, "metric_type": metric_type,
+                "value": round(rng.uniform(low, high), 1),
+            })
+
+        # ---- AI paths ----
+        result = None
+        if iteration % args.classify_every == 0:
+            payload = dict(CLASSIFY_PAYLOAD, bmi=round(rng.uniform(19, 34), 1))
+            result = client.request("classify", "POST", "/classify/", payload)
+
+        client.request("chat", "POST", "/chat/", {
+            "text": rng.choice(CHAT_MESSAGES),
+            "conversation_history": [],
+            "current_data": {},
+        })
+
+        # ---- dashboard reads ----
+        client.request("history", "GET", "/history/")
+        client.request("cycle.list", "GET", "/cycle/list/?limit=12")
+        client.request("cycle.predict", "GET", "/cycle/predict/")
+        client.request("health.summary", "GET", "/health/summary/")
+        client.request("health.trends", "GET", "/health/trends/?metric_type=weight&days=90")
+        client.request("insight", "GET", "/insights/cycle-aware/")
+        client.request("articles", "GET", "/articles/")
+
+        if result and result.get("result_id"):
+            client.request("report", "GET", f"/report/{result['result_id']}/")
+
+        iteration += 1
+
+
+# ============================================================
+# SPAWNED ENVIRONMENT
+# ============================================================
+
+def wait_for(url, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=2)
+            return True
+        except urllib.error.HTTPError:
+            return True
+        except Exception:
+            time.sleep(0.3)
+    return False
+
+
+def spawn_environment(args):
+    """Start the Groq stub and a Django server; return (processes, env)."""
+    procs = []
+    env = dict(os.environ)
+    env["GROQ_BASE_URL"] = f"http://127.0.0.1:{args.stub_port}"
+    env["GROQ_API_KEY"] = env.get("GROQ_API_KEY") or "stub"
+    env.setdefault("DJANGO_DEBUG", "False")
+    if not env.get("DATABASE_URL"):
+        db_path = os.path.join(tempfile.mkdtemp(prefix="ovasense_load_"), "load.sqlite3")
+        env["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    stub_cmd = [sys.executable, "groq_stub.py", "--port", str(args.stub_port),
+                "--latency", args.stub_latency, "--seed", str(args.seed)]
+    procs.append(subprocess.Popen(stub_cmd, cwd=BACKEND_DIR, env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+
+    subprocess.run([sys.executable, "manage.py", "migrate", "--noinput", "-v", "0"],
+                   cwd=BACKEND_DIR, env=env, check=True)
+
+    server_cmd = args.server_cmd.format(port=args.port, python=sys.executable)
+    procs.append(subprocess.Popen(server_cmd, shell=True, cwd=BACKEND_DIR, env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+
+    if not wait_for(f"http://127.0.0.1:{args.stub_port}/health") or \
+       not wait_for(f"http://127.0.0.1:{args.port}/api/articles/"):
+        stop(procs)
+        raise SystemExit("❌ Spawned servers did not come up")
+
+    args.base_url = f"http://127.0.0.1:{args.port}/api"
+    return procs
+
+
+def stop(procs):
+    for p in procs:
+        p.terminate()
+    for p in procs:
+        try:
+            p.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            p.kill()
+
+
+# ============================================================
+# REPORTING
+# ============================================================
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True,
+            stderr=subprocess.DEVNULL,
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def print_table(endpoints, overall, baseline=None):
+    header = f"{'endpoint':<16}{'count':>7}{'err':>5}{'rps':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    if baseline:
+        header += f"{'Δp50':>9}{'Δp99':>9}"
+    print(header)
+    print("-" * len(header))
+
+    rows = list(endpoints.items()) + [("OVERALL", overall)]
+    for name, s in rows:
+        if not s.get("count"):
+            continue
+        line = (f"{name:<16}{s['count']:>7}{s['errors']:>5}{s['throughput_rps']:>8}"
+                f"{s['p50_ms']:>10}{s['p90_ms']:>10}{s['p99_ms']:>10}{s['max_ms']:>10}")
+        if baseline:
+            base = baseline["overall"] if name == "OVERALL" else baseline["endpoints"].get(name)
+            line += f"{_delta(s, base, 'p50_ms'):>9}{_delta(s, base, 'p99_ms'):>9}"
+        print(line)
+
+
+def _delta(current, base, key):
+    if not base or not base.get(key):
+        return "-"
+    change = (current[key] - base[key]) / base[key] * 100
+    return f"{change:+.0f}%"
+
+
+def build_parser():
+    p = argparse.ArgumentParser(description="OvaSense end-to-end load test")
+    p.add_argument("--base-url", default="http://127.0.0.1:8000/api")
+    p.add_argument("--users", type=int, default=5, help="Concurrent virtual users")
+    p.add_argument("--iterations", type=int, default=3, help="Journeys per user (ignored with --duration)")
+    p.add_argument("--duration", type=float, default=0, help="Run for N seconds instead of fixed iterations")
+    p.add_argument("--classify-every", type=int, default=2, help="Run classify + report every N iterations")
+    p.add_argument("--timeout", type=float, default=120)
+    p.add_argument("--seed", default="42")
+    p.add_argument("--label", default="", help="Free-form tag stored in the results (e.g. 'gunicorn-4w')")
+    p.add_argument("--out", default=RESULTS_DIR)
+    p.add_argument("--compare", help="Previous results JSON to diff against")
+
+    p.add_argument("--spawn", action="store_true", help="Start groq_stub.py and a Django server")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--stub-port", type=int, default=8010)
+    p.add_argument("--stub-latency", default="lognormal:0.35,0.5")
+    p.add_argument("--server-cmd", default="{python} manage.py runserver --noreload 127.0.0.1:{port}",
+                   help="Server command when spawning; {port} and {python} are substituted")
+    return p
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.run_id = uuid.uuid4().hex[:8]
+    args.classify_every = max(1, args.classify_every)
+
+    procs = spawn_environment(args) if args.spawn else []
+    recorder = Recorder()
+
+    try:
+        print(f"🚀 {args.users} users against {args.base_url} "
+              f"({f'{args.duration}s' if args.duration else f'{args.iterations} iterations'})")
+        deadline = time.monotonic() + args.duration if args.duration else None
+
+        started = time.perf_counter()
+        threads = [
+            threading.Thread(target=run_user, args=(i, args, recorder, deadline), daemon=True)
+            for i in range(args.users)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - started
+    finally:
+        stop(procs)
+
+    endpoints, overall = recorder.summary(wall)
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "label": args.label,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "wall_seconds": round(wall, 2),
+            "config": {
+                "base_url": args.base_url,
+                "users": args.users,
+                "iterations": None if args.duration else args.iterations,
+                "duration": args.duration or None,
+                "classify_every": args.classify_every,
+                "spawned": args.spawn,
+                "server_cmd": args.server_cmd if args.spawn else None,
+                "stub_latency": args.stub_latency if args.spawn else None,
+                "seed": args.seed,
+            },
+        },
+        "endpoints": endpoints,
+        "overall": overall,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+
+    print()
+    print_table(endpoints, overall, baseline)
+
+    os.makedirs(args.out, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(args.out, f"{stamp}-{results['meta']['commit']}{'-' + args.label if args.label else ''}.json")
+    with open(path, "w") as fh:
+        json.dump(results, fh, indent=2)
+    print(f"\n📄 Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
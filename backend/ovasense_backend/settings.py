@@ -40,6 +40,8 @@ INSTALLED_APPS = [
 # ===============================
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",  # 🔥 Must be at top
+    "api.middleware.MetricsMiddleware",
+    "api.middleware.RequestMemoMiddleware",
     "api.middleware.DisableCSRFMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
@@ -139,3 +141,74 @@ if FRONTEND_URL:
     CSRF_TRUSTED_ORIGINS.append(FRONTEND_URL)
 
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
+
+# ===============================
+# 🤖 LLM (Groq)
+# ===============================
+# .env is loaded once, above; modules read these instead of os.environ.
+GROQ_API_KEY = os.environ.get("GROQ_API_KEY") or None
+GROQ_MODEL = os.environ.get("GROQ_MODEL") or None
+
+# Set GROQ_BASE_URL=http://127.0.0.1:8010 to use the local stand-in
+# server (groq_stub.py) for offline and load testing.
+GROQ_BASE_URL = os.environ.get("GROQ_BASE_URL") or None
+GROQ_TIMEOUT = float(os.environ.get("GROQ_TIMEOUT", "60"))
+GROQ_MAX_RETRIES = int(os.environ.get("GROQ_MAX_RETRIES", "2"))
+
+# Record/replay of LLM responses (see api/llm.py): off | replay | record | auto
+LLM_CASSETTE_MODE = os.environ.get("LLM_CASSETTE_MODE", "off").lower()
+LLM_CASSETTE_DIR = os.environ.get("LLM_CASSETTE_DIR") or BASE_DIR / "tests" / "cassettes"
+
+# ===============================
+# 📈 METRICS (/api/metrics/)
+# ===============================
+# Shared directory for per-worker snapshots so the scrape covers all
+# gunicorn workers. Unset = single-process (in-memory only).
+METRICS_MULTIPROC_DIR = os.environ.get("METRICS_MULTIPROC_DIR") or None
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", "1.0"))
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN") or None
+
+# ===============================
+# 🧵 BACKGROUND TASKS (manage.py run_worker)
+# ===============================
+TASK_MAX_ATTEMPTS = int(os.environ.get("TASK_MAX_ATTEMPTS", "5"))
+TASK_BACKOFF_BASE = float(os.environ.get("TASK_BACKOFF_BASE", "5"))      # seconds
+TASK_BACKOFF_MAX = float(os.environ.get("TASK_BACKOFF_MAX", "600"))      # seconds
+TASK_LOCK_TIMEOUT = float(os.environ.get("TASK_LOCK_TIMEOUT", "600"))    # running longer = worker died
+
+# Move LLM work out of the request when a worker is running.
+# Off: classify fills AI sections and chat extracts data inline (as before).
+CLASSIFY_AI_ASYNC = os.environ.get("CLASSIFY_AI_ASYNC", "false").lower() == "true"
+CHAT_EXTRACTION_ASYNC = os.environ.get("CHAT_EXTRACTION_ASYNC", "false").lower() == "true"
+# Queue report pre-renders / insight recomputes after writes. Only useful
+# with `manage.py run_worker` running; off: reports and insights are built
+# on demand by their endpoints and no BackgroundTask rows are written.
+PRECOMPUTE_ASYNC = os.environ.get("PRECOMPUTE_ASYNC", "false").lower() == "true"
+
+# A precomputed insight from today is served while no recompute is queued.
+INSIGHT_MAX_AGE = int(os.environ.get("INSIGHT_MAX_AGE", "21600"))        # seconds
+
+# Article views are counted in memory and written back in bulk (api/view_counts.py)
+ARTICLE_VIEWS_FLUSH_INTERVAL = float(os.environ.get("ARTICLE_VIEWS_FLUSH_INTERVAL", "10"))  # seconds
+# Browsers / CDNs may reuse article listings this long before revalidating (ETag)
+ARTICLE_CACHE_MAX_AGE = int(os.environ.get("ARTICLE_CACHE_MAX_AGE", "300"))  # seconds
+# Baymax gets up to this many knowledge-base passages (api/knowledge_index.py)
+KNOWLEDGE_TOP_K = int(os.environ.get("KNOWLEDGE_TOP_K", "3"))
+KNOWLEDGE_CONTEXT_TOKENS = int(os.environ.get("KNOWLEDGE_CONTEXT_TOKENS", "300"))
+
+# ===============================
+# 🗄️ CACHE
+# ===============================
+# Per-user entries are versioned through the database (api/cache.py), so a
+# per-process LocMemCache stays correct; a shared backend (e.g.
+# django.core.cache.backends.filebased.FileBasedCache or Redis) only
+# raises the hit rate across gunicorn workers.
+USER_CACHE_TTL = int(os.environ.get("USER_CACHE_TTL", "3600"))  # seconds
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.environ.get("CACHE_LOCATION", "ovasense"),
+        "TIMEOUT": USER_CACHE_TTL,
+    }
+}
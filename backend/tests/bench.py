@@ -0,0 +1,31 @@
+"""
+Tiny benchmark runner used by the `bench` fixture and benchmark TestCases.
+"""
+import os
+import time
+
+
+# Multiply every threshold (e.g. BENCH_THRESHOLD_SCALE=3 on slow CI runners)
+BENCH_SCALE = float(os.environ.get("BENCH_THRESHOLD_SCALE", "1"))
+
+
+class Bench:
+    def __call__(self, fn, threshold_ms, number=10, rounds=5):
+        """
+        Time `fn` and fail when the best per-call time exceeds the threshold.
+        Best-of-rounds filters out scheduler noise; returns ms per call.
+        """
+        fn()  # warm-up (imports, caches, query compilation)
+
+        best = float("inf")
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            best = min(best, (time.perf_counter() - start) / number)
+
+        best_ms = best * 1000
+        limit = threshold_ms * BENCH_SCALE
+        print(f"\n⏱️ {getattr(fn, '__name__', 'bench')}: {best_ms:.3f} ms/call (limit {limit:.3f} ms)")
+        assert best_ms <= limit, f"Regression: {best_ms:.3f} ms/call > {limit:.3f} ms"
+        return best_ms
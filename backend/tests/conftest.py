@@ -0,0 +1,43 @@
+"""
+Shared pytest setup for the offline suite.
+
+• Django is configured against a throwaway SQLite test database
+  (unless DATABASE_URL is exported explicitly)
+• LLM calls are served from recorded cassettes in tests/cassettes/
+  (LLM_CASSETTE_MODE=replay), so no test touches the network
+• `bench` (tests/bench.py) runs micro-benchmarks against regression thresholds
+"""
+
+import os
+
+import django
+import pytest
+
+from tests.bench import Bench
+
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ovasense_backend.settings")
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+os.environ.setdefault("LLM_CASSETTE_MODE", "replay")
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+# Cassette keys include the model name
+os.environ.setdefault("GROQ_MODEL", "llama-3.3-70b-versatile")
+django.setup()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def django_test_database():
+    from django.test.runner import DiscoverRunner
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    runner = DiscoverRunner(verbosity=0, interactive=False)
+    old_config = runner.setup_databases()
+    yield
+    runner.teardown_databases(old_config)
+    teardown_test_environment()
+
+
+@pytest.fixture
+def bench():
+    return Bench()
@@ -0,0 +1,115 @@
+"""
+Pre-rendered article HTML, versioned list/FAQ caching and ETags.
+"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api import view_counts
+from api.articles import render_markdown
+from api.models import KnowledgeArticle
+
+
+class RenderMarkdownTests(TestCase):
+
+    def test_blocks_and_inline(self):
+        html = render_markdown(
+            "# Title\n\nSome **bold**, *soft* and `code`\ncontinued.\n\n"
+            "- one\n- two\n\n1. first\n2. second\n\n## [Guide](https://example.org/a?b=1&c=2)"
+        )
+        self.assertEqual(html.split("\n"), [
+            "<h1>Title</h1>",
+            "<p>Some <strong>bold</strong>, <em>soft</em> and <code>code</code> continued.</p>",
+            "<ul>", "<li>one</li>", "<li>two</li>", "</ul>",
+            "<ol>", "<li>first</li>", "<li>second</li>", "</ol>",
+            '<h2><a href="https://example.org/a?b=1&amp;c=2" rel="noopener noreferrer" target="_blank">Guide</a></h2>',
+        ])
+
+    def test_sanitized(self):
+        html = render_markdown(
+            '<script>alert(1)</script> <img src=x onerror="alert(1)">\n\n'
+            "[bad](javascript:alert(1)) [quote](https://a.org/\"onclick=\"x)"
+        )
+        self.assertNotIn("<script", html)
+        self.assertNotIn("<img", html)
+        self.assertNotIn('href="javascript', html)
+        self.assertNotIn('"onclick', html)
+
+
+@override_settings(ARTICLE_VIEWS_FLUSH_INTERVAL=3600)
+class ArticleCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        view_counts.flush()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user("cache_reader"))
+        self.article = KnowledgeArticle.objects.create(
+            slug="diet", title="Diet", content="# Diet\n\n- **Fibre**", category="diet"
+        )
+        KnowledgeArticle.objects.create(slug="faq-1", title="FAQ", content="Answer", category="faq")
+
+    def test_html_rendered_on_save(self):
+        self.assertEqual(self.article.content_html, "<h1>Diet</h1>\n<ul>\n<li><strong>Fibre</strong></li>\n</ul>")
+
+        self.article.content = "Changed"
+        self.article.save(update_fields=["content"])
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.content_html, "<p>Changed</p>")
+
+        response = self.client.get(f"/api/articles/{self.article.id}/")
+        self.assertEqual(response.data["content_html"], "<p>Changed</p>")
+
+    def test_list_cached_until_content_changes(self):
+        first = self.client.get("/api/articles/")
+        self.assertEqual(len(first.data), 2)
+        self.assertIn("public", first["Cache-Control"])
+
+        with CaptureQueriesContext(connection) as ctx:
+            again = self.client.get("/api/articles/")
+        self.assertEqual(again.data, first.data)
+        self.assertEqual(len(ctx.captured_queries), 1)     # just the version check
+
+        self.article.title = "Diet basics"
+        self.article.save()
+        titles = {a["title"] for a in self.client.get("/api/articles/").data}
+        self.assertIn("Diet basics", titles)
+
+        self.article.delete()
+        self.assertEqual(len(self.client.get("/api/articles/").data), 1)
+
+    def test_category_and_faq_cached_separately(self):
+        self.assertEqual(len(self.client.get("/api/articles/", {"category": "diet"}).data), 1)
+        self.assertEqual([a["title"] for a in self.client.get("/api/faqs/").data], ["FAQ"])
+        self.assertEqual(len(self.client.get("/api/articles/").data), 2)
+
+    def test_etag_round_trip(self):
+        first = self.client.get("/api/faqs/")
+        tag = first["ETag"]
+
+        not_modified = self.client.get("/api/faqs/", HTTP_IF_NONE_MATCH=tag)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertIn("max-age", not_modified["Cache-Control"])
+
+        KnowledgeArticle.objects.create(slug="faq-2", title="FAQ 2", content="More", category="faq")
+        changed = self.client.get("/api/faqs/", HTTP_IF_NONE_MATCH=tag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], tag)
+
+        # different query → different tag
+        self.assertNotEqual(
+            self.client.get("/api/articles/", {"category": "faq"})["ETag"],
+            self.client.get("/api/articles/")["ETag"],
+        )
+
+    def test_detail_revalidates_and_counts_views(self):
+        url = f"/api/articles/{self.article.id}/"
+        first = self.client.get(url)
+        self.assertIn("no-cache", first["Cache-Control"])
+
+        second = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(view_counts.pending(self.article.id), 2)
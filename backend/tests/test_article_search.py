@@ -0,0 +1,111 @@
+"""
+Knowledge article full-text search: index maintenance, ranking,
+snippets and pagination.
+"""
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api import search
+from api.models import KnowledgeArticle
+
+
+def article(slug, title, content, category="diet", summary="", published=True):
+    return KnowledgeArticle.objects.create(
+        slug=slug, title=title, content=content, category=category,
+        summary=summary, published=published,
+    )
+
+
+class ArticleSearchTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user("search_user"))
+
+        self.insulin = article(
+            "insulin-resistance", "Insulin Resistance Explained",
+            "# Insulin\n\nHow **insulin** resistance drives PCOS symptoms.",
+        )
+        self.meals = article(
+            "meal-planning", "Meal Planning",
+            "Balanced plates help keep insulin levels steady after meals.",
+            summary="Foods that help manage PCOS.",
+        )
+        self.sleep = article("sleep", "Sleep and Hormones", "Aim for 7-9 hours.", category="lifestyle")
+        article("draft", "Insulin draft", "insulin insulin insulin", published=False)
+
+    def get(self, **params):
+        response = self.client.get("/api/articles/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_uses_database_index(self):
+        self.assertIn(connection.vendor, search.BACKENDS)
+
+    def test_ranked_with_title_matches_first(self):
+        data = self.get(search="insulin")
+
+        self.assertEqual(data["count"], 2)
+        self.assertEqual([r["id"] for r in data["results"]], [self.insulin.id, self.meals.id])
+        self.assertGreater(data["results"][0]["rank"], data["results"][1]["rank"])
+
+    def test_prefix_and_stemming(self):
+        self.assertEqual(self.get(search="insul")["count"], 2)
+        self.assertEqual([r["id"] for r in self.get(search="plans")["results"]], [self.meals.id])
+        # every word must match
+        self.assertEqual(self.get(search="insulin hormones")["count"], 0)
+
+    def test_snippet_highlights_and_escapes(self):
+        article("escape", "Cortisol", "Stress <script>alert(1)</script> raises cortisol.", category="faq")
+
+        hit = self.get(search="cortisol")["results"][0]
+        self.assertIn("<mark>", hit["snippet"])
+        self.assertNotIn("<script>", hit["snippet"])
+        self.assertIn("&lt;script&gt;", hit["snippet"])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.sleep.content = "Poor sleep worsens insulin sensitivity."
+        self.sleep.save()
+        self.assertEqual(self.get(search="insulin")["count"], 3)
+
+        self.meals.delete()
+        self.assertEqual(self.get(search="insulin")["count"], 2)
+
+        self.sleep.views = 10
+        self.sleep.save(update_fields=["views"])
+        self.assertEqual(self.get(search="sensitivity")["count"], 1)
+
+    def test_category_filter_and_pagination(self):
+        for i in range(5):
+            article(f"pcos-{i}", f"PCOS note {i}", "pcos basics", category="faq")
+
+        first = self.get(search="pcos", category="faq", page_size=2)
+        second = self.get(search="pcos", category="faq", page_size=2, page=2)
+
+        self.assertEqual(first["count"], 5)
+        self.assertEqual(len(first["results"]), 2)
+        self.assertEqual(second["page"], 2)
+        self.assertFalse({r["id"] for r in first["results"]} & {r["id"] for r in second["results"]})
+
+    def test_punctuation_only_query(self):
+        self.assertEqual(self.get(search='"*)(')["count"], 0)
+
+    def test_repairs_triggers_after_table_remake(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("SQLite only")
+        self.assertFalse(search.repair_sqlite_index(connection))
+
+        # What SQLite does to triggers when a migration remakes the table
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER api_article_fts_insert")
+        article("missed", "Ovulation tracking", "ovulation")
+        self.assertEqual(self.get(search="ovulation")["count"], 0)
+
+        self.assertTrue(search.repair_sqlite_index(connection))
+        self.assertEqual(self.get(search="ovulation")["count"], 1)
+
+    def test_without_search_lists_everything(self):
+        self.assertEqual(len(self.get()), 3)
+        self.assertEqual(len(self.get(category="lifestyle")), 1)
@@ -0,0 +1,108 @@
+"""
+Micro-benchmarks for hot paths, with regression thresholds.
+
+Thresholds are generous (several times the time measured on a laptop)
+so they only trip on real regressions. Scale them on slow runners with
+BENCH_THRESHOLD_SCALE, or skip with:  pytest -m "not benchmark"
+"""
+from datetime import date, timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.health_views import predict_cycle
+from api.knowledge_index import Index
+from api.ml_engine import rule_based_classification
+from api.models import CycleRecord, PhenotypeResult, SymptomLog
+from api.report import generate_pdf_report
+from api.serializers import HistorySerializer
+from tests.bench import Bench
+
+
+pytestmark = pytest.mark.benchmark
+
+SYMPTOMS = {
+    "cycle_gap_days": 50, "periods_regular": False, "acne": True,
+    "facial_hair_growth": False, "dark_patches": True, "bmi": 31.5,
+    "stress_level": 5, "sleep_hours": 7,
+}
+
+
+def test_knowledge_search_speed(bench):
+    words = [f"term{i}" for i in range(3000)]
+    docs = [
+        (f"Article {d // 10}", None, " ".join(words[(d * 37 + j * 11) % 3000] for j in range(120)))
+        for d in range(2000)
+    ]
+    index = Index(docs)
+
+    def search():
+        index.search("term5 term77 term1200 term2999 breakfast", k=3)
+
+    bench(search, threshold_ms=1.0, number=200)
+
+
+def test_rule_based_classification_speed(bench):
+    def classify():
+        rule_based_classification(SYMPTOMS)
+
+    bench(classify, threshold_ms=0.05, number=2000)
+
+
+class DatabaseBenchmarks(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="bench", password="x")
+        profile = cls.user.profile
+        start = date.today() - timedelta(days=29 * 24)
+        CycleRecord.objects.bulk_create([
+            CycleRecord(user=profile, start_date=start + timedelta(days=29 * i + i % 3))
+            for i in range(24)
+        ])
+
+        logs = SymptomLog.objects.bulk_create([
+            SymptomLog(user=profile, **SYMPTOMS) for _ in range(100)
+        ])
+        PhenotypeResult.objects.bulk_create([
+            PhenotypeResult(
+                symptom_log=log,
+                phenotype="Insulin-Resistant PCOS",
+                confidence=90,
+                reasons=["Dark patches", "High BMI"],
+                ai_explanation="Explanation paragraph.\n" * 20,
+                diet_plan="- Jowar roti\n- Dal\n" * 20,
+            )
+            for log in logs
+        ])
+        cls.log = logs[0]
+
+    bench = Bench()
+
+    def test_predict_cycle_speed(self):
+        factory = APIRequestFactory()
+
+        def predict():
+            request = factory.get("/api/cycle/predict/")
+            force_authenticate(request, user=self.user)
+            assert predict_cycle(request).status_code == 200
+
+        self.bench(predict, threshold_ms=20)
+
+    def test_generate_pdf_report_speed(self):
+        result = PhenotypeResult.objects.get(symptom_log=self.log)
+
+        def render():
+            generate_pdf_report(self.log, result, result.ai_explanation, result.diet_plan)
+
+        self.bench(render, threshold_ms=120, number=3, rounds=3)
+
+    def test_history_serializer_speed(self):
+        def serialize():
+            logs = SymptomLog.objects.select_related("result").all()
+            data = HistorySerializer(logs, many=True).data
+            assert len(data) == 100
+
+        self.bench(serialize, threshold_ms=80, number=3)
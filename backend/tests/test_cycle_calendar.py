@@ -0,0 +1,81 @@
+"""
+Calendar endpoint: logged + materialized forecast cycles and per-day
+phases for a window.
+"""
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import CycleRecord
+
+
+class CycleCalendarTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user("calendar_user")
+        self.profile = self.user.profile
+        self.client.force_authenticate(self.user)
+
+        self.last = date.today() - timedelta(days=10)
+        for i in range(6):
+            CycleRecord.objects.create(
+                user=self.profile,
+                start_date=self.last - timedelta(days=28 * (5 - i)),
+                end_date=self.last - timedelta(days=28 * (5 - i) - 4),
+            )
+
+    def get(self, start, end):
+        return self.client.get(f"/api/cycle/calendar/?from={start}&to={end}")
+
+    def test_window_has_logged_forecast_and_phases(self):
+        start, end = self.last - timedelta(days=3), self.last + timedelta(days=60)
+        data = self.get(start, end).json()
+
+        self.assertEqual(len(data["days"]), 64)
+        starts = [(c["start_date"], c["predicted"]) for c in data["cycles"]]
+        self.assertEqual(starts, [
+            (str(self.last), False),
+            (str(self.last + timedelta(days=28)), True),
+            (str(self.last + timedelta(days=56)), True),
+        ])
+
+        by_date = {d["date"]: d for d in data["days"]}
+        self.assertEqual(by_date[str(self.last)]["phase"], "Menstrual")
+        self.assertEqual(by_date[str(self.last + timedelta(days=13))]["phase"], "Ovulation")
+        self.assertTrue(by_date[str(self.last + timedelta(days=13))]["fertile"])
+        self.assertEqual(by_date[str(self.last + timedelta(days=20))]["phase"], "Luteal")
+        self.assertTrue(by_date[str(self.last + timedelta(days=28))]["predicted"])
+
+    def test_forecast_rows_follow_new_logs(self):
+        self.get(self.last, self.last + timedelta(days=60))
+        new_start = self.last + timedelta(days=30)
+        CycleRecord.objects.create(user=self.profile, start_date=new_start)
+
+        data = self.get(self.last, self.last + timedelta(days=60)).json()
+        predicted = [c["start_date"] for c in data["cycles"] if c["predicted"]]
+        self.assertEqual(predicted[0], str(new_start + timedelta(days=28)))
+        self.assertFalse(CycleRecord.objects.filter(
+            user=self.profile, predicted=True, start_date__lte=new_start
+        ).exists())
+
+    def test_list_excludes_forecast_rows(self):
+        self.get(self.last, self.last + timedelta(days=60))
+        self.assertTrue(CycleRecord.objects.filter(user=self.profile, predicted=True).exists())
+        cycles = self.client.get("/api/cycle/list/?limit=50").json()
+        self.assertEqual(len(cycles), 6)
+
+    def test_warm_calendar_is_one_range_query(self):
+        self.get(self.last, self.last + timedelta(days=30))
+        # get_profile + the range query; forecast rows and fit are cached
+        with self.assertNumQueries(2):
+            self.get(self.last - timedelta(days=40), self.last + timedelta(days=300))
+
+    def test_bad_ranges(self):
+        self.assertEqual(self.get("2026-02-01", "2026-01-01").status_code, 400)
+        self.assertEqual(self.get("2020-01-01", "2026-01-01").status_code, 400)
+        self.assertEqual(self.get("nope", "2026-01-01").status_code, 400)
@@ -0,0 +1,56 @@
+"""
+Shared cycle-history service: engines reuse one fetch per request.
+"""
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from api import cycle_history
+from api.forecasting import forecast
+from api.insights import get_cycle_irregularity, get_cycle_phase
+from api.models import CycleRecord
+from api.predictive_engine import get_patient_history
+
+
+class CycleHistoryTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.profile = User.objects.create_user("history_user").profile
+        start = date.today() - timedelta(days=100)
+        for gap in (0, 28, 58, 86):
+            CycleRecord.objects.create(user=self.profile, start_date=start + timedelta(days=gap))
+        self.profile.refresh_from_db()
+
+    def test_engines_share_one_fetch_per_scope(self):
+        with cycle_history.scope():
+            # stats row + full history once each, plus metric rollups + edge days
+            with self.assertNumQueries(4):
+                phase, day = get_cycle_phase(self.profile.id)
+                irregularity = get_cycle_irregularity(self.profile.id)
+                history = get_patient_history(self.profile)
+                fc = forecast(self.profile, 3)
+                latest = cycle_history.for_profile(self.profile.id).latest
+
+        self.assertEqual((phase, day), ("Ovulation", 15))
+        self.assertEqual(irregularity["lengths"], [30, 28])
+        self.assertEqual(history["recent_cycle_lengths"], [28, 30, 28])
+        self.assertEqual(latest.start_date, date.today() - timedelta(days=14))
+        self.assertEqual(len(fc["forecasts"]), 3)
+
+    def test_writes_invalidate_within_scope(self):
+        with cycle_history.scope():
+            before = cycle_history.for_profile(self.profile.id).latest
+            CycleRecord.objects.create(user=self.profile, start_date=date.today())
+            after = cycle_history.for_profile(self.profile.id).latest
+
+        self.assertNotEqual(before.pk, after.pk)
+        self.assertEqual(after.start_date, date.today())
+
+    def test_no_sharing_outside_scope(self):
+        self.assertIsNot(
+            cycle_history.for_profile(self.profile.id),
+            cycle_history.for_profile(self.profile.id),
+        )
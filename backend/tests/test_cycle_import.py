@@ -0,0 +1,150 @@
+"""
+Bulk cycle import: CSV / JSON parsing, tolerance dedupe, batched writes
+and the stats / cache refresh that bulk_create skips.
+"""
+import io
+import json
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api import cycle_import
+from api.models import BackgroundTask, CycleRecord
+
+
+class CycleImportTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user("import_user")
+        self.profile = self.user.profile
+        self.client.force_authenticate(self.user)
+
+    def starts(self):
+        return list(
+            CycleRecord.objects.filter(user=self.profile, predicted=False)
+            .order_by("start_date").values_list("start_date", flat=True)
+        )
+
+    def test_csv_with_loose_headers(self):
+        data = (
+            "﻿Start Date,End Date,Flow,Symptoms\n"
+            "2024-01-03,2024-01-07,heavy,cramps;bloating\n"
+            "2024-01-31,,2,\n"
+            "not a date,,,\n"
+            "2024-03-01,2024-02-20,,\n"
+        )
+        summary = cycle_import.import_cycles(self.profile, io.BytesIO(data.encode()))
+
+        self.assertEqual(summary["imported"], 2)
+        self.assertEqual(summary["invalid"], 2)
+        self.assertEqual([e["row"] for e in summary["errors"]], [3, 4])
+
+        first = CycleRecord.objects.get(user=self.profile, start_date=date(2024, 1, 3))
+        self.assertEqual(first.flow_intensity, 4)
+        self.assertEqual(first.symptoms, ["cramps", "bloating"])
+
+    def test_json_array_streams_across_chunks(self):
+        rows = [{"startDate": str(date(2015, 1, 1) + timedelta(days=28 * i))} for i in range(20)]
+        stream = io.BytesIO(json.dumps(rows).encode())
+        original = cycle_import._chunks
+        cycle_import._chunks = lambda s, size=64 * 1024: original(s, size=7)
+        try:
+            summary = cycle_import.import_cycles(self.profile, stream)
+        finally:
+            cycle_import._chunks = original
+
+        self.assertEqual(summary["imported"], 20)
+
+    def test_json_wrapper_and_json_lines(self):
+        wrapped = json.dumps({"version": 2, "cycles": [{"period_start": "2024-05-01"}]})
+        lines = '{"start": "2024-06-01"}\n{"start": "2024-07-01"}\n'
+
+        cycle_import.import_cycles(self.profile, io.BytesIO(wrapped.encode()))
+        cycle_import.import_cycles(self.profile, io.BytesIO(lines.encode()), fmt="json")
+
+        self.assertEqual(self.starts(), [date(2024, 5, 1), date(2024, 6, 1), date(2024, 7, 1)])
+
+    def test_dedupes_within_tolerance(self):
+        CycleRecord.objects.create(user=self.profile, start_date=date(2024, 1, 10))
+        data = "start_date\n2024-01-12\n2024-02-07\n2024-02-09\n2024-03-07\n"
+
+        summary = cycle_import.import_cycles(self.profile, io.BytesIO(data.encode()), tolerance=3)
+
+        self.assertEqual(summary["imported"], 2)
+        self.assertEqual(summary["duplicates"], 2)
+        self.assertEqual(self.starts(), [date(2024, 1, 10), date(2024, 2, 7), date(2024, 3, 7)])
+
+    @override_settings(PRECOMPUTE_ASYNC=True)
+    def test_endpoint_refreshes_stats_and_caches(self):
+        CycleRecord.objects.create(user=self.profile, start_date=date.today() - timedelta(days=600))
+        self.client.get("/api/cycle/predict/")
+        version = self.profile.data_version
+
+        last = date.today() - timedelta(days=5)
+        body = "\n".join(["start_date"] + [str(last - timedelta(days=28 * i)) for i in range(12)])
+        response = self.client.post("/api/cycle/import/", body, content_type="text/csv")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["imported"], 12)
+
+        self.profile.refresh_from_db()
+        self.assertGreater(self.profile.data_version, version)
+        self.assertEqual(self.profile.cycle_stats.cycle_count, 13)
+        self.assertEqual(self.profile.cycle_stats.last_start, last)
+        self.assertTrue(BackgroundTask.objects.filter(name="insight.precompute").exists())
+
+        predicted = self.client.get("/api/cycle/predict/").json()
+        self.assertEqual(predicted["next_period_date"], str(last + timedelta(days=28)))
+
+    def test_endpoint_multipart_upload(self):
+        upload = io.BytesIO(b'[{"start_date": "2024-01-01"}, {"start_date": "2024-01-29"}]')
+        upload.name = "export.json"
+        response = self.client.post("/api/cycle/import/", {"file": upload}, format="multipart")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(self.starts()), 2)
+
+    def test_endpoint_rejects_bad_json(self):
+        response = self.client.post(
+            "/api/cycle/import/", '[{"start_date": "2024-01-01"', content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.starts(), [])
+
+    def test_ten_year_history_is_fast(self):
+        rows = [
+            {"start_date": str(date(2014, 1, 1) + timedelta(days=28 * i)), "flow": 3}
+            for i in range(130)
+        ]
+        t0 = time.perf_counter()
+        response = self.client.post("/api/cycle/import/", rows, format="json")
+        elapsed = time.perf_counter() - t0
+
+        self.assertEqual(response.json()["imported"], 130)
+        self.assertLess(elapsed, 1.0)
+
+    def test_management_command_dry_run(self):
+        path = self._tmp("start_date\n2024-01-01\n2024-01-29\n")
+        out = io.StringIO()
+
+        call_command("import_cycles", "import_user", path, "--dry-run", stdout=out)
+        self.assertIn("Would import 2", out.getvalue())
+        self.assertEqual(self.starts(), [])
+
+        call_command("import_cycles", "import_user", path, stdout=out)
+        self.assertEqual(len(self.starts()), 2)
+
+    def _tmp(self, content):
+        import tempfile
+        handle = tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False)
+        handle.write(content)
+        handle.close()
+        self.addCleanup(lambda: __import__("os").unlink(handle.name))
+        return handle.name
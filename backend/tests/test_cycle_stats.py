@@ -0,0 +1,89 @@
+"""
+Incremental cycle statistics stay equal to a from-scratch recomputation
+through inserts (in and out of order), start-date edits and deletes.
+"""
+import random
+import statistics
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from api import cycle_stats
+from api.insights import get_cycle_irregularity
+from api.models import CycleRecord, CycleStats
+
+
+class CycleStatsTests(TestCase):
+
+    def setUp(self):
+        self.profile = User.objects.create_user("stats_user").profile
+
+    def assertMatchesHistory(self):
+        starts = sorted(
+            CycleRecord.objects.filter(user=self.profile, predicted=False)
+            .values_list("start_date", flat=True)
+        )
+        gaps = [(b - a).days for a, b in zip(starts, starts[1:])]
+        stats = CycleStats.objects.get(user=self.profile)
+
+        self.assertEqual(stats.cycle_count, len(starts))
+        self.assertEqual(stats.gap_count, len(gaps))
+        self.assertEqual(stats.last_start, starts[-1] if starts else None)
+        self.assertEqual(stats.recent_gaps, gaps[::-1][:cycle_stats.RECENT_GAPS])
+        if gaps:
+            self.assertAlmostEqual(stats.gap_mean, statistics.fmean(gaps), places=6)
+            self.assertAlmostEqual(stats.gap_std, statistics.pstdev(gaps), places=6)
+
+    def test_random_writes_match_recomputation(self):
+        rng = random.Random(7)
+        base = date(2020, 1, 1)
+        records = []
+
+        for _ in range(40):
+            day = base + timedelta(days=rng.randint(0, 1500))
+            records.append(CycleRecord.objects.create(user=self.profile, start_date=day))
+        self.assertMatchesHistory()
+
+        for record in rng.sample(records, 10):
+            record.start_date += timedelta(days=rng.randint(-20, 20))
+            record.save()
+        self.assertMatchesHistory()
+
+        for record in rng.sample(records, 15):
+            record.delete()
+        self.assertMatchesHistory()
+
+    def test_predicted_rows_are_ignored(self):
+        CycleRecord.objects.create(user=self.profile, start_date=date(2025, 1, 1))
+        CycleRecord.objects.create(user=self.profile, start_date=date(2025, 1, 29))
+        CycleRecord.objects.create(user=self.profile, start_date=date(2025, 2, 26), predicted=True)
+
+        stats = CycleStats.objects.get(user=self.profile)
+        self.assertEqual((stats.cycle_count, stats.recent_gaps), (2, [28]))
+
+    def test_irregularity_is_a_single_row_read(self):
+        for day in (date(2025, 1, 1), date(2025, 1, 29), date(2025, 3, 15)):
+            CycleRecord.objects.create(user=self.profile, start_date=day)
+
+        with self.assertNumQueries(1):
+            info = get_cycle_irregularity(self.profile.id)
+        self.assertEqual(info["lengths"], [28, 45])
+        self.assertTrue(info["irregular"])
+
+    def test_history_spread_does_not_flip_irregular(self):
+        for day in (date(2025, 1, 1), date(2025, 3, 2), date(2025, 3, 30), date(2025, 4, 27)):
+            CycleRecord.objects.create(user=self.profile, start_date=day)
+
+        info = get_cycle_irregularity(self.profile.id)
+        self.assertEqual(info["lengths"], [28, 28])
+        self.assertFalse(info["irregular"])
+        self.assertEqual(info["std_dev"], round(statistics.pstdev([60, 28, 28]), 1))
+
+    def test_rebuild_repairs_drift(self):
+        CycleRecord.objects.create(user=self.profile, start_date=date(2025, 1, 1))
+        CycleRecord.objects.create(user=self.profile, start_date=date(2025, 1, 30))
+        CycleStats.objects.filter(user=self.profile).update(gap_mean=99, gap_m2=5)
+
+        cycle_stats.rebuild(self.profile.id)
+        self.assertMatchesHistory()
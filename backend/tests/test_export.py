@@ -0,0 +1,105 @@
+"""
+Per-user data export: NDJSON / CSV / ZIP, streamed.
+"""
+import csv
+import io
+import json
+import zipfile
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api import export
+from api.models import CycleRecord, HealthMetric
+
+
+class ExportTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user("export_user")
+        self.profile = self.user.profile
+        self.profile.name = "Ada"
+        self.profile.save()
+        self.client.force_authenticate(self.user)
+
+        start = date(2024, 1, 1)
+        CycleRecord.objects.bulk_create([
+            CycleRecord(user=self.profile, start_date=start + timedelta(days=28 * i),
+                        symptoms=["cramps", "fatigue"])
+            for i in range(3)
+        ] + [CycleRecord(user=self.profile, start_date=start + timedelta(days=84), predicted=True)])
+        HealthMetric.objects.bulk_create([
+            HealthMetric(user=self.profile, date=start + timedelta(days=i), metric_type="mood", value=5 + i % 3)
+            for i in range(30)
+        ])
+
+        # Another user's rows never leak into the export
+        other = User.objects.create_user("export_other").profile
+        HealthMetric.objects.create(user=other, date=start, metric_type="mood", value=1)
+
+    def body(self, response):
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content)
+
+    def test_ndjson_tags_every_line(self):
+        response = self.client.get("/api/export/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertIn("attachment;", response["Content-Disposition"])
+
+        lines = [json.loads(line) for line in self.body(response).decode().splitlines()]
+        kinds = [line["type"] for line in lines]
+        self.assertEqual(kinds.count("profile"), 1)
+        self.assertEqual(kinds.count("cycles"), 3)      # predicted cycles left out
+        self.assertEqual(kinds.count("metrics"), 30)
+        self.assertEqual(lines[0]["name"], "Ada")
+        self.assertNotIn("data_version", lines[0])
+
+        cycle = next(line for line in lines if line["type"] == "cycles")
+        self.assertEqual(cycle["start_date"], "2024-01-01")
+        self.assertEqual(cycle["symptoms"], ["cramps", "fatigue"])
+
+    def test_csv_single_dataset(self):
+        response = self.client.get("/api/export/", {"type": "csv", "dataset": "metrics"})
+
+        self.assertEqual(response.status_code, 200)
+        rows = list(csv.reader(io.StringIO(self.body(response).decode())))
+        self.assertEqual(rows[0], export.fields(HealthMetric))
+        self.assertNotIn("user_id", rows[0])
+        self.assertEqual(len(rows), 31)
+
+    def test_csv_needs_dataset(self):
+        self.assertEqual(self.client.get("/api/export/", {"type": "csv"}).status_code, 400)
+        self.assertEqual(self.client.get("/api/export/", {"type": "xml"}).status_code, 400)
+
+    def test_zip_has_one_csv_per_dataset(self):
+        response = self.client.get("/api/export/", {"type": "zip"})
+
+        self.assertEqual(response.status_code, 200)
+        archive = zipfile.ZipFile(io.BytesIO(self.body(response)))
+        self.assertEqual(archive.namelist(), [f"{name}.csv" for name in export.DATASETS])
+        self.assertIsNone(archive.testzip())
+
+        cycles = list(csv.reader(io.StringIO(archive.read("cycles.csv").decode())))
+        self.assertEqual(len(cycles), 4)
+        self.assertEqual(json.loads(cycles[1][cycles[0].index("symptoms")]), ["cramps", "fatigue"])
+
+    def test_large_export_streams_in_chunks(self):
+        HealthMetric.objects.bulk_create([
+            HealthMetric(user=self.profile, date=date(2010, 1, 1) + timedelta(days=i),
+                         metric_type="weight", value=60 + i % 10)
+            for i in range(3 * export.CHUNK_SIZE)
+        ])
+
+        chunks = list(export.stream(self.profile, "csv", "metrics"))
+        self.assertGreaterEqual(len(chunks), 3)
+        self.assertEqual(sum(c.count(b"\n") for c in chunks), 3 * export.CHUNK_SIZE + 31)
+
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(export.stream(self.profile, "zip"))))
+        self.assertEqual(archive.read("metrics.csv").count(b"\n"), 3 * export.CHUNK_SIZE + 31)
@@ -0,0 +1,77 @@
+"""
+Forecasting engine: full-history fit, outlier handling, windows and the
+?cycles=N API.
+"""
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from api.forecasting import LUTEAL_DAYS, _compute, fit
+from api.models import CycleRecord
+
+
+def _starts(gaps, first=date(2024, 1, 1)):
+    out = [first]
+    for g in gaps:
+        out.append(out[-1] + timedelta(days=g))
+    return out
+
+
+class FitTests(SimpleTestCase):
+
+    def test_needs_two_cycles(self):
+        self.assertIsNone(fit([date(2024, 1, 1)]))
+
+    def test_missed_log_is_ignored(self):
+        mean, sd, used = fit(_starts([28, 29, 27, 84, 28, 28, 29]))
+        self.assertAlmostEqual(mean, 28.2, delta=0.5)
+        self.assertLess(sd, 1.5)
+        self.assertEqual(used, 6)
+
+    def test_recent_cycles_weigh_more(self):
+        mean, _, _ = fit(_starts([26] * 12 + [32] * 6))
+        self.assertGreater(mean, 29)
+
+    def test_windows_and_widening_intervals(self):
+        starts = _starts([28, 30, 27, 29, 28])
+        result = _compute(starts, 6)
+        fc = result["forecasts"]
+
+        self.assertEqual(len(fc), 6)
+        for this, nxt in zip(fc, fc[1:]):
+            self.assertEqual(this["ovulation_date"], nxt["start_date"] - timedelta(days=LUTEAL_DAYS))
+            self.assertLess(this["fertile_start"], this["ovulation_date"])
+            self.assertLessEqual(
+                (this["latest"] - this["earliest"]).days,
+                (nxt["latest"] - nxt["earliest"]).days,
+            )
+        self.assertEqual(
+            result["current_cycle"]["ovulation_date"],
+            fc[0]["start_date"] - timedelta(days=LUTEAL_DAYS),
+        )
+
+
+class PredictApiTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user("forecast_user")
+        self.client.force_authenticate(self.user)
+        for start in _starts([28] * 10, date.today() - timedelta(days=300)):
+            CycleRecord.objects.create(user=self.user.profile, start_date=start)
+
+    def test_next_n_cycles(self):
+        data = self.client.get("/api/cycle/predict/?cycles=12").json()
+        self.assertEqual(len(data["cycles"]), 12)
+        self.assertEqual(data["average_cycle_length"], 28.0)
+        self.assertEqual(data["next_period_date"], data["cycles"][0]["start_date"])
+
+    def test_default_is_one_cycle_and_cached(self):
+        self.client.get("/api/cycle/predict/?cycles=12")
+        with self.assertNumQueries(1):
+            data = self.client.get("/api/cycle/predict/").json()
+        self.assertEqual(len(data["cycles"]), 1)
@@ -0,0 +1,171 @@
+"""
+Apple Health / Google Fit export import: streaming parse, per-day
+aggregation and chunked upserts.
+"""
+import io
+import json
+import tracemalloc
+import zipfile
+from datetime import date, datetime, timedelta, timezone
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api import health_import
+from api.models import HealthMetric
+
+
+APPLE_HEADER = """<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE HealthData [
+<!ELEMENT HealthData (ExportDate,Me,(Record|Workout)*)>
+<!ATTLIST HealthData locale CDATA #REQUIRED>
+]>
+<HealthData locale="en_US">
+ <ExportDate value="2024-02-01 09:00:00 +0000"/>
+ <Me HKCharacteristicTypeIdentifierBiologicalSex="HKBiologicalSexFemale"/>
+"""
+
+
+def record(kind, start, end=None, value="", unit=""):
+    return (
+        f' <Record type="{kind}" sourceName="Watch" unit="{unit}" value="{value}" '
+        f'startDate="{start}" endDate="{end or start}">\n'
+        f'  <MetadataEntry key="HKTimeZone" value="Europe/London"/>\n </Record>\n'
+    )
+
+
+SLEEP = "HKCategoryTypeIdentifierSleepAnalysis"
+APPLE_EXPORT = APPLE_HEADER + "".join([
+    record("HKQuantityTypeIdentifierBodyMass", "2024-01-10 07:00:00 +0000", value="70.5", unit="kg"),
+    record("HKQuantityTypeIdentifierBodyMass", "2024-01-10 21:00:00 +0000", value="154", unit="lb"),
+    record("HKQuantityTypeIdentifierAppleExerciseTime", "2024-01-10 08:00:00 +0000", value="12", unit="min"),
+    record("HKQuantityTypeIdentifierAppleExerciseTime", "2024-01-10 18:00:00 +0000", value="20", unit="min"),
+    # Phone and watch overlap: 23:00–06:30 asleep in total
+    record(SLEEP, "2024-01-10 23:00:00 +0000", "2024-01-11 05:00:00 +0000", "HKCategoryValueSleepAnalysisAsleepCore"),
+    record(SLEEP, "2024-01-11 04:00:00 +0000", "2024-01-11 06:30:00 +0000", "HKCategoryValueSleepAnalysisAsleepREM"),
+    record(SLEEP, "2024-01-10 22:00:00 +0000", "2024-01-11 07:00:00 +0000", "HKCategoryValueSleepAnalysisInBed"),
+    record("HKQuantityTypeIdentifierStepCount", "2024-01-10 08:00:00 +0000", value="5000", unit="count"),
+]) + "</HealthData>\n"
+
+
+def nanos(dt):
+    return str(int(dt.timestamp() * 1e9))
+
+
+class HealthImportTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user("health_import_user")
+        self.profile = self.user.profile
+        self.client.force_authenticate(self.user)
+
+    def metrics(self):
+        return {
+            (m.date, m.metric_type): m.value
+            for m in HealthMetric.objects.filter(user=self.profile)
+        }
+
+    def test_apple_xml(self):
+        summary = health_import.import_health_export(self.profile, io.BytesIO(APPLE_EXPORT.encode()), "apple")
+
+        self.assertEqual(summary["written"], 3)
+        self.assertEqual(self.metrics(), {
+            (date(2024, 1, 10), "weight"): round(154 * health_import.LB_TO_KG, 2),
+            (date(2024, 1, 10), "exercise_minutes"): 32,
+            (date(2024, 1, 11), "sleep"): 7.5,
+        })
+
+    def test_apple_zip_upload(self):
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("apple_health_export/export.xml", APPLE_EXPORT)
+        archive.seek(0)
+        archive.name = "export.zip"
+
+        response = self.client.post("/api/health/import/", {"file": archive}, format="multipart")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["metrics"], {"weight": 1, "exercise_minutes": 1, "sleep": 1})
+
+    def test_keep_existing(self):
+        HealthMetric.objects.create(user=self.profile, date=date(2024, 1, 10), metric_type="weight", value=68)
+        health_import.import_health_export(
+            self.profile, io.BytesIO(APPLE_EXPORT.encode()), "apple", overwrite=False
+        )
+        self.assertEqual(self.metrics()[(date(2024, 1, 10), "weight")], 68)
+
+    def test_google_fit_json_streams_in_small_chunks(self):
+        noon = datetime(2024, 3, 5, 12, tzinfo=timezone.utc)
+        points = [
+            {"dataTypeName": "com.google.weight", "startTimeNanos": nanos(noon),
+             "endTimeNanos": nanos(noon), "fitValue": [{"value": {"fpVal": 62.4}}]},
+            {"dataTypeName": "com.google.active_minutes", "startTimeNanos": nanos(noon),
+             "endTimeNanos": nanos(noon), "fitValue": [{"value": {"intVal": 15}}]},
+            {"dataTypeName": "com.google.active_minutes", "startTimeNanos": nanos(noon + timedelta(hours=2)),
+             "endTimeNanos": nanos(noon), "fitValue": [{"value": {"intVal": 10}}]},
+        ]
+        payload = json.dumps({"Data Source": "derived:com.google.weight", "Data Points": points})
+
+        original = health_import._iter_json_array
+        health_import._iter_json_array = lambda s, key: original(s, key, size=11)
+        try:
+            summary = health_import.import_health_export(self.profile, io.BytesIO(payload.encode()), "google_fit")
+        finally:
+            health_import._iter_json_array = original
+
+        self.assertEqual(summary["readings"], 3)
+        values = sorted(self.metrics().values())
+        self.assertEqual(values, [25, 62.4])
+
+    def test_rejects_unknown_source(self):
+        with self.assertRaises(health_import.HealthImportError):
+            health_import.import_health_export(self.profile, io.BytesIO(b""), "fitbit")
+
+    def test_memory_stays_flat(self):
+        """Ten times the records, same number of days → same peak memory."""
+
+        class Export(io.RawIOBase):
+            def __init__(self, repeats):
+                self.parts = self._parts(repeats)
+                self.pending = b""
+
+            def _parts(self, repeats):
+                yield APPLE_HEADER.encode()
+                start = datetime(2023, 1, 1, 8, tzinfo=timezone.utc)
+                for i in range(repeats):
+                    day = start + timedelta(days=i % 60, minutes=i // 60)
+                    yield record(
+                        "HKQuantityTypeIdentifierAppleExerciseTime",
+                        day.strftime("%Y-%m-%d %H:%M:%S +0000"), value="1", unit="min"
+                    ).encode()
+                yield b"</HealthData>\n"
+
+            def readable(self):
+                return True
+
+            def readinto(self, buffer):
+                while len(self.pending) < len(buffer):
+                    chunk = next(self.parts, None)
+                    if chunk is None:
+                        break
+                    self.pending += chunk
+                n = min(len(buffer), len(self.pending))
+                buffer[:n] = self.pending[:n]
+                self.pending = self.pending[n:]
+                return n
+
+        def peak(repeats):
+            buckets = health_import.DayBuckets()
+            tracemalloc.start()
+            health_import._read_apple(io.BufferedReader(Export(repeats)), buckets)
+            _, high = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self.assertEqual(len(buckets.sums), 60)
+            return high
+
+        small, large = peak(1000), peak(10000)
+        self.assertLess(large, small * 1.5)
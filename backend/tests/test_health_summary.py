@@ -0,0 +1,85 @@
+"""
+Health summary: every metric type in one windowed query.
+"""
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.models import HealthMetric
+
+
+class HealthSummaryTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user("summary_user")
+        self.profile = self.user.profile
+        self.client.force_authenticate(self.user)
+
+        # {metric: {days ago: value}}; the window's halves are 7-4 and 3-0 days ago
+        series = {
+            "weight": {6: 71.0, 5: 70.0, 2: 69.0, 1: 68.0},
+            "sleep": {5: 6.0, 4: 6.5, 1: 7.5, 0: 8.0},
+            "exercise_minutes": {0: 30.0},
+        }
+        for metric, values in series.items():
+            self.log(metric, values)
+        # Outside the 7-day window
+        self.log("weight", {20: 90.0})
+
+    def log(self, metric, values):
+        for days_ago, value in values.items():
+            HealthMetric.objects.create(
+                user=self.profile, metric_type=metric, value=value,
+                date=date.today() - timedelta(days=days_ago)
+            )
+
+    def get(self):
+        return self.client.get("/api/health/summary/").json()
+
+    def test_summary_values(self):
+        data = self.get()
+
+        self.assertEqual(set(data), {"weight", "sleep", "exercise_minutes"})
+        self.assertEqual(data["weight"], {"average": 69.5, "latest": 68.0, "trend": "improving"})
+        self.assertEqual(data["sleep"], {"average": 7.0, "latest": 8.0, "trend": "improving"})
+        self.assertEqual(data["exercise_minutes"], {"average": 30.0, "latest": 30.0, "trend": "stable"})
+
+    def test_worsening_follows_metric_direction(self):
+        self.log("stress", {6: 3, 5: 4, 2: 7, 0: 8})
+        self.assertEqual(self.get()["stress"]["trend"], "worsening")
+
+    def test_single_outlier_does_not_flip_trend(self):
+        self.log("stress", {6: 4, 5: 4, 4: 4, 3: 4, 1: 9})
+        self.assertEqual(self.get()["stress"]["trend"], "stable")
+
+    def test_needs_readings_in_both_halves(self):
+        self.log("mood", {2: 3, 1: 5, 0: 7})
+        self.assertEqual(self.get()["mood"]["trend"], "stable")
+
+    def test_includes_analytics_only_when_cached(self):
+        self.assertNotIn("analytics", self.get()["weight"])
+
+    def test_cached_analytics_cost_no_query(self):
+        self.client.get("/api/health/trends/?metric_type=weight")    # warms analytics
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.get()
+
+        self.assertEqual(len([q for q in ctx.captured_queries if "api_healthmetric" in q["sql"]]), 1)
+        self.assertEqual(data["weight"]["analytics"]["count"], 5)
+        self.assertEqual(data["weight"]["trend"], "improving")
+
+    def test_one_metric_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get("/api/health/summary/")
+
+        metric_queries = [q for q in ctx.captured_queries if "api_healthmetric" in q["sql"]]
+        self.assertEqual(len(metric_queries), 1)
+        # Cold path: profile lookup + the window query, nothing else
+        self.assertEqual(len(ctx.captured_queries), 2)
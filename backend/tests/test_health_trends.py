@@ -0,0 +1,139 @@
+"""
+Health trends: columnar payload, calendar bucketing and LTTB downsampling.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api import metric_rollups
+from api.models import HealthMetric
+from api.trends import lttb
+
+
+class HealthTrendsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user("trends_user")
+        self.profile = self.user.profile
+        self.client.force_authenticate(self.user)
+
+        self.today = date.today()
+        HealthMetric.objects.bulk_create([
+            HealthMetric(
+                user=self.profile, metric_type="weight",
+                date=self.today - timedelta(days=i), value=70 + (i % 10) / 10
+            )
+            for i in range(730)
+        ])
+        # bulk_create skips the rollup signals
+        metric_rollups.rebuild(self.profile.id)
+
+    def get(self, **params):
+        query = "&".join(f"{k}={v}" for k, v in {"metric_type": "weight", **params}.items())
+        return self.client.get(f"/api/health/trends/?{query}")
+
+    def test_short_window_is_daily_and_columnar(self):
+        data = self.get(days=6).json()
+
+        self.assertEqual(data["resolution"], "daily")
+        self.assertEqual(len(data["dates"]), 7)
+        self.assertEqual(len(data["values"]), 7)
+        self.assertEqual(data["dates"][-1], str(self.today))
+        self.assertEqual(data["latest"], 70.0)
+
+    def test_weekly_and_monthly_buckets(self):
+        weekly = self.get(days=700, resolution="weekly").json()
+        monthly = self.get(days=700, resolution="monthly").json()
+
+        for d in weekly["dates"]:
+            self.assertEqual(date.fromisoformat(d).weekday(), 0)
+        for d in monthly["dates"]:
+            self.assertEqual(date.fromisoformat(d).day, 1)
+        self.assertTrue(100 <= len(weekly["dates"]) <= 102)
+        self.assertTrue(23 <= len(monthly["dates"]) <= 25)
+        self.assertEqual(weekly["count"], 701)
+
+    def test_auto_caps_points(self):
+        data = self.get(days=729, points=150).json()
+
+        self.assertEqual(data["resolution"], "lttb")
+        self.assertEqual(len(data["values"]), 150)
+        self.assertEqual(data["dates"][0], str(self.today - timedelta(days=729)))
+        self.assertEqual(data["dates"][-1], str(self.today))
+
+    def test_bad_resolution(self):
+        self.assertEqual(self.get(resolution="hourly").status_code, 400)
+
+    def test_days_is_clamped(self):
+        huge = self.get(days=99999999, resolution="daily", points=1000)
+        self.assertEqual(huge.status_code, 200)
+        self.assertEqual(huge.json()["count"], 730)
+
+        for days in (0, -5):
+            response = self.get(days=days, resolution="daily")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["dates"], [str(self.today - timedelta(days=1)), str(self.today)])
+
+        multi = self.client.get("/api/health/trends/?metric_type=weight,mood&days=99999999")
+        self.assertEqual(multi.status_code, 200)
+        self.assertEqual(multi.json()["days"], 3650)
+
+    def test_lttb_keeps_spike(self):
+        y = np.zeros(1000)
+        y[437] = 50
+        keep = lttb(np.arange(1000), y, 50)
+
+        self.assertEqual(len(keep), 50)
+        self.assertIn(437, keep)
+        self.assertTrue(np.all(np.diff(keep) > 0))
+
+
+class MultiMetricTrendsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user("multi_trends_user")
+        self.profile = self.user.profile
+        self.client.force_authenticate(self.user)
+
+        today = date.today()
+        for metric, base in (("weight", 70), ("sleep", 7), ("mood", 5)):
+            for i in range(20):
+                HealthMetric.objects.create(
+                    user=self.profile, metric_type=metric,
+                    date=today - timedelta(days=i), value=base + i % 3
+                )
+
+    def test_list_in_one_query(self):
+        self.client.get("/api/health/trends/?metric_type=weight")   # warms analytics
+
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.client.get("/api/health/trends/?metric_type=weight,sleep&days=10").json()
+
+        self.assertEqual(len([q for q in ctx.captured_queries if "api_healthmetric" in q["sql"]]), 1)
+        self.assertEqual(data["metric_types"], ["weight", "sleep"])
+        self.assertEqual(set(data["series"]), {"weight", "sleep"})
+        self.assertEqual(len(data["series"]["sleep"]["values"]), 11)
+        self.assertEqual(data["series"]["weight"]["min"], 70)
+        self.assertIn("analytics", data["series"]["sleep"])
+
+    def test_all_and_weekly(self):
+        data = self.client.get("/api/health/trends/?metric_type=all&days=30&resolution=weekly").json()
+
+        self.assertEqual(len(data["series"]), len(HealthMetric.METRIC_TYPES))
+        self.assertEqual(data["series"]["mood"]["count"], 20)
+        self.assertEqual(data["series"]["energy"]["count"], 0)
+        self.assertEqual(data["series"]["energy"]["dates"], [])
+
+    def test_unknown_type(self):
+        response = self.client.get("/api/health/trends/?metric_type=weight,steps")
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,66 @@
+"""
+Worker boot guard: importing the Django app (settings, models, URLconf
+and every view module) must not pull in the LLM SDK or reportlab, and
+must stay under a time budget. Measured in a fresh interpreter with
+`python -X importtime`, the same way a gunicorn worker boots.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+from django.conf import settings
+
+from tests.bench import BENCH_SCALE
+
+
+pytestmark = pytest.mark.benchmark
+
+BOOT = (
+    "import django; django.setup(); "
+    "import ovasense_backend.wsgi, ovasense_backend.urls"
+)
+
+# Heavy subsystems that must only load on first use
+LAZY_PACKAGES = ("groq", "reportlab", "httpx")
+
+# Budget for the app's own modules plus Django/DRF (cumulative, ms)
+BOOT_BUDGET_MS = 1500
+
+
+def import_profile():
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE="ovasense_backend.settings")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", BOOT],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [p.strip() for p in line[len("import time:"):].split("|")]
+        if not parts[0].isdigit():
+            continue  # header row
+        modules[parts[2]] = (int(parts[0]), int(parts[1]))
+    return modules
+
+
+@pytest.fixture(scope="module")
+def profile():
+    return import_profile()
+
+
+def test_heavy_sdks_are_not_imported_at_boot(profile):
+    loaded = sorted(
+        name for name in profile
+        if name.split(".")[0] in LAZY_PACKAGES
+    )
+    assert not loaded, f"Imported at worker boot: {loaded}"
+
+
+def test_boot_import_time_budget(profile):
+    total_ms = sum(self_us for self_us, _ in profile.values()) / 1000
+    limit = BOOT_BUDGET_MS * BENCH_SCALE
+    print(f"\n⏱️ worker boot imports: {total_ms:.0f} ms (limit {limit:.0f} ms)")
+    assert total_ms <= limit
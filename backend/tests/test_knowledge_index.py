@@ -0,0 +1,89 @@
+"""
+BM25 knowledge-base retrieval and its injection into Baymax prompts.
+"""
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from api import knowledge_index, llm, voice_pipeline
+from api.models import KnowledgeArticle
+
+
+MEALS = """# PCOS-Friendly Meal Planning
+
+## Insulin-Resistant
+- Breakfast: besan chilla with curd
+- Swap white rice for jowar or bajra roti to steady blood sugar
+
+## Lean PCOS
+- Breakfast: poha with peanuts and sprouts
+"""
+
+SLEEP = """# Sleep and Hormones
+
+Poor sleep raises cortisol and worsens sugar cravings the next day.
+Aim for 7-9 hours and a fixed bedtime.
+"""
+
+
+class KnowledgeIndexTests(TestCase):
+
+    def setUp(self):
+        knowledge_index._index = None
+        KnowledgeArticle.objects.create(slug="meals", title="Meal Planning", content=MEALS, category="diet")
+        KnowledgeArticle.objects.create(slug="sleep", title="Sleep and Hormones", content=SLEEP, category="lifestyle")
+        KnowledgeArticle.objects.create(slug="draft", title="Draft", content="breakfast breakfast", category="diet",
+                                        published=False)
+
+    def test_passages_split_at_headings(self):
+        parts = list(knowledge_index.passages("Meal Planning", MEALS))
+        self.assertEqual([h for h, _ in parts], ["Insulin-Resistant", "Lean PCOS"])
+        self.assertTrue(parts[0][1].startswith("- Breakfast: besan chilla"))
+
+    def test_long_sections_are_capped(self):
+        text = " ".join(f"word{i}" for i in range(knowledge_index.PASSAGE_WORDS * 2 + 10))
+        lengths = [len(t.split()) for _, t in knowledge_index.passages("T", text)]
+        self.assertEqual(lengths, [knowledge_index.PASSAGE_WORDS, knowledge_index.PASSAGE_WORDS, 10])
+
+    def test_retrieves_best_passage_first(self):
+        hits = knowledge_index.retrieve("What breakfast helps insulin resistance?")
+
+        self.assertEqual((hits[0]["title"], hits[0]["heading"]), ("Meal Planning", "Insulin-Resistant"))
+        self.assertNotIn("Draft", {h["title"] for h in hits})
+        self.assertEqual(knowledge_index.retrieve("hello there"), [])
+
+    def test_stemming(self):
+        hits = knowledge_index.retrieve("craving sugar at night")
+        self.assertEqual(hits[0]["title"], "Sleep and Hormones")
+
+    def test_rebuilds_after_article_changes(self):
+        self.assertEqual(knowledge_index.retrieve("ashwagandha"), [])
+        KnowledgeArticle.objects.create(
+            slug="stress", title="Stress", category="mental_health",
+            content="Ashwagandha and daily walks may help with stress.",
+        )
+        self.assertEqual(knowledge_index.retrieve("ashwagandha")[0]["title"], "Stress")
+
+    def test_context_respects_token_budget(self):
+        context = knowledge_index.context_for("breakfast for insulin resistance", max_tokens=40)
+
+        self.assertTrue(context.startswith("[Meal Planning › Insulin-Resistant]"))
+        self.assertLessEqual(len(context.split()), 40 * knowledge_index.WORDS_PER_TOKEN)
+
+    @override_settings(GROQ_MODEL="test-model")
+    def test_passages_injected_into_baymax_prompt(self):
+        with mock.patch.object(llm, "is_configured", return_value=True), \
+             mock.patch.object(llm, "chat_completion", return_value="Try besan chilla!") as chat:
+            result = voice_pipeline.get_baymax_response("What breakfast helps with insulin resistance?", extract=False)
+
+        self.assertEqual(result["response_text"], "Try besan chilla!")
+        system = chat.call_args.kwargs["messages"][0]["content"]
+        self.assertIn("OVASENSE ARTICLES", system)
+        self.assertIn("besan chilla", system)
+
+    def test_no_match_leaves_prompt_alone(self):
+        with mock.patch.object(llm, "is_configured", return_value=True), \
+             mock.patch.object(llm, "chat_completion", return_value="Hi!") as chat:
+            voice_pipeline.get_baymax_response("Hello Baymax", extract=False)
+
+        self.assertNotIn("OVASENSE ARTICLES", chat.call_args.kwargs["messages"][0]["content"])
@@ -0,0 +1,76 @@
+"""
+Record / replay behaviour of the LLM gateway.
+"""
+from types import SimpleNamespace
+
+import pytest
+from django.test import override_settings
+
+from api import llm
+
+
+def fake_completion(content, prompt_tokens=12, completion_tokens=7):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens),
+    )
+
+
+class FakeClient:
+    def __init__(self, content="live answer"):
+        self.calls = 0
+        self.content = content
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls += 1
+        return fake_completion(self.content)
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    client = FakeClient()
+    monkeypatch.setattr(llm, "get_client", lambda: client)
+    return client
+
+
+MESSAGES = [{"role": "user", "content": "Explain WHY this PCOS phenotype was predicted."}]
+
+
+def test_key_is_stable_and_parameter_sensitive():
+    a = llm.cassette_key("m", MESSAGES, {"temperature": 0, "max_tokens": 300})
+    b = llm.cassette_key("m", MESSAGES, {"max_tokens": 300, "temperature": 0})
+    c = llm.cassette_key("m", MESSAGES, {"temperature": 0.3, "max_tokens": 300})
+
+    assert a == b
+    assert a != c
+
+
+def test_record_then_replay_round_trip(tmp_path, fake_client):
+    with override_settings(LLM_CASSETTE_MODE="record", LLM_CASSETTE_DIR=tmp_path):
+        assert llm.chat_completion("classify", MESSAGES, temperature=0) == "live answer"
+
+    assert fake_client.calls == 1
+    assert len(list((tmp_path / "classify").glob("*.json"))) == 1
+
+    fake_client.content = "should not be used"
+    with override_settings(LLM_CASSETTE_MODE="replay", LLM_CASSETTE_DIR=tmp_path):
+        assert llm.chat_completion("classify", MESSAGES, temperature=0) == "live answer"
+
+    assert fake_client.calls == 1
+
+
+def test_replay_miss_raises(tmp_path, fake_client):
+    with override_settings(LLM_CASSETTE_MODE="replay", LLM_CASSETTE_DIR=tmp_path):
+        with pytest.raises(llm.CassetteMissing):
+            llm.chat_completion("insight", MESSAGES)
+
+    assert fake_client.calls == 0
+
+
+def test_auto_records_once(tmp_path, fake_client):
+    with override_settings(LLM_CASSETTE_MODE="auto", LLM_CASSETTE_DIR=tmp_path):
+        llm.chat_completion("chat", MESSAGES)
+        llm.chat_completion("chat", MESSAGES)
+
+    assert fake_client.calls == 1
@@ -0,0 +1,93 @@
+"""
+Metric analytics: regression trend, robust anomalies, rolling means and
+per-phase baselines.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api import metric_analytics
+from api.models import CycleRecord, HealthMetric
+
+
+class MetricAnalyticsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("analytics_user")
+        self.profile = self.user.profile
+        self.today = date.today()
+
+    def series(self, metric, values):
+        HealthMetric.objects.bulk_create([
+            HealthMetric(user=self.profile, metric_type=metric, value=v,
+                         date=self.today - timedelta(days=len(values) - 1 - i))
+            for i, v in enumerate(values)
+        ])
+        self.profile.bump_data_version()
+
+    def test_one_noisy_reading_does_not_flip_trend(self):
+        # Stress steadily falling, then one bad day at the end
+        self.series("stress", [8, 8, 7, 7, 6, 6, 5, 5, 4, 4, 9])
+        stress = metric_analytics.analyze(self.profile)["stress"]
+
+        self.assertEqual(stress["direction"], "falling")
+        self.assertEqual(stress["trend"], "improving")
+        self.assertEqual([a["value"] for a in stress["anomalies"]], [9.0])
+
+    def test_flat_noise_is_stable(self):
+        self.series("mood", [6, 5, 6, 7, 6, 5, 6, 7, 6, 5, 6, 7, 6, 5])
+        self.assertEqual(metric_analytics.analyze(self.profile)["mood"]["trend"], "stable")
+
+    def test_phase_baselines(self):
+        start = self.today - timedelta(days=27)
+        CycleRecord.objects.create(user=self.profile, start_date=start)
+        # Low energy on period days, higher afterwards
+        self.series("energy", [3] * 5 + [7] * 23)
+
+        baselines = metric_analytics.analyze(self.profile)["energy"]["phase_baselines"]
+        self.assertEqual(baselines["Menstrual"], {"mean": 3.0, "count": 5})
+        self.assertEqual(baselines["Follicular"]["mean"], 7.0)
+        self.assertEqual(sum(b["count"] for b in baselines.values()), 28)
+
+    def test_phase_codes_match_cycle_history(self):
+        start = date(2024, 1, 1).toordinal()
+        days = np.arange(start - 1, start + 50)
+        codes = metric_analytics.phase_codes(days, [start])
+
+        self.assertEqual(codes[0], -1)                      # before first cycle
+        self.assertEqual(codes[5], 0)                       # day 5
+        self.assertEqual(codes[6], 1)                       # day 6
+        self.assertEqual(codes[15], 2)                      # day 15
+        self.assertEqual(codes[17], 3)                      # day 17
+        self.assertEqual(codes[-1], -1)                     # day 50
+
+    def test_rolling_mean_uses_calendar_days(self):
+        days = [1, 2, 3, 10]
+        result = metric_analytics.rolling_mean(days, [1, 2, 3, 10], window=7)
+        np.testing.assert_allclose(result, [1, 1.5, 2, 10])
+
+    def test_cached_until_next_write(self):
+        self.series("sleep", [7, 7.5, 8, 6])
+        metric_analytics.analyze(self.profile)
+        with self.assertNumQueries(0):
+            metric_analytics.analyze(self.profile)
+
+        HealthMetric.objects.create(user=self.profile, metric_type="sleep", value=9,
+                                    date=self.today - timedelta(days=10))
+        self.profile.refresh_from_db()
+        self.assertEqual(metric_analytics.analyze(self.profile)["sleep"]["count"], 5)
+
+    def test_trends_endpoint_exposes_analytics(self):
+        self.series("weight", [72, 71.5, 71, 70.6, 70.1, 69.8])
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        data = client.get("/api/health/trends/?metric_type=weight&days=10&resolution=daily").json()
+        self.assertEqual(len(data["rolling_mean"]), len(data["values"]))
+        self.assertEqual(data["analytics"]["trend"], "improving")
+        self.assertLess(data["analytics"]["slope_per_week"], 0)
@@ -0,0 +1,102 @@
+"""
+Bulk metric upsert: vectorized validation, in-batch dedupe, per-row status.
+"""
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import HealthMetric
+
+
+class BulkMetricTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user("bulk_user")
+        self.profile = self.user.profile
+        self.client.force_authenticate(self.user)
+        self.today = date.today()
+
+    def post(self, metrics):
+        return self.client.post("/api/health/metrics/bulk/", {"metrics": metrics}, format="json")
+
+    def test_status_per_row(self):
+        HealthMetric.objects.create(user=self.profile, date=self.today, metric_type="sleep", value=6)
+        tomorrow = self.today + timedelta(days=1)
+
+        data = self.post([
+            {"date": str(self.today), "metric_type": "sleep", "value": 7.5},
+            {"date": str(self.today), "metric_type": "mood", "value": 4},
+            {"date": str(self.today), "metric_type": "mood", "value": 6},
+            {"date": "yesterday", "metric_type": "mood", "value": 6},
+            {"date": str(self.today), "metric_type": "steps", "value": 9000},
+            {"date": str(self.today), "metric_type": "stress", "value": 42},
+            {"date": str(tomorrow), "metric_type": "weight", "value": 60},
+            {"date": str(self.today), "metric_type": "energy", "value": "high"},
+        ]).json()
+
+        self.assertEqual(data["status"], "usc" + "xxxxx")
+        self.assertEqual((data["created"], data["updated"], data["superseded"], data["rejected"]), (1, 1, 1, 5))
+        self.assertEqual(data["errors"], {
+            "3": "Invalid date",
+            "4": "Unknown metric_type",
+            "5": "Value out of range",
+            "6": "Date is in the future",
+            "7": "Value must be a number",
+        })
+
+        values = dict(HealthMetric.objects.filter(user=self.profile).values_list("metric_type", "value"))
+        self.assertEqual(values, {"sleep": 7.5, "mood": 6})
+
+    def test_malformed_cells_are_row_errors(self):
+        response = self.post([
+            {"date": str(self.today), "metric_type": "mood", "value": [1]},
+            {"date": [1, 2], "metric_type": "mood", "value": 5},
+            {"date": {"d": 1}, "metric_type": "mood", "value": {"v": 2}},
+            {"date": 19000, "metric_type": "mood", "value": 5},
+            {"date": True, "metric_type": "mood", "value": 5},
+            {"date": str(self.today), "metric_type": "mood", "value": True},
+            {"date": str(self.today), "metric_type": "mood", "value": False},
+            {"date": str(self.today), "metric_type": "energy", "value": 6},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["status"], "xxxxxxxc")
+        self.assertEqual(data["errors"], {
+            "0": "Value must be a number",
+            "1": "Invalid date",
+            "2": "Invalid date",
+            "3": "Invalid date",
+            "4": "Invalid date",
+            "5": "Value must be a number",
+            "6": "Value must be a number",
+        })
+
+    def test_invalidates_summary(self):
+        self.assertEqual(self.client.get("/api/health/summary/").json(), {})
+        self.post([{"date": str(self.today), "metric_type": "weight", "value": 61}])
+        self.assertEqual(self.client.get("/api/health/summary/").json()["weight"]["latest"], 61)
+
+    def test_thousands_of_rows(self):
+        metrics = [
+            {"date": str(self.today - timedelta(days=i)), "metric_type": t, "value": 5}
+            for i in range(1000) for t in ("mood", "energy", "stress")
+        ]
+        t0 = time.perf_counter()
+        first = self.post(metrics).json()
+        second = self.post(metrics).json()
+        elapsed = time.perf_counter() - t0
+
+        self.assertEqual(first["created"], 3000)
+        self.assertEqual(second["updated"], 3000)
+        self.assertEqual(HealthMetric.objects.filter(user=self.profile).count(), 3000)
+        self.assertLess(elapsed, 5)
+
+    def test_rejects_non_list(self):
+        self.assertEqual(self.post("nope").status_code, 400)
@@ -0,0 +1,89 @@
+"""
+Weekly metric rollups: kept current by writes, rebuilt from scratch,
+and combined with raw edge days for arbitrary windows.
+"""
+import io
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from api import metric_rollups
+from api.metric_ingest import upsert_metrics
+from api.models import HealthMetric, HealthMetricRollup
+
+
+MONDAY = date(2024, 1, 1)
+
+
+class MetricRollupTests(TestCase):
+
+    def setUp(self):
+        self.profile = User.objects.create_user("rollup_user").profile
+
+    def log(self, day, value, metric="mood"):
+        return HealthMetric.objects.create(user=self.profile, date=day, metric_type=metric, value=value)
+
+    def rollup(self, week=MONDAY, metric="mood"):
+        return HealthMetricRollup.objects.get(user=self.profile, metric_type=metric, week_start=week)
+
+    def test_writes_keep_week_current(self):
+        self.log(MONDAY + timedelta(days=2), 6)
+        late = self.log(MONDAY + timedelta(days=5), 2)
+        self.log(MONDAY, 8)
+
+        r = self.rollup()
+        self.assertEqual((r.count, r.total, r.min_value, r.max_value), (3, 16, 2, 8))
+        self.assertEqual((r.first_date, r.first_value), (MONDAY, 8))
+        self.assertEqual((r.last_date, r.last_value), (MONDAY + timedelta(days=5), 2))
+
+        # Moving a reading to the next week updates both buckets
+        late.date = MONDAY + timedelta(days=8)
+        late.save()
+        self.assertEqual(self.rollup().count, 2)
+        self.assertEqual(self.rollup(MONDAY + timedelta(days=7)).total, 2)
+
+        late.delete()
+        self.assertFalse(HealthMetricRollup.objects.filter(week_start=MONDAY + timedelta(days=7)).exists())
+
+    def test_bulk_upsert_refreshes(self):
+        upsert_metrics(self.profile, [
+            {"date": str(MONDAY + timedelta(days=i)), "metric_type": "sleep", "value": 6 + i % 2}
+            for i in range(14)
+        ])
+        self.assertEqual(self.rollup(metric="sleep").count, 7)
+        self.assertEqual(HealthMetricRollup.objects.filter(user=self.profile).count(), 2)
+
+    def test_rebuild_matches_incremental(self):
+        for i in range(20):
+            self.log(MONDAY + timedelta(days=i), i % 10 + 1)
+        incremental = list(HealthMetricRollup.objects.order_by("week_start").values(*metric_rollups.FIELDS))
+
+        out = io.StringIO()
+        call_command("rebuild_metric_rollups", "--user", "rollup_user", stdout=out)
+        rebuilt = list(HealthMetricRollup.objects.order_by("week_start").values(*metric_rollups.FIELDS))
+
+        self.assertEqual(incremental, rebuilt)
+        self.assertIn("Rebuilt 3", out.getvalue())
+
+    def test_window_matches_raw(self):
+        for i in range(40):
+            self.log(MONDAY + timedelta(days=i), (i * 7) % 10 + 1)
+
+        # Starts on a Wednesday, ends on a Friday: partial weeks on both edges
+        start, end = MONDAY + timedelta(days=2), MONDAY + timedelta(days=32)
+        with self.assertNumQueries(2):
+            agg = metric_rollups.window(self.profile.id, start, end)["mood"]
+
+        raw = list(HealthMetric.objects.filter(date__gte=start, date__lte=end).order_by("date")
+                   .values_list("value", flat=True))
+        self.assertEqual(agg["count"], len(raw))
+        self.assertEqual(agg["total"], sum(raw))
+        self.assertEqual((agg["min_value"], agg["max_value"]), (min(raw), max(raw)))
+        self.assertEqual((agg["first_value"], agg["last_value"]), (raw[0], raw[-1]))
+
+        weeks = metric_rollups.weekly(self.profile.id, ["mood"], start, end)["mood"]
+        self.assertEqual(weeks[0][0], MONDAY)
+        self.assertEqual(weeks[0][1]["count"], 5)
+        self.assertEqual(sum(w["count"] for _, w in weeks), len(raw))
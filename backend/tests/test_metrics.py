@@ -0,0 +1,83 @@
+"""
+Multi-process metric snapshots: per-thread temp files, background flushing
+and pruning of snapshots left by exited workers.
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from api import metrics
+
+
+class MetricsSnapshotTests(TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir, ignore_errors=True)
+        override = override_settings(METRICS_MULTIPROC_DIR=self.dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def files(self):
+        return sorted(os.listdir(self.dir))
+
+    def dead_pid(self):
+        proc = subprocess.Popen([sys.executable, "-c", "pass"])
+        proc.wait()
+        return proc.pid
+
+    def test_concurrent_flushes_do_not_share_a_temp_file(self):
+        errors = []
+
+        def work():
+            try:
+                for _ in range(20):
+                    metrics.flush()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(self.files(), [f"metrics-{metrics._process_token}.json"])
+
+    def test_observe_never_writes(self):
+        with mock.patch.object(metrics, "_flusher_pid", None), \
+                mock.patch.object(metrics.threading, "Thread") as thread, \
+                mock.patch.object(metrics, "flush") as flush:
+            metrics.REQUEST_DB_TIME.observe(0.01, view="test")
+            metrics.DB_QUERIES.inc(view="test")
+
+        flush.assert_not_called()
+        thread.return_value.start.assert_called_once()
+        self.assertEqual(self.files(), [])
+
+    def test_scrape_prunes_exited_workers(self):
+        dead = self.dead_pid()
+        snapshot = {metrics.DB_QUERIES.name: [[["pruned_view"], 5]]}
+        for name in (f"metrics-{dead}-aaaa.json", f"metrics-{dead}-bbbb.tmp"):
+            with open(os.path.join(self.dir, name), "w") as fh:
+                json.dump(snapshot, fh)
+        live = {metrics.DB_QUERIES.name: [[["live_view"], 3]]}
+        with open(os.path.join(self.dir, f"metrics-{os.getpid()}-other.json"), "w") as fh:
+            json.dump(live, fh)
+
+        merged = metrics._collect()[metrics.DB_QUERIES.name]
+
+        self.assertNotIn(("pruned_view",), merged)
+        self.assertEqual(merged[("live_view",)], 3)
+        self.assertEqual(self.files(), sorted([
+            f"metrics-{os.getpid()}-other.json",
+            f"metrics-{metrics._process_token}.json",
+        ]))
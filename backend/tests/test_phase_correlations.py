@@ -0,0 +1,76 @@
+"""
+Metric vs cycle-phase effects and the findings handed to the insight prompt.
+"""
+import json
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from api import insights, llm, phase_correlations
+from api.models import CycleRecord, HealthMetric
+
+
+class PhaseCorrelationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.profile = User.objects.create_user("phase_user").profile
+
+        # Four 28-day cycles; mood drops in the luteal phase (day 17+)
+        first = date.today() - timedelta(days=28 * 4 - 1)
+        for c in range(4):
+            CycleRecord.objects.create(user=self.profile, start_date=first + timedelta(days=28 * c))
+
+        metrics = []
+        for i in range(28 * 4):
+            day = first + timedelta(days=i)
+            cycle_day = i % 28 + 1
+            metrics.append(HealthMetric(
+                user=self.profile, date=day, metric_type="mood",
+                value=(4 if cycle_day >= 17 else 7) + (i % 3 - 1) * 0.5
+            ))
+            metrics.append(HealthMetric(
+                user=self.profile, date=day, metric_type="sleep", value=7 + (i % 2) * 0.5
+            ))
+        HealthMetric.objects.bulk_create(metrics)
+        self.profile.bump_data_version()
+
+    def test_effect_sizes(self):
+        phases = phase_correlations.analyze(self.profile)["phases"]
+
+        luteal = phases["mood"]["Luteal"]
+        self.assertEqual(luteal["n"], 12 * 4)
+        self.assertAlmostEqual(luteal["mean"], 4, delta=0.1)
+        self.assertLess(luteal["effect_size"], -2)
+        # Sleep doesn't depend on phase
+        self.assertTrue(all(abs(p["effect_size"]) < 0.5 for p in phases["sleep"].values()))
+
+    def test_findings_strongest_and_current_phase_first(self):
+        found = phase_correlations.findings(self.profile, current_phase="Menstrual")
+
+        self.assertTrue(found)
+        self.assertEqual(found[0]["metric"], "mood")
+        self.assertTrue(all(f["metric"] == "mood" for f in found))
+        self.assertEqual(found[0]["phase"], "Menstrual")
+
+        strongest = phase_correlations.analyze(self.profile)["findings"][0]
+        self.assertEqual((strongest["phase"], strongest["direction"]), ("Luteal", "lower"))
+
+    def test_insight_prompt_gets_findings_not_raw_metrics(self):
+        response = json.dumps({"risk_score": 40, "main_reason": "ok", "recommendations": []})
+        with mock.patch.object(llm, "is_configured", return_value=True), \
+                mock.patch.object(llm, "chat_completion", return_value=response) as call:
+            insights.generate_cycle_insight(self.profile.id)
+
+        prompt = call.call_args.kwargs["messages"][0]["content"]
+        self.assertIn('"findings"', prompt)
+        self.assertIn("luteal phase", prompt)
+        self.assertNotIn('"metrics"', prompt)
+
+    def test_no_cycles_no_findings(self):
+        CycleRecord.objects.all().delete()
+        self.profile.refresh_from_db()
+        self.assertEqual(phase_correlations.analyze(self.profile)["findings"], [])
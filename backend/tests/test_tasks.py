@@ -0,0 +1,183 @@
+"""
+Background task queue: dedupe, priorities, retries, and the report /
+insight jobs wired into the views.
+"""
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api import jobs, llm, tasks
+from api.models import BackgroundTask, CycleInsight, PhenotypeResult, RenderedReport, SymptomLog
+
+
+_calls = []
+
+
+def ai_available():
+    reply = json.dumps({"risk_score": 30, "main_reason": "Regular cycles", "recommendations": []})
+    return mock.patch.multiple(
+        llm, is_configured=mock.Mock(return_value=True), chat_completion=mock.Mock(return_value=reply)
+    )
+
+
+@tasks.task("test.record")
+def _record(payload):
+    _calls.append(payload["n"])
+    return {"n": payload["n"]}
+
+
+@tasks.task("test.flaky", max_attempts=2)
+def _flaky(payload):
+    raise RuntimeError("boom")
+
+
+class QueueTests(TestCase):
+
+    def setUp(self):
+        _calls.clear()
+
+    def test_dedupe_key_returns_pending_task(self):
+        a = tasks.enqueue("test.record", {"n": 1}, dedupe_key="k")
+        b = tasks.enqueue("test.record", {"n": 2}, dedupe_key="k")
+        self.assertEqual(a.id, b.id)
+        self.assertEqual(BackgroundTask.objects.count(), 1)
+
+    def test_running_task_does_not_absorb_new_work(self):
+        a = tasks.enqueue("test.record", {"n": 1}, dedupe_key="k")
+        tasks.claim("w1")
+        b = tasks.enqueue("test.record", {"n": 2}, dedupe_key="k")
+        self.assertNotEqual(a.id, b.id)
+
+    def test_claims_by_priority_then_age(self):
+        tasks.enqueue("test.record", {"n": 1})
+        tasks.enqueue("test.record", {"n": 2}, priority=5)
+        tasks.enqueue("test.record", {"n": 3}, delay=3600)
+
+        self.assertEqual(tasks.run_pending(), 2)
+        self.assertEqual(_calls, [2, 1])
+        self.assertEqual(BackgroundTask.objects.get(payload__n=2).result, {"n": 2})
+
+    def test_task_is_claimed_once(self):
+        tasks.enqueue("test.record", {"n": 1})
+        self.assertEqual(len(tasks.claim("w1")), 1)
+        self.assertEqual(tasks.claim("w2"), [])
+
+    def test_failure_retries_with_backoff_then_fails(self):
+        t = tasks.enqueue("test.flaky")
+
+        tasks.run_pending()
+        t.refresh_from_db()
+        self.assertEqual(t.status, "pending")
+        self.assertEqual(t.attempts, 1)
+        self.assertGreater(t.run_at, timezone.now())
+        self.assertIn("boom", t.last_error)
+
+        BackgroundTask.objects.filter(id=t.id).update(run_at=timezone.now())
+        tasks.run_pending()
+        t.refresh_from_db()
+        self.assertEqual(t.status, "failed")
+        self.assertEqual(t.attempts, 2)
+
+    @override_settings(TASK_LOCK_TIMEOUT=60)
+    def test_stale_running_task_is_requeued(self):
+        t = tasks.enqueue("test.record", {"n": 1})
+        tasks.claim("dead-worker")
+        BackgroundTask.objects.filter(id=t.id).update(
+            locked_at=timezone.now() - timedelta(seconds=120)
+        )
+
+        self.assertEqual(tasks.requeue_stale(), 1)
+        self.assertEqual(tasks.run_pending(), 1)
+        self.assertEqual(_calls, [1])
+
+    def test_worker_once_drains_queue(self):
+        tasks.enqueue("test.record", {"n": 1})
+        tasks.enqueue("test.record", {"n": 2})
+        worker = tasks.Worker(names=["test.record"], poll_interval=0)
+        self.assertEqual(worker.run(once=True), 2)
+
+
+@override_settings(PRECOMPUTE_ASYNC=True)
+class JobTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user("queue_user", password="x")
+        self.client.force_authenticate(self.user)
+
+    def test_report_is_prerendered_and_served(self):
+        log = SymptomLog.objects.create(cycle_gap_days=40, bmi=24)
+        result = PhenotypeResult.objects.create(
+            symptom_log=log, phenotype="Lean PCOS", confidence=70,
+            reasons=["test"], ai_explanation="Analysis", diet_plan="Diet",
+        )
+        jobs.render_report(result.id)
+        tasks.run_pending()
+
+        rendered = RenderedReport.objects.get(result=result)
+        response = self.client.get(f"/api/report/{result.id}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, bytes(rendered.pdf))
+
+    def test_cycle_write_queues_insight_and_endpoint_serves_it(self):
+        self.client.post("/api/cycle/log/", {"start_date": "2026-01-01"}, format="json")
+        key = jobs.insight_key(self.user.profile.id)
+        self.assertTrue(tasks.is_pending(key))
+
+        with ai_available():
+            tasks.run_pending()
+        self.assertFalse(tasks.is_pending(key))
+        self.assertEqual(CycleInsight.objects.filter(user=self.user.profile).count(), 1)
+
+        response = self.client.get("/api/insights/cycle-aware/")
+        self.assertTrue(response.json()["cached"])
+        self.assertEqual(CycleInsight.objects.filter(user=self.user.profile).count(), 1)
+
+
+class PrecomputeDisabledTests(TestCase):
+    """Default deploy: no worker, so writes must not queue anything."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user("no_worker_user", password="x")
+        self.client.force_authenticate(self.user)
+
+    def test_writes_do_not_queue_tasks(self):
+        self.client.post("/api/cycle/log/", {"start_date": "2026-01-01"}, format="json")
+        self.client.post(
+            "/api/health/metric/",
+            {"date": "2026-01-02", "metric_type": "mood", "value": 6},
+            format="json",
+        )
+        self.assertIsNone(jobs.render_report(1))
+        self.assertFalse(BackgroundTask.objects.exists())
+
+        # The insight endpoint still works, computing inline
+        response = self.client.get("/api/insights/cycle-aware/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(CycleInsight.objects.filter(user=self.user.profile).count(), 1)
+
+    def test_new_data_rebuilds_the_insight(self):
+        url = "/api/insights/cycle-aware/"
+        with ai_available():
+            self.assertFalse(self.client.get(url).json()["cached"])
+            self.assertTrue(self.client.get(url).json()["cached"])
+
+            self.client.post("/api/cycle/log/", {"start_date": "2026-01-01"}, format="json")
+            response = self.client.get(url).json()
+
+        self.assertFalse(response["cached"])
+        self.assertEqual(response["phase"], "Luteal")
+        self.assertEqual(CycleInsight.objects.filter(user=self.user.profile).count(), 2)
+
+    def test_fallback_is_not_reused(self):
+        url = "/api/insights/cycle-aware/"
+        self.assertFalse(self.client.get(url).json()["cached"])
+        self.assertFalse(self.client.get(url).json()["cached"])
+        stored = CycleInsight.objects.filter(user=self.user.profile).values_list("fallback", flat=True)
+        self.assertEqual(list(stored), [True, True])
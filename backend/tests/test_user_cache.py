@@ -0,0 +1,64 @@
+"""
+Per-user read cache: hits skip the database, writes invalidate via
+UserProfile.data_version.
+"""
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import CycleRecord, HealthMetric, UserProfile
+
+
+class UserCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user("cache_user", password="x")
+        self.client.force_authenticate(self.user)
+        self.profile = self.user.profile
+        start = date.today() - timedelta(days=90)
+        for i in range(3):
+            CycleRecord.objects.create(user=self.profile, start_date=start + timedelta(days=30 * i))
+
+    def test_repeat_read_is_served_from_cache(self):
+        first = self.client.get("/api/cycle/predict/").json()
+        # Only get_profile's lookup remains
+        with self.assertNumQueries(1):
+            second = self.client.get("/api/cycle/predict/").json()
+        self.assertEqual(first, second)
+
+    def test_cycle_write_invalidates(self):
+        before = self.client.get("/api/cycle/list/").json()
+        self.client.post("/api/cycle/log/", {"start_date": str(date.today())}, format="json")
+        after = self.client.get("/api/cycle/list/").json()
+        self.assertEqual(len(after), len(before) + 1)
+
+    def test_metric_write_and_delete_invalidate(self):
+        self.assertEqual(self.client.get("/api/health/summary/").json(), {})
+
+        self.client.post("/api/health/metric/", {
+            "date": str(date.today()), "metric_type": "sleep", "value": 7
+        }, format="json")
+        self.assertEqual(self.client.get("/api/health/summary/").json()["sleep"]["latest"], 7)
+
+        HealthMetric.objects.filter(user=self.profile).delete()
+        self.assertEqual(self.client.get("/api/health/summary/").json(), {})
+
+    def test_predicted_rows_do_not_bump(self):
+        version = UserProfile.objects.get(pk=self.profile.pk).data_version
+        CycleRecord.objects.create(user=self.profile, start_date=date.today(), predicted=True)
+        self.assertEqual(UserProfile.objects.get(pk=self.profile.pk).data_version, version)
+
+    def test_stale_profile_save_keeps_version(self):
+        stale = UserProfile.objects.get(pk=self.profile.pk)
+        CycleRecord.objects.create(user=self.profile, start_date=date.today())
+        stale.name = "renamed"
+        stale.save()
+
+        fresh = UserProfile.objects.get(pk=self.profile.pk)
+        self.assertEqual(fresh.name, "renamed")
+        self.assertGreater(fresh.data_version, stale.data_version)
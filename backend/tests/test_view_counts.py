@@ -0,0 +1,89 @@
+"""
+Write-behind article view counters.
+"""
+import threading
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api import view_counts
+from api.models import KnowledgeArticle
+
+
+@override_settings(ARTICLE_VIEWS_FLUSH_INTERVAL=3600)
+class ViewCountTests(TestCase):
+
+    def setUp(self):
+        view_counts.flush()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user("reader"))
+        self.articles = [
+            KnowledgeArticle.objects.create(slug=f"a{i}", title=f"A{i}", content="x", category="diet", views=5)
+            for i in range(3)
+        ]
+
+    def views(self):
+        return list(KnowledgeArticle.objects.order_by("id").values_list("views", flat=True))
+
+    def test_reads_do_not_write(self):
+        article = self.articles[0]
+        with CaptureQueriesContext(connection) as ctx:
+            for expected in (6, 7, 8):
+                response = self.client.get(f"/api/articles/{article.id}/")
+                self.assertEqual(response.data["views"], expected)
+
+        self.assertFalse([q for q in ctx.captured_queries if q["sql"].startswith("UPDATE")])
+        self.assertEqual(self.views(), [5, 5, 5])
+
+        view_counts.flush()
+        self.assertEqual(self.views(), [8, 5, 5])
+
+    def test_flush_is_one_update_per_distinct_count(self):
+        a, b, c = self.articles
+        view_counts.record(a.id, 2)
+        view_counts.record(b.id, 2)
+        view_counts.record(c.id, 7)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(view_counts.flush(), 3)
+
+        updates = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 2)
+        self.assertIn('"views" + ', updates[0])
+        self.assertEqual(self.views(), [7, 7, 12])
+        self.assertEqual(view_counts.flush(), 0)
+
+    def test_concurrent_records_are_exact(self):
+        article = self.articles[0]
+
+        def read():
+            for _ in range(500):
+                view_counts.record(article.id)
+
+        threads = [threading.Thread(target=read) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        view_counts.flush()
+        self.assertEqual(self.views()[0], 5 + 8 * 500)
+
+    @override_settings(ARTICLE_VIEWS_FLUSH_INTERVAL=0)
+    def test_record_never_writes_inline(self):
+        with CaptureQueriesContext(connection) as ctx:
+            view_counts.record(self.articles[0].id)
+
+        self.assertEqual(ctx.captured_queries, [])
+        self.assertEqual(view_counts.pending(self.articles[0].id), 1)
+
+    @override_settings(ARTICLE_VIEWS_FLUSH_INTERVAL=0)
+    def test_flushes_after_response_when_interval_elapses(self):
+        response = self.client.get(f"/api/articles/{self.articles[1].id}/")
+
+        self.assertEqual(response.data["views"], 6)
+        self.assertEqual(view_counts.pending(self.articles[1].id), 0)
+        self.assertEqual(self.views(), [5, 6, 5])
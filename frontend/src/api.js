@@ -70,11 +70,22 @@ export const processText = async (text, history, current) =>
 export const logCycle = async (data) => (await api.post("/cycle/log/", data)).data;
 export const listCycles = async (limit = 10) => (await api.get(`/cycle/list/?limit=${limit}`)).data;
 export const predictCycle = async () => (await api.get("/cycle/predict/")).data;
+export const getCycleCalendar = async (from, to) =>
+    (await api.get(`/cycle/calendar/?from=${from}&to=${to}`)).data;
+export const importCycles = async (file) => {
+    const form = new FormData();
+    form.append("file", file);
+    return (await api.post("/cycle/import/", form)).data;
+};
 export const deleteCycle = async (id) => (await api.post(`/cycle/delete/${id}/`)).data;
 
 export const listArticles = async (cat = null) =>
     (await api.get(cat ? `/articles/?category=${cat}` : "/articles/")).data;
+export const searchArticles = async (search, category = null, page = 1) =>
+    (await api.get("/articles/", { params: { search, category, page } })).data;
 export const getArticle = async (id) => (await api.get(`/articles/${id}/`)).data;
 export const getCycleInsight = async () => (await api.get("/insights/cycle-aware/")).data;
+export const exportData = async (type = "zip", dataset = null) =>
+    (await api.get("/export/", { params: { type, dataset }, responseType: "blob" })).data;
 
 export default api;
@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import { listArticles, getArticle } from '../api';
+import { listArticles, searchArticles, getArticle } from '../api';
 import { 
     Search, 
     BookOpen, 
@@ -27,11 +27,34 @@ export default function Knowledge() {
     const [selectedArticle, setSelectedArticle] = useState(null);
     const [loading, setLoading] = useState(true);
     const [searchQuery, setSearchQuery] = useState("");
+    const [searchResults, setSearchResults] = useState(null);
 
     useEffect(() => {
         loadArticles();
     }, [activeCategory]);
 
+    // Ranked server-side search, debounced while typing
+    useEffect(() => {
+        const q = searchQuery.trim();
+        if (!q) {
+            setSearchResults(null);
+            return;
+        }
+        let cancelled = false;
+        const timer = setTimeout(async () => {
+            try {
+                const data = await searchArticles(q, activeCategory);
+                if (!cancelled) setSearchResults(data.results || []);
+            } catch (e) {
+                console.error('Error searching articles:', e);
+            }
+        }, 250);
+        return () => {
+            cancelled = true;
+            clearTimeout(timer);
+        };
+    }, [searchQuery, activeCategory]);
+
     const loadArticles = async () => {
         setLoading(true);
         try {
@@ -53,10 +76,7 @@ export default function Knowledge() {
         }
     };
 
-    const filteredArticles = articles.filter(article => 
-        article.title.toLowerCase().includes(searchQuery.toLowerCase()) ||
-        article.summary.toLowerCase().includes(searchQuery.toLowerCase())
-    );
+    const filteredArticles = searchResults ?? articles;
 
     // Simple Markdown Renderer for Seed Data
     const renderMarkdown = (content) => {
@@ -174,6 +194,14 @@ export default function Knowledge() {
                                 {article.summary}
                             </p>
 
+                            {/* Server-escaped text with <mark> around matches */}
+                            {article.snippet && (
+                                <p
+                                    className="text-gray-400 text-xs leading-relaxed -mt-4 mb-6 line-clamp-2 [&_mark]:bg-pink-500/20 [&_mark]:text-pink-300"
+                                    dangerouslySetInnerHTML={{ __html: article.snippet }}
+                                />
+                            )}
+
                             <div className="mt-auto flex items-center gap-2 text-sm font-medium text-gray-400 group-hover:text-white transition-colors">
                                 Read Article 
                                 <ChevronRight className="w-4 h-4 group-hover:translate-x-1 transition-transform" />
@@ -222,9 +250,17 @@ export default function Knowledge() {
 
                         {/* Modal Content */}
                         <div className="p-6 md:p-8 overflow-y-auto custom-scrollbar">
-                           <div className="prose prose-invert prose-pink max-w-none">
-                                {renderMarkdown(selectedArticle.content)}
-                           </div>
+                           {/* content_html is rendered + sanitized server-side at save time */}
+                           {selectedArticle.content_html ? (
+                                <div
+                                    className="prose prose-invert prose-pink max-w-none [&_h1]:text-2xl [&_h1]:font-bold [&_h1]:text-white [&_h1]:mt-6 [&_h1]:mb-4 [&_h2]:text-xl [&_h2]:font-bold [&_h2]:text-pink-400 [&_h2]:mt-5 [&_h2]:mb-3 [&_h3]:text-lg [&_h3]:font-bold [&_h3]:text-purple-400 [&_h3]:mt-4 [&_h3]:mb-2 [&_li]:ml-4 [&_li]:list-disc [&_li]:text-gray-300 [&_li]:mb-1 [&_p]:text-gray-300 [&_p]:leading-relaxed [&_p]:mb-2 [&_strong]:text-white"
+                                    dangerouslySetInnerHTML={{ __html: selectedArticle.content_html }}
+                                />
+                           ) : (
+                                <div className="prose prose-invert prose-pink max-w-none">
+                                    {renderMarkdown(selectedArticle.content)}
+                                </div>
+                           )}
                            
                            <div className="mt-12 pt-6 border-t border-[#222] text-center">
                                 <p className="text-gray-500 text-sm mb-4">Was this article helpful?</p>